@@ -1,27 +1,286 @@
 import streamlit as st
+
+if __name__ == "__main__":
+    # Streamlit executes this file as __main__ on every rerun. Hand off to the
+    # imported module instead: it is loaded once per process, so the KB snapshot,
+    # keyword matcher, connection pools and background writers survive reruns.
+    import sys
+    from pathlib import Path
+    _app_dir = str(Path(__file__).resolve().parent)
+    if _app_dir not in sys.path:
+        sys.path.insert(0, _app_dir)
+    __import__(Path(__file__).stem).run()
+    st.stop()
+
 import hashlib
+import importlib.util
+import marshal
+import runpy
 import sqlite3
-from datetime import datetime, timedelta
+import os
+import queue
+import threading
+import time
+import atexit
+import functools
+import itertools
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
 import random
 import re
 import json
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 from contextlib import contextmanager
+from collections import namedtuple, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import MappingProxyType
+
+# pandas and plotly are imported inside the admin views that use them, so
+# chat-only processes start, and answer, without loading either
+
+# Database connection settings
+DB_PATH = os.environ.get('WELLNESS_DB_PATH', 'milestone4_wellness_chatbot.db')
+DB_POOL_SIZE = 8
+DB_BUSY_TIMEOUT_MS = 5000
+
+_db_pools = {}
+_db_pools_lock = threading.Lock()
+_db_local = threading.local()
+
+# Query tracing: every pooled connection runs statements through TracedCursor,
+# which keeps a slow-query log and counts the queries issued by each Streamlit rerun.
+SLOW_QUERY_MS = float(os.environ.get('WELLNESS_SLOW_QUERY_MS', 50))
+QUERY_BUDGET_PER_RERUN = int(os.environ.get('WELLNESS_QUERY_BUDGET', 150))
+QUERY_BUDGET_STRICT = os.environ.get('WELLNESS_QUERY_BUDGET_STRICT') == '1'
+# The same statement run this many times in one rerun is reported as a likely N+1
+REPEATED_QUERY_THRESHOLD = 10
+
+SLOW_QUERY_LOG = deque(maxlen=200)
+RERUN_QUERY_LOG = deque(maxlen=100)
+_query_local = threading.local()
+_EXPLAINABLE = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE')
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+def _params_shape(params, many=False):
+    """Types of the bound parameters, never their values"""
+    if many:
+        params = list(params) if not isinstance(params, (list, tuple)) else params
+        first = _params_shape(params[0]) if params else "()"
+        return f"{len(params)} x {first}"
+    if isinstance(params, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in params.items()) + "}"
+    return "(" + ", ".join(type(value).__name__ for value in params) + ")"
+
+def _count_query(sql):
+    budget = getattr(_query_local, 'budget', None)
+    if budget is None:
+        return
+    budget['count'] += 1
+    budget['statements'][sql] = budget['statements'].get(sql, 0) + 1
+    if budget['count'] > QUERY_BUDGET_PER_RERUN and QUERY_BUDGET_STRICT:
+        raise QueryBudgetExceeded(f"More than {QUERY_BUDGET_PER_RERUN} queries in one rerun")
+
+class TracedCursor(sqlite3.Cursor):
+    """Cursor that times execute and fetch calls and logs statements over SLOW_QUERY_MS"""
+
+    def _trace_start(self, sql, params, many=False):
+        _count_query(sql)
+        self._trace = {'sql': sql, 'params': params, 'many': many, 'ms': 0.0, 'rows': 0, 'entry': None}
+
+    def _trace_add(self, started, rows=0):
+        trace = getattr(self, '_trace', None)
+        if trace is None:
+            return
+        trace['ms'] += (time.perf_counter() - started) * 1000
+        trace['rows'] += rows
+        entry = trace['entry']
+        if entry is not None:
+            entry['duration_ms'] = round(trace['ms'], 2)
+            entry['rows'] = trace['rows']
+        elif trace['ms'] >= SLOW_QUERY_MS:
+            trace['entry'] = self._log_slow(trace)
+
+    def _log_slow(self, trace):
+        sql = " ".join(trace['sql'].split())
+        plan = None
+        if sql.upper().startswith(_EXPLAINABLE) and not trace['many']:
+            try:
+                # Plain cursor so the EXPLAIN itself is neither traced nor counted
+                rows = sqlite3.Cursor(self.connection).execute("EXPLAIN QUERY PLAN " + trace['sql'], trace['params']).fetchall()
+                plan = "; ".join(row[-1] for row in rows)
+            except sqlite3.Error:
+                pass
+        entry = {
+            'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'sql': sql,
+            'params': _params_shape(trace['params'], trace['many']),
+            'duration_ms': round(trace['ms'], 2),
+            'rows': trace['rows'],
+            'plan': plan,
+        }
+        SLOW_QUERY_LOG.append(entry)
+        return entry
+
+    def execute(self, sql, params=()):
+        self._trace_start(sql, params)
+        started = time.perf_counter()
+        super().execute(sql, params)
+        self._trace_add(started, max(self.rowcount, 0))
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        seq_of_params = list(seq_of_params)
+        self._trace_start(sql, seq_of_params, many=True)
+        started = time.perf_counter()
+        super().executemany(sql, seq_of_params)
+        self._trace_add(started, max(self.rowcount, 0))
+        return self
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._trace_add(started, 1 if row is not None else 0)
+        return row
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._trace_add(started, len(rows))
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._trace_add(started, len(rows))
+        return rows
+
+class TracedConnection(sqlite3.Connection):
+    """Connection whose cursors (including conn.execute shortcuts) are TracedCursors"""
+
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self.cursor().executemany(sql, seq_of_params)
+
+def _rerun_label():
+    """Which page a rerun rendered, for the query log"""
+    try:
+        if st.session_state.get('admin_authenticated'):
+            return f"admin:{st.session_state.get('admin_view', 'dashboard')}"
+        return "chat" if st.session_state.get('authenticated') else "login"
+    except Exception:
+        return "script"
 
 @contextmanager
-def get_db():
-    conn = sqlite3.connect('milestone4_wellness_chatbot.db')
+def query_budget(label=None):
+    """Count the queries issued on this thread (one Streamlit rerun) and log the total"""
+    budget = _query_local.budget = {'count': 0, 'statements': {}}
+    started = time.perf_counter()
     try:
-        yield conn
-        conn.commit()
-    except:
-        conn.rollback()
-        raise
+        yield budget
+    finally:
+        _query_local.budget = None
+        repeated = {sql: n for sql, n in budget['statements'].items() if n >= REPEATED_QUERY_THRESHOLD}
+        RERUN_QUERY_LOG.append({
+            'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'page': label or _rerun_label(),
+            'queries': budget['count'],
+            'duration_ms': round((time.perf_counter() - started) * 1000, 1),
+            'over_budget': budget['count'] > QUERY_BUDGET_PER_RERUN,
+            'repeated': "; ".join(f"{n}x {' '.join(sql.split())[:80]}" for sql, n in
+                                  sorted(repeated.items(), key=lambda item: -item[1])),
+        })
+
+def _open_connection(path, read_only=False):
+    """Open a connection with the pragmas every pooled connection shares"""
+    if read_only:
+        uri = Path(path).resolve().as_uri() + '?mode=ro'
+        conn = sqlite3.connect(uri, uri=True, timeout=DB_BUSY_TIMEOUT_MS / 1000, check_same_thread=False,
+                               factory=TracedConnection)
+    else:
+        conn = sqlite3.connect(path, timeout=DB_BUSY_TIMEOUT_MS / 1000, check_same_thread=False,
+                               factory=TracedConnection)
+        # WAL lets readers (analytics) run alongside the single writer (chat)
+        conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+def _get_pool(key):
+    pool = _db_pools.get(key)
+    if pool is None:
+        with _db_pools_lock:
+            pool = _db_pools.setdefault(key, queue.LifoQueue(maxsize=DB_POOL_SIZE))
+    return pool
+
+@contextmanager
+def _checkout_connection(read_only=False):
+    """Borrow a pooled connection for the current thread.
+
+    Nested checkouts on the same thread share the outer connection so that
+    helpers calling other helpers never contend with themselves for the
+    write lock. Yields (conn, outermost).
+    """
+    key = (DB_PATH, read_only)
+    held = getattr(_db_local, 'held', None)
+    if held is None:
+        held = _db_local.held = {}
+    if key in held:
+        yield held[key], False
+        return
+
+    pool = _get_pool(key)
+    try:
+        conn = pool.get_nowait()
+    except queue.Empty:
+        conn = _open_connection(DB_PATH, read_only)
+    held[key] = conn
+    try:
+        yield conn, True
     finally:
-        conn.close()
+        del held[key]
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            pool.put_nowait(conn)
+        except (queue.Full, sqlite3.Error):
+            conn.close()
+
+@contextmanager
+def get_db():
+    """Pooled read-write connection; commits on success, rolls back on error"""
+    with _checkout_connection(read_only=False) as (conn, outermost):
+        try:
+            yield conn
+            if outermost:
+                conn.commit()
+        except:
+            if outermost:
+                conn.rollback()
+            raise
+
+@contextmanager
+def get_read_db():
+    """Pooled read-only connection for analytics; never blocks chat writes"""
+    with _checkout_connection(read_only=True) as (conn, _):
+        yield conn
+
+def close_db_pools():
+    """Close every idle pooled connection (used on shutdown and in scripts)"""
+    with _db_pools_lock:
+        pools = list(_db_pools.values())
+        _db_pools.clear()
+    for pool in pools:
+        while True:
+            try:
+                pool.get_nowait().close()
+            except queue.Empty:
+                break
 
 def db_exec(query, params=(), fetch=None):
     with get_db() as conn:
@@ -38,6 +297,82 @@ def safe_db(query, params=(), fetch=None, default=None):
         st.error(f"DB error: {e}")
         return default if default else ([] if fetch == 'all' else None)
 
+# Performance instrumentation
+# Spans are appended to an in-memory buffer and written to perf_events in
+# batches by the ChatWriter thread, so recording costs a tuple append rather
+# than a database write in the request path.
+PERF_FLUSH_EVENTS = 256
+PERF_RETENTION_DAYS = 14
+
+_perf_buffer = []
+_perf_flush_lock = threading.Lock()
+_perf_flush_pending = threading.Event()
+_perf_request_ids = itertools.count(1)
+
+def new_perf_request_id():
+    """Id tying together the spans of one chat message"""
+    return f"{os.getpid():x}-{next(_perf_request_ids)}"
+
+def record_perf(stage, duration_us, intent=None, request_id=None):
+    _perf_buffer.append((time.time(), request_id, stage, intent, duration_us))
+    if len(_perf_buffer) >= PERF_FLUSH_EVENTS and not _perf_flush_pending.is_set():
+        _perf_flush_pending.set()
+        get_chat_writer().flush_spans()
+
+def flush_perf_events():
+    """Write buffered spans to perf_events and prune old ones; returns how many were written"""
+    with _perf_flush_lock:
+        _perf_flush_pending.clear()
+        events = _perf_buffer[:]
+        # Deleting the copied prefix keeps spans appended meanwhile by other threads
+        del _perf_buffer[:len(events)]
+        if not events:
+            return 0
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=PERF_RETENTION_DAYS)).strftime('%Y-%m-%d %H:%M:%S')
+        try:
+            with get_db() as conn:
+                conn.executemany("""
+                    INSERT INTO perf_events (ts, request_id, stage, intent, duration_us)
+                    VALUES (?, ?, ?, ?, ?)
+                """, [(datetime.fromtimestamp(ts, timezone.utc).strftime('%Y-%m-%d %H:%M:%S'), request_id, stage, intent, duration_us)
+                      for ts, request_id, stage, intent, duration_us in events])
+                conn.execute("DELETE FROM perf_events WHERE ts < ?", (cutoff,))
+        except sqlite3.Error:
+            # Timing data is best effort; never let it break a request
+            return 0
+        return len(events)
+
+atexit.register(flush_perf_events)
+
+class PerfSpan:
+    """with PerfSpan('stage'): ... records the block's duration"""
+    __slots__ = ('stage', 'intent', 'request_id', 'started')
+
+    def __init__(self, stage, intent=None, request_id=None):
+        self.stage = stage
+        self.intent = intent
+        self.request_id = request_id
+
+    def __enter__(self):
+        self.started = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        record_perf(self.stage, (time.perf_counter_ns() - self.started) / 1000, self.intent, self.request_id)
+
+def perf_timed(func):
+    """Decorator recording every call of func as a span named after it"""
+    stage = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter_ns()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            record_perf(stage, (time.perf_counter_ns() - started) / 1000)
+    return wrapper
+
 def hash_password(password):
     return hashlib.sha256(password.encode()).hexdigest()
 
@@ -55,627 +390,450 @@ def is_admin(email):
 def authenticate_admin(email, password):
     return email in ADMIN_CREDENTIALS and ADMIN_CREDENTIALS[email] == password
 
-# Complete Knowledge Base with ALL symptoms and first aid
-WELLNESS_KB = {
-    "symptoms": {
-        "headache": {
-            "english": """**For Headache Relief:**
-
-• Drink plenty of water - dehydration is a common cause
-
-• Rest in a quiet, dark room away from bright lights
-
-• Apply a cold compress to your forehead for 15 minutes
-
-• Avoid screens (phone, computer, TV) for at least 30 minutes
-
-• Try gentle neck and shoulder stretches
-
-• Consider over-the-counter pain relievers if needed
-
-• If severe or persistent for more than 24 hours, consult a doctor""",
-            "hindi": """**सिरदर्द के लिए:**
-
-• खूब पानी पिएं - निर्जलीकरण एक आम कारण है
-
-• अंधेरे, शांत कमरे में आराम करें
-
-• माथे पर 15 मिनट के लिए ठंडा सेक लगाएं
-
-• कम से कम 30 मिनट के लिए स्क्रीन से बचें
-
-• हल्के गर्दन और कंधे की स्ट्रेचिंग करें
-
-• जरूरत पड़ने पर दर्द निवारक दवा लें
-
-• अगर 24 घंटे से अधिक समय तक रहे तो डॉक्टर से परामर्श करें"""
-        },
-        "fever": {
-            "english": """**For Fever Management:**
-
-• Stay well-hydrated with water, clear broths, or electrolyte drinks
-
-• Rest completely and avoid physical activities
-
-• Wear light, breathable clothing
-
-• Use a cool, damp washcloth on forehead and wrists
-
-• Take temperature regularly and monitor changes
-
-• Consider fever-reducing medication if over 101°F (38.3°C)
-
-• Seek medical attention if fever exceeds 103°F (39.4°C)
-
-• Call doctor immediately if accompanied by severe symptoms""",
-            "hindi": """**बुखार प्रबंधन के लिए:**
-
-• पानी, साफ शोरबा या इलेक्ट्रोलाइट पेय के साथ हाइड्रेटेड रहें
-
-• पूरी तरह से आराम करें और शारीरिक गतिविधियों से बचें
-
-• हल्के, सांस लेने योग्य कपड़े पहनें
-
-• माथे और कलाइयों पर ठंडा, नम कपड़ा रखें
-
-• नियमित रूप से तापमान लें और परिवर्तनों की निगरानी करें
-
-• यदि 101°F (38.3°C) से अधिक हो तो बुखार कम करने वाली दवा लें"""
-        },
-        "fatigue": {
-            "english": """**To Combat Fatigue:**
-
-• Ensure 7-9 hours of quality sleep each night
-
-• Maintain a consistent sleep schedule, even on weekends
-
-• Eat balanced meals with complex carbohydrates and lean proteins
-
-• Stay hydrated throughout the day
-
-• Take short 10-15 minute walks to boost energy
-
-• Limit caffeine intake after 2 PM
-
-• Practice stress-reduction techniques like deep breathing
-
-• If persistent for weeks, consult healthcare provider""",
-            "hindi": """**थकान से निपटने के लिए:**
-
-• प्रति रात 7-9 घंटे की गुणवत्तापूर्ण नींद सुनिश्चित करें
-
-• सप्ताहांत पर भी नींद का सुसंगत कार्यक्रम बनाए रखें
-
-• जटिल कार्बोहाइड्रेट और लीन प्रोटीन के साथ संतुलित भोजन खाएं
-
-• दिन भर हाइड्रेटेड रहें
-
-• ऊर्जा बढ़ाने के लिए 10-15 मिनट की छोटी सैर करें"""
-        },
-        "stress": {
-            "english": """**For Stress Management:**
-
-• Practice deep breathing exercises (4-7-8 technique)
-
-• Try progressive muscle relaxation starting from toes to head
-
-• Engage in 20-30 minutes of physical activity daily
-
-• Limit caffeine and alcohol consumption
-
-• Maintain regular meal times and avoid skipping meals
-
-• Connect with supportive friends or family members
-
-• Consider mindfulness meditation or yoga
-
-• If overwhelming, seek professional counseling support""",
-            "hindi": """**तनाव प्रबंधन के लिए:**
-
-• गहरी सांस लेने के व्यायाम का अभ्यास करें (4-7-8 तकनीक)
-
-• पैर की उंगलियों से सिर तक प्रगतिशील मांसपेशी विश्राम का प्रयास करें
-
-• रोजाना 20-30 मिनट की शारीरिक गतिविधि में संलग्न हों
-
-• कैफीन और शराब की खपत सीमित करें"""
-        },
-        "anxiety": {
-            "english": """**To Manage Anxiety:**
-
-• Use grounding techniques: name 5 things you see, 4 you hear, 3 you touch
-
-• Practice slow, controlled breathing (inhale 4 counts, exhale 6 counts)
-
-• Challenge negative thoughts with realistic perspectives
-
-• Limit news and social media exposure
-
-• Maintain regular exercise routine
-
-• Avoid excessive caffeine and sugar
-
-• Consider talking to a trusted friend or counselor
-
-• If panic attacks occur, seek immediate professional help""",
-            "hindi": """**चिंता प्रबंधन के लिए:**
-
-• ग्राउंडिंग तकनीक का उपयोग करें: 5 चीजें जो आप देखते हैं, 4 जो आप सुनते हैं, 3 जो आप छूते हैं
-
-• धीमी, नियंत्रित सांस का अभ्यास करें (4 गिनती में सांस लें, 6 में छोड़ें)
-
-• नकारात्मक विचारों को यथार्थवादी दृष्टिकोण से चुनौती दें"""
-        },
-        "cold": {
-            "english": """**For Cold Symptom Relief:**
-
-• Rest and get extra sleep to help your immune system
-
-• Drink warm fluids like herbal tea, warm water with honey and lemon
-
-• Use a humidifier or breathe steam from hot shower
-
-• Gargle with warm salt water for sore throat
-
-• Use saline nasal drops to clear congestion
-
-• Eat chicken soup or other warm, nutritious broths
-
-• Avoid smoking and secondhand smoke
-
-• See doctor if symptoms worsen after 7-10 days""",
-            "hindi": """**सर्दी के लक्षण राहत के लिए:**
-
-• अपनी प्रतिरक्षा प्रणाली की मदद के लिए आराम करें और अतिरिक्त नींद लें
-
-• हर्बल चाय, शहद और नींबू के साथ गर्म पानी जैसे गर्म तरल पदार्थ पिएं
-
-• ह्यूमिडिफायर का उपयोग करें या गर्म शावर से भाप लें"""
-        },
-        "cough": {
-            "english": """**To Treat Persistent Cough:**
-
-• Stay hydrated with warm liquids throughout the day
-
-• Use honey (1-2 teaspoons) to soothe throat irritation
-
-• Try throat lozenges or hard candies for temporary relief
-
-• Sleep with your head elevated on extra pillows
-
-• Avoid irritants like smoke, strong perfumes, or dust
-
-• Use a cool-mist humidifier in your bedroom
-
-• Consider over-the-counter cough suppressants for dry cough
-
-• Consult doctor if cough lasts more than 3 weeks or produces blood""",
-            "hindi": """**लगातार खांसी के उपचार के लिए:**
-
-• दिन भर गर्म तरल पदार्थों के साथ हाइड्रेटेड रहें
-
-• गले की जलन को शांत करने के लिए शहद (1-2 चम्मच) का उपयोग करें
-
-• अस्थायी राहत के लिए गले की लोजेंज या कड़ी कैंडी आज़माएं"""
-        },
-        "stomach": {
-            "english": """**For Stomach Discomfort:**
-
-• Eat bland, easy-to-digest foods (rice, bananas, toast)
-
-• Stay hydrated with small, frequent sips of clear fluids
-
-• Avoid dairy, caffeine, alcohol, and fatty foods
-
-• Try peppermint or ginger tea for nausea
-
-• Rest and avoid strenuous activities
-
-• Apply a warm heating pad to abdomen (not too hot)
-
-• Avoid anti-inflammatory medications that can irritate stomach
-
-• Seek immediate care for severe pain, vomiting, or fever""",
-            "hindi": """**पेट की परेशानी के लिए:**
-
-• सादे, पचने में आसान भोजन खाएं (चावल, केला, टोस्ट)
-
-• साफ तरल पदार्थों के छोटे, लगातार घूंटों के साथ हाइड्रेटेड रहें
-
-• डेयरी, कैफीन, शराब और वसायुक्त खाद्य पदार्थों से बचें"""
-        },
-        "back_pain": {
-            "english": """**For Back Pain Relief:**
-
-• Rest for 24-48 hours, then gradually return to normal activities
-
-• Apply ice for first 48 hours, then switch to heat therapy
-
-• Practice gentle stretching and walking as tolerated
-
-• Sleep on your side with knees bent and pillow between legs
-
-• Maintain good posture when sitting and standing
-
-• Avoid heavy lifting and sudden movements
-
-• Consider over-the-counter anti-inflammatory medications
-
-• See doctor if pain persists over a week or worsens""",
-            "hindi": """**पीठ दर्द से राहत के लिए:**
-
-• 24-48 घंटे आराम करें, फिर धीरे-धीरे सामान्य गतिविधियों पर लौटें
-
-• पहले 48 घंटों के लिए बर्फ लगाएं, फिर हीट थेरेपी पर स्विच करें"""
-        },
-        "nausea": {
-            "english": """**To Reduce Nausea:**
-
-• Eat small, frequent meals instead of large portions
-
-• Choose bland foods like crackers, rice, or toast
-
-• Drink clear fluids: ginger ale, herbal tea, or water
-
-• Avoid strong smells, greasy, or spicy foods
-
-• Try ginger supplements or ginger tea
-
-• Rest in a well-ventilated area
-
-• Practice deep breathing or meditation
-
-• Seek medical help if persistent vomiting or signs of dehydration""",
-            "hindi": """**मतली को कम करने के लिए:**
-
-• बड़े हिस्से के बजाय छोटे, लगातार भोजन खाएं
-
-• सादे खाद्य पदार्थ चुनें जैसे क्रैकर, चावल, या टोस्ट"""
-        }
-    },
-
-    "first_aid": {
-        "burn": {
-            "english": """**First Aid for Burns:**
-
-**MINOR BURNS (1st degree - red, painful skin):**
-
-• Immediately cool the burn with cool running water for 10-15 minutes
-
-• Remove jewelry or tight clothing before swelling begins
-
-• Do NOT apply ice, butter, or home remedies
-
-• Cover with sterile, non-adhesive bandage or clean cloth
-
-• Take over-the-counter pain medication if needed
-
-• Apply aloe vera gel after cooling
-
-**SERIOUS BURNS (2nd/3rd degree - blistering, charred skin):**
-
-• Call 911 immediately - do not delay
-
-• Do not remove clothing stuck to burn area
-
-• Cover burn with cool, moist cloth while waiting for help
-
-• Do not break blisters or apply creams to severe burns
-
-• Monitor for signs of shock: pale skin, rapid breathing""",
-            "hindi": """**जलने के लिए प्राथमिक चिकित्सा:**
-
-**छोटी जलन (1st डिग्री - लाल, दर्दनाक त्वचा):**
-
-• तुरंत 10-15 मिनट के लिए ठंडे बहते पानी से जलन को ठंडा करें
-
-• सूजन शुरू होने से पहले गहने या तंग कपड़े हटा दें
-
-• बर्फ, मक्खन, या घरेलू उपचार न लगाएं"""
-        },
-        "cut": {
-            "english": """**First Aid for Cuts and Wounds:**
-
-**MINOR CUTS:**
-
-• Wash your hands thoroughly before treating wound
-
-• Clean the wound gently with clean water
-
-• Apply direct pressure with clean cloth to stop bleeding
-
-• Once bleeding stops, apply antibiotic ointment if available
-
-• Cover with sterile adhesive bandage
-
-• Change bandage daily and keep wound clean and dry
-
-• Monitor for signs of infection: increased pain, redness, pus
-
-**DEEP OR SEVERE CUTS:**
-
-• Call 911 if wound is deep, gaping, or bleeding heavily
-
-• Apply firm, direct pressure with clean cloth or bandage
-
-• Do not remove objects embedded in the wound
-
-• Elevate the injured area above heart level if possible
-
-• Cover with sterile dressing and maintain pressure until help arrives""",
-            "hindi": """**कटने और घावों के लिए प्राथमिक चिकित्सा:**
-
-**छोटे कट:**
-
-• घाव का इलाज करने से पहले अपने हाथों को अच्छी तरह से धो लें
-
-• घाव को साफ पानी से धीरे से साफ करें
-
-• खून बंद करने के लिए साफ कपड़े से सीधा दबाव लगाएं
-
-• जब खून बंद हो जाए, तो उपलब्ध होने पर एंटीबायोटिक मरहम लगाएं
-
-**गहरे या गंभीर कट:**
-
-• यदि घाव गहरा है, खुला है, या बहुत खून बह रहा है तो 911 कॉल करें
-
-• साफ कपड़े या पट्टी से मजबूत, सीधा दबाव लगाएं"""
-        },
-        "sprain": {
-            "english": """**Treatment for Sprains and Strains - R.I.C.E. Method:**
-
-• **REST:** Stop activity immediately, do not use injured area
-
-• **ICE:** Apply ice pack for 15-20 minutes every 2-3 hours for first 48 hours
-
-• **COMPRESSION:** Wrap with elastic bandage (not too tight)
-
-• **ELEVATION:** Raise injured area above heart level when possible
-
-**ONGOING CARE:**
-
-• Avoid heat, alcohol, running, or massage for first 72 hours
-
-• Take anti-inflammatory medication as directed
-
-• Use crutches or supportive device if weight-bearing is painful
-
-• Begin gentle movement after initial pain subsides
-
-• Seek medical attention if no improvement in 2-3 days""",
-            "hindi": """**मोच और खिंचाव के लिए उपचार - R.I.C.E. विधि:**
-
-• **आराम:** तुरंत गतिविधि बंद करें, चोटिल क्षेत्र का उपयोग न करें
-
-• **बर्फ:** पहले 48 घंटों के लिए हर 2-3 घंटे में 15-20 मिनट के लिए आइस पैक लगाएं
-
-• **संपीड़न:** लोचदार पट्टी से लपेटें (बहुत कसकर नहीं)
-
-• **उत्थान:** संभव होने पर चोटिल क्षेत्र को हृदय के स्तर से ऊपर उठाएं"""
-        },
-        "nosebleed": {
-            "english": """**Stopping a Nosebleed Safely:**
-
-• Stay calm and keep person upright (never lie down)
-
-• Lean slightly forward to prevent blood from going down throat
-
-• Pinch soft part of nose firmly for 10 minutes continuously
-
-• Breathe through mouth during this time
-
-• Do not peek or release pressure before 10 minutes
-
-• Apply cold compress to bridge of nose
-
-• After bleeding stops, avoid blowing nose for several hours
-
-• Seek medical help if bleeding doesn't stop after 20 minutes""",
-            "hindi": """**नकसीर को सुरक्षित रूप से रोकना:**
-
-• शांत रहें और व्यक्ति को सीधा रखें (कभी भी लेट न जाएं)
-
-• गले में खून जाने से रोकने के लिए थोड़ा आगे झुकें
-
-• नाक के मुलायम हिस्से को 10 मिनट तक लगातार मजबूती से दबाएं
-
-• इस समय के दौरान मुंह से सांस लें"""
-        },
-        "choking": {
-            "english": """**Emergency Choking Response:**
-
-**FOR CONSCIOUS ADULTS/CHILDREN OVER 1 YEAR:**
-
-• Ask "Are you choking?" - if they cannot speak, act immediately
-
-• Call 911 or have someone else call
-
-• Give 5 sharp back blows between shoulder blades
-
-• If unsuccessful, perform Heimlich maneuver:
-  - Stand behind person, wrap arms around waist
-  - Make fist, place above navel but below ribs
-  - Give 5 quick upward thrusts
-
-• Alternate between back blows and abdominal thrusts
-
-• Continue until object dislodges or person becomes unconscious
-
-**FOR UNCONSCIOUS PERSON:**
-
-• Call 911 immediately
-
-• Begin CPR starting with chest compressions
-
-• Look for object in mouth before giving rescue breaths""",
-            "hindi": """**आपातकालीन घुटन प्रतिक्रिया:**
-
-**सचेत वयस्कों/1 वर्ष से अधिक बच्चों के लिए:**
-
-• पूछें "क्या आप घुट रहे हैं?" - यदि वे बोल नहीं सकते, तुरंत कार्य करें
-
-• 911 कॉल करें या किसी और से कॉल कराएं
-
-• कंधे की ब्लेड के बीच 5 तेज थपकी दें
-
-• यदि असफल, तो हेमलिच मैन्यूवर करें:
-  - व्यक्ति के पीछे खड़े हों, कमर के चारों ओर हाथ लपेटें
-  - मुट्ठी बनाएं, नाभि के ऊपर लेकिन पसलियों के नीचे रखें
-  - 5 त्वरित ऊपर की ओर जोर दें"""
-        },
-        "allergic_reaction": {
-            "english": """**For Allergic Reactions:**
-
-**MILD REACTIONS (rash, itching):**
-
-• Remove or avoid the allergen immediately
-
-• Take antihistamine as directed on package
-
-• Apply cool compresses to affected skin
-
-• Avoid scratching to prevent infection
-
-• Monitor symptoms closely
-
-**SEVERE REACTIONS (difficulty breathing, swelling):**
-
-• Call 911 immediately for anaphylaxis
-
-• Use epinephrine auto-injector if available
-
-• Help person sit up to ease breathing
-
-• Loosen tight clothing
-
-• Do not give anything to drink
-
-• Be prepared to perform CPR if person becomes unconscious""",
-            "hindi": """**एलर्जिक प्रतिक्रियाओं के लिए:**
-
-**हल्की प्रतिक्रियाएं (दाने, खुजली):**
-
-• एलर्जेन को तुरंत हटाएं या उससे बचें
-
-• पैकेज पर निर्देशित एंटीहिस्टामाइन लें
-
-• प्रभावित त्वचा पर ठंडा सेक लगाएं
-
-**गंभीर प्रतिक्रियाएं (सांस लेने में कठिनाई, सूजन):**
-
-• एनाफिलेक्सिस के लिए तुरंत 911 कॉल करें
+# Word tokens, keeping Devanagari vowel signs attached (plain \w splits them off)
+TOKEN_PATTERN = re.compile(r"[\wऀ-ॣ०-ॿ]+")
+# Every ASCII character outside \w, mapped to a space
+ASCII_SEPARATORS = str.maketrans({c: " " for c in map(chr, range(128)) if not (c.isalnum() or c == "_")})
+
+def tokenize(text):
+    """Lowercased word tokens, the same as TOKEN_PATTERN.findall(text.lower())"""
+    text = text.lower()
+    # Most messages are plain ASCII, where translate + split is about twice as fast as the regex
+    if text.isascii():
+        return text.translate(ASCII_SEPARATORS).split()
+    return TOKEN_PATTERN.findall(text)
+
+# Inflected forms folded onto their keyword, listed per keyword: a blanket
+# suffix rule would turn "armed", "heading" or "backing" into body parts
+KEYWORD_INFLECTIONS = {
+    # Symptoms and conditions
+    "headache": ("headaches",), "fever": ("fevers", "feverish"), "cough": ("coughs", "coughing", "coughed"),
+    "ache": ("aches", "aching", "ached"), "pain": ("pains", "painful"), "hurt": ("hurts", "hurting"),
+    "vomit": ("vomits", "vomiting", "vomited"), "cold": ("colds",), "migraine": ("migraines",),
+    "allergy": ("allergies",), "infection": ("infections",),
+    # Body parts: plurals only
+    "eye": ("eyes",), "ear": ("ears",), "leg": ("legs",), "arm": ("arms",), "hand": ("hands",),
+    "foot": ("feet",), "knee": ("knees",), "elbow": ("elbows",), "shoulder": ("shoulders",),
+    # Intent verbs and nouns
+    "choke": ("chokes", "choked"), "cut": ("cuts",), "burn": ("burns", "burned", "burnt"),
+    "wound": ("wounds", "wounded"), "sprain": ("sprains", "sprained"), "injury": ("injuries",),
+    "accident": ("accidents",), "nosebleed": ("nosebleeds",), "feel": ("feels", "feeling"),
+    "have": ("having",), "problem": ("problems",), "exercise": ("exercises", "exercising"),
+    # Hindi oblique plurals
+    "आंख": ("आंखें", "आंखों"), "कान": ("कानों",), "दर्द": ("दर्दों",),
+}
 
-• उपलब्ध होने पर एपिनेफ्रीन ऑटो-इंजेक्टर का उपयोग करें"""
-        }
-    },
-
-    "wellness_tips": [
-        {
-            "english": "💧 HYDRATION: Drink 8-10 glasses of water daily. Carry a reusable bottle and eat water-rich foods.",
-            "hindi": "💧 हाइड्रेशन: प्रतिदिन 8-10 गिलास पानी पिएं। पुन: प्रयोज्य बोतल ले जाएं।"
-        },
-        {
-            "english": "😴 SLEEP: Maintain 7-9 hours of quality sleep with consistent bedtime and wake-up times.",
-            "hindi": "😴 नींद: सुसंगत सोने के समय और जागने के समय के साथ 7-9 घंटे की गुणवत्तापूर्ण नींद बनाए रखें।"
-        }
-    ],
+# Intent keywords in priority order; the first intent with any hit wins
+INTENT_KEYWORDS = [
+    # Greetings (including Hinglish)
+    ("greeting", ['hello', 'hi', 'hey', 'namaste', 'namaskar', 'नमस्ते', 'good morning', 'good evening']),
+    # Farewells (including Hinglish)
+    ("farewell", ['bye', 'goodbye', 'alvida', 'अलविदा', 'thanks', 'thank you', 'धन्यवाद']),
+    # First aid - PRIORITY CHECK
+    ("first_aid", ['choking', 'choke', 'ghut', 'cut', 'kat', 'burn', 'jal', 'bleeding', 'khoon',
+                   'injury', 'accident', 'emergency', 'wound', 'sprain', 'nosebleed', 'allergic']),
+    # Symptoms (also chosen whenever a symptom entity is present)
+    ("symptom", ['feel', 'have', 'experiencing', 'suffering', 'problem']),
+    # Wellness tips
+    ("wellness_tips", ['tips', 'advice', 'healthy', 'wellness', 'exercise', 'nutrition', 'diet', 'fitness']),
+]
+INTENT_PRIORITY = [intent for intent, _ in INTENT_KEYWORDS]
+SYMPTOM_INTENT_RANK = INTENT_PRIORITY.index("symptom")
+INTENT_HIT = "intent"
+
+class KeywordMatcher:
+    """Word-level Aho-Corasick automaton over the intent and health vocabularies.
+
+    Keywords are matched on whole words only, so "pet" no longer fires inside
+    "competition" and "hi" not inside "this". A single left-to-right pass over
+    the message yields the intent hits and every entity category at once.
+    """
+
+    def __init__(self, phrases):
+        # phrases: {phrase: [(category, value), ...]}
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        self._forms = {}
+        for phrase, hits in phrases.items():
+            self._add(phrase, hits)
+        self._build()
+        self._build_forms()
+
+    @classmethod
+    def from_vocabulary(cls, health_entities, hindi_entities, extra_entities=None, intent_keywords=INTENT_KEYWORDS):
+        phrases = {}
+
+        def add(phrase, category, value):
+            hits = phrases.setdefault(phrase.lower(), [])
+            if (category, value) not in hits:
+                hits.append((category, value))
+
+        for rank, (_, keywords) in enumerate(intent_keywords):
+            for keyword in keywords:
+                add(keyword, INTENT_HIT, rank)
+
+        for category, keywords in health_entities.items():
+            for keyword in keywords:
+                add(keyword, category, keyword)
+
+        # Hindi/Hinglish words map to the first category holding their English term
+        for hindi_word, english_word in hindi_entities.items():
+            for category in ("symptoms", "body_parts", "conditions"):
+                if english_word in health_entities.get(category, ()):
+                    add(hindi_word, category, english_word)
+                    break
+
+        for category, keywords in (extra_entities or {}).items():
+            for keyword in keywords:
+                add(keyword, category, keyword)
+
+        return cls(phrases)
+
+    def _add(self, phrase, hits):
+        state = 0
+        for word in TOKEN_PATTERN.findall(phrase):
+            self._forms[word] = word
+            nxt = self._goto[state].get(word)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][word] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = nxt
+        if state:
+            self._out[state] = self._out[state] + tuple(hits)
+
+    def _build(self):
+        pending = list(self._goto[0].values())
+        while pending:
+            state = pending.pop(0)
+            for word, nxt in self._goto[state].items():
+                pending.append(nxt)
+                fail = self._fail[state]
+                while fail and word not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(word, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def _build_forms(self):
+        # Map inflected forms straight to their keyword so lookup is one dict hit;
+        # a form that is itself a keyword keeps its own entry
+        for word, inflections in KEYWORD_INFLECTIONS.items():
+            if word in self._forms:
+                for form in inflections:
+                    self._forms.setdefault(form, word)
+
+    def analyze(self, text):
+        """Return (intent, entities) from one tokenization and one automaton pass"""
+        goto, fail, out, forms = self._goto, self._fail, self._out, self._forms
+        entities = {"symptoms": [], "body_parts": [], "conditions": []}
+        rank = len(INTENT_PRIORITY)
+        state = 0
+        for word in tokenize(text):
+            word = forms.get(word)
+            if word is None:
+                # Not in any keyword, so no match can continue through it
+                state = 0
+                continue
+            while state and word not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(word, 0)
+            for category, value in out[state]:
+                if category == INTENT_HIT:
+                    if value < rank:
+                        rank = value
+                    continue
+                values = entities.setdefault(category, [])
+                if value not in values:
+                    values.append(value)
+        if entities["symptoms"] and rank > SYMPTOM_INTENT_RANK:
+            rank = SYMPTOM_INTENT_RANK
+        intent = INTENT_PRIORITY[rank] if rank < len(INTENT_PRIORITY) else 'general'
+        return intent, entities
+
+    def extract(self, text):
+        return self.analyze(text)[1]
+
+    def words(self, text):
+        """Tokenize text, folding inflected forms onto their keyword"""
+        forms = self._forms
+        return [forms.get(word, word) for word in tokenize(text)]
+
+    def tables(self):
+        """The compiled goto, fail, output and inflection tables, as plain containers"""
+        return self._goto, self._fail, self._out, self._forms
+
+    @classmethod
+    def from_tables(cls, tables):
+        """Restore a matcher from tables() without recompiling the automaton"""
+        matcher = cls.__new__(cls)
+        matcher._goto, matcher._fail, matcher._out, matcher._forms = tables
+        return matcher
+
+# Built-in knowledge base bundle
+# WELLNESS_KB and the entity vocabularies are kept in wellness_kb_source.py.
+# build_kb.py marshals them, together with the compiled keyword matcher tables,
+# into one versioned file that each process loads with a single read.
+KB_SOURCE_PATH = Path(__file__).with_name('wellness_kb_source.py')
+KB_BUNDLE_PATH = Path(os.environ.get('WELLNESS_KB_BUNDLE', Path(__file__).with_name('wellness_kb.bundle')))
+KB_BUNDLE_MAGIC = b'WKB'
+# Bump when the bundle layout changes
+KB_BUNDLE_FORMAT = 1
+
+def kb_source_hash():
+    """Fingerprint of everything the bundle is compiled from"""
+    digest = hashlib.sha256(KB_SOURCE_PATH.read_bytes())
+    digest.update(repr((KB_BUNDLE_FORMAT, INTENT_KEYWORDS, KEYWORD_INFLECTIONS, TOKEN_PATTERN.pattern)).encode())
+    # marshal's format follows the interpreter version
+    digest.update(importlib.util.MAGIC_NUMBER)
+    return digest.hexdigest()
+
+def compile_kb_source():
+    """Run wellness_kb_source.py and compile its vocabularies into matcher tables"""
+    source = runpy.run_path(str(KB_SOURCE_PATH))
+    health_entities, hindi_entities = source['HEALTH_ENTITIES'], source['HINDI_ENTITIES']
+    matcher = KeywordMatcher.from_vocabulary(health_entities, hindi_entities)
+    return source['WELLNESS_KB'], health_entities, hindi_entities, matcher.tables()
+
+def write_kb_bundle(payload, path=KB_BUNDLE_PATH):
+    """Write a compiled payload to path atomically; returns the bytes written"""
+    blob = KB_BUNDLE_MAGIC + kb_source_hash().encode() + b"\n" + marshal.dumps(payload)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(blob)
+    os.replace(tmp_path, path)
+    return len(blob)
+
+def read_kb_bundle(path=KB_BUNDLE_PATH):
+    """The payload stored at path, or None if it is missing, corrupt or stale.
+
+    A bundle deployed without its source file is trusted as is.
+    """
+    try:
+        blob = path.read_bytes()
+    except OSError:
+        return None
+    header, _, body = blob.partition(b"\n")
+    if not header.startswith(KB_BUNDLE_MAGIC):
+        return None
+    if KB_SOURCE_PATH.exists() and header[len(KB_BUNDLE_MAGIC):] != kb_source_hash().encode():
+        return None
+    try:
+        return marshal.loads(body)
+    except (EOFError, ValueError, TypeError):
+        return None
 
-    "greetings": [
-        {
-            "hindi": "**नमस्ते! 🌿 मैं आपका स्वास्थ्य मार्गदर्शक बॉट हूं**\n\nमैं इनमें मदद कर सकता हूं:\n\n• सामान्य लक्षण और देखभाल सलाह\n\n• प्राथमिक चिकित्सा प्रक्रियाएं\n\n• दैनिक स्वास्थ्य सुझाव\n\n• मानसिक स्वास्थ्य सहायता\n\n**आज आप किस स्वास्थ्य विषय पर चर्चा करना चाहेंगे?**",
-            "english": "**Hello! 🌿 I'm your Wellness Guide Bot**\n\nI can help with:\n\n• Common symptoms and care advice\n\n• First aid procedures\n\n• Daily wellness tips\n\n• Mental health support\n\n**What health topic would you like to explore today?**"
-        }
-    ],
+def load_kb_bundle():
+    """Return (WELLNESS_KB, HEALTH_ENTITIES, HINDI_ENTITIES, KeywordMatcher).
 
-    "farewells": [
-        {
-            "hindi": "**अपना ख्याल रखें! 🌿**\n\nयाद रखें:\n\n• हाइड्रेटेड रहें और पर्याप्त आराम करें\n\n• अपने शरीर की सुनें\n\n• जरूरत पड़ने पर पेशेवर चिकित्सा देखभाल लें\n\n**स्वस्थ रहें!**",
-            "english": "**Take care! 🌿**\n\nRemember:\n\n• Stay hydrated and get adequate rest\n\n• Listen to your body\n\n• Seek professional medical care when needed\n\n**Stay healthy!**"
-        }
-    ]
+    Falls back to compiling the source when the bundle is missing or stale,
+    and saves the result for the next process when the directory is writable.
+    """
+    payload = read_kb_bundle()
+    if payload is None:
+        payload = compile_kb_source()
+        try:
+            write_kb_bundle(payload)
+        except OSError:
+            pass
+    wellness_kb, health_entities, hindi_entities, tables = payload
+    return wellness_kb, health_entities, hindi_entities, KeywordMatcher.from_tables(tables)
+
+WELLNESS_KB, HEALTH_ENTITIES, HINDI_ENTITIES, KEYWORD_MATCHER = load_kb_bundle()
+
+# Knowledge base runtime: WELLNESS_KB merged with admin-edited knowledge_base rows
+
+# Admin form content types -> WELLNESS_KB sections
+KB_SECTIONS = {
+    "Symptom": "symptoms",
+    "First Aid": "first_aid",
+    "Wellness Tip": "wellness_tips",
+    "Mental Health": "mental_health"
 }
 
-# Enhanced health entities for extraction including Hinglish
-HEALTH_ENTITIES = {
-    "symptoms": ["headache", "fever", "fatigue", "stress", "anxiety", "cold", "cough", "stomach", "back_pain", "back pain", "nausea", 
-                "pain", "ache", "tired", "sick", "dizzy", "weak", "sore", "hurt", "vomit", "diarrhea"],
-    "body_parts": ["head", "throat", "chest", "stomach", "back", "neck", "shoulder", "leg", "arm", "eye", "ear", "nose", 
-                   "mouth", "tooth", "teeth", "hand", "foot", "knee", "elbow"],
-    "conditions": ["diabetes", "hypertension", "asthma", "allergy", "infection", "flu", "migraine", "cold", "fever", "covid"]
-}
+# Sections served by random choice rather than by topic
+KB_CHOICE_SECTIONS = ("wellness_tips", "greetings", "farewells")
 
-# Enhanced Hindi-English entity mapping including Hinglish
-HINDI_ENTITIES = {
-    # Hindi Devanagari
-    "बुखार": "fever", "सिरदर्द": "headache", "खांसी": "cough", "पेट": "stomach", "दर्द": "pain",
-    "गला": "throat", "आंख": "eye", "कान": "ear", "नाक": "nose", "सिर": "head",
-    "थकान": "fatigue", "तनाव": "stress", "चिंता": "anxiety", "सर्दी": "cold",
-    "पीठ": "back", "मतली": "nausea", "कमजोर": "weak", "चक्कर": "dizzy",
-
-    # Hinglish (Hindi words in English script)
-    "bukaar": "fever", "bukhaar": "fever", "bukhar": "fever", "bukhhar": "fever",
-    "sir": "head", "sir dard": "headache", "sirdard": "headache", 
-    "pet": "stomach", "pet dard": "stomach", "petdard": "stomach",
-    "khansi": "cough", "khasi": "cough",
-    "gala": "throat", "galaa": "throat",
-    "paani": "water", "pani": "water", 
-    "thakan": "fatigue", "thakaan": "fatigue",
-    "tanav": "stress", "tension": "stress",
-    "chinta": "anxiety", "pareshan": "anxiety",
-    "kamjor": "weak", "kamjori": "weak",
-    "chakkar": "dizzy", "chakker": "dizzy",
-    "peeth": "back", "pith": "back",
-    "nazla": "cold", "zukam": "cold", "jukam": "cold"
+# First aid intent keywords that name a topic other than themselves
+FIRST_AID_ALIASES = {
+    "jal": "burn", "kat": "cut", "wound": "cut", "bleeding": "cut", "khoon": "cut",
+    "choke": "choking", "ghut": "choking", "allergic": "allergic_reaction"
 }
 
+KBSnapshot = namedtuple("KBSnapshot", ["version", "entries", "choices"])
+
+def kb_topic_key(topic_name):
+    """Normalize an admin topic name ('Sleep Apnea') to a topic key ('sleep_apnea')"""
+    return "_".join(TOKEN_PATTERN.findall(topic_name.lower()))
+
+def build_kb_snapshot(version, rows=()):
+    """Build an immutable index keyed by (section, topic_key, language).
+
+    rows are knowledge_base (content_type, topic_name, english_content,
+    hindi_content) tuples; they override built-in topics with the same key.
+    """
+    entries = {}
+    choices = {}
+    for section, content in WELLNESS_KB.items():
+        if isinstance(content, dict):
+            for topic_key, texts in content.items():
+                for language, text in texts.items():
+                    entries[(section, topic_key, language)] = text
+        else:
+            for item in content:
+                for language, text in item.items():
+                    choices.setdefault((section, language), []).append(text)
+
+    for content_type, topic_name, english_content, hindi_content in rows:
+        section = KB_SECTIONS.get(content_type, kb_topic_key(content_type or ""))
+        topic_key = kb_topic_key(topic_name or "")
+        if not topic_key:
+            continue
+        for language, text in (("english", english_content), ("hindi", hindi_content)):
+            entries[(section, topic_key, language)] = text
+            if section in KB_CHOICE_SECTIONS:
+                choices.setdefault((section, language), []).append(text)
+
+    return KBSnapshot(
+        version,
+        MappingProxyType(entries),
+        MappingProxyType({key: tuple(texts) for key, texts in choices.items()})
+    )
 
-# Enhanced health entities for extraction including Hinglish
-HEALTH_ENTITIES = {
-    "symptoms": ["headache", "fever", "fatigue", "stress", "anxiety", "cold", "cough", "stomach", "back_pain", "back pain", "nausea", 
-                "pain", "ache", "tired", "sick", "dizzy", "weak", "sore", "hurt", "vomit", "diarrhea"],
-    "body_parts": ["head", "throat", "chest", "stomach", "back", "neck", "shoulder", "leg", "arm", "eye", "ear", "nose", 
-                   "mouth", "tooth", "teeth", "hand", "foot", "knee", "elbow"],
-    "conditions": ["diabetes", "hypertension", "asthma", "allergy", "infection", "flu", "migraine", "cold", "fever", "covid"]
-}
-
-# Enhanced Hindi-English entity mapping including Hinglish
-HINDI_ENTITIES = {
-    # Hindi Devanagari
-    "बुखार": "fever", "सिरदर्द": "headache", "खांसी": "cough", "पेट": "stomach", "दर्द": "pain",
-    "गला": "throat", "आंख": "eye", "कान": "ear", "नाक": "nose", "सिर": "head",
-    "थकान": "fatigue", "तनाव": "stress", "चिंता": "anxiety", "सर्दी": "cold",
-    "पीठ": "back", "मतली": "nausea", "कमजोर": "weak", "चक्कर": "dizzy",
-
-    # Hinglish (Hindi words in English script)
-    "bukaar": "fever", "bukhaar": "fever", "bukhar": "fever", "bukhhar": "fever",
-    "sir": "head", "sir dard": "headache", "sirdard": "headache", 
-    "pet": "stomach", "pet dard": "stomach", "petdard": "stomach",
-    "khansi": "cough", "khasi": "cough",
-    "gala": "throat", "galaa": "throat",
-    "paani": "water", "pani": "water", 
-    "thakan": "fatigue", "thakaan": "fatigue",
-    "tanav": "stress", "tension": "stress",
-    "chinta": "anxiety", "pareshan": "anxiety",
-    "kamjor": "weak", "kamjori": "weak",
-    "chakkar": "dizzy", "chakker": "dizzy",
-    "peeth": "back", "pith": "back",
-    "nazla": "cold", "zukam": "cold", "jukam": "cold"
-}
+KB_SNAPSHOT = build_kb_snapshot(None)
+
+def kb_vocabulary(snapshot):
+    """Symptom keywords contributed by admin-added knowledge base topics"""
+    builtin = WELLNESS_KB["symptoms"]
+    keywords = []
+    for (section, topic_key, language) in snapshot.entries:
+        if section in ("symptoms", "mental_health") and language == "english" and topic_key not in builtin:
+            keywords.append(topic_key.replace("_", " "))
+    return {"symptoms": keywords}
+
+def refresh_keyword_matcher(extra_entities=None):
+    """Recompile the keyword automaton with extra knowledge base vocabulary"""
+    global KEYWORD_MATCHER
+    KEYWORD_MATCHER = KeywordMatcher.from_vocabulary(HEALTH_ENTITIES, HINDI_ENTITIES, extra_entities)
+    return KEYWORD_MATCHER
+
+def read_counter(conn, name):
+    row = conn.execute("SELECT value FROM app_counters WHERE name = ?", (name,)).fetchone()
+    return row[0] if row else 0
+
+def bump_counter(conn, name):
+    """Increment a shared counter inside the caller's transaction"""
+    conn.execute("""
+        INSERT INTO app_counters (name, value) VALUES (?, 1)
+        ON CONFLICT(name) DO UPDATE SET value = value + 1
+    """, (name,))
+
+def sync_knowledge_base():
+    """Rebuild the KB snapshot if another worker (or this one) changed the KB.
+
+    Costs one primary-key read when nothing changed, so it is safe to call on
+    every rerun; responses themselves never touch the database.
+    """
+    global KB_SNAPSHOT
+    try:
+        with get_read_db() as conn:
+            version = read_counter(conn, 'kb_version')
+            if version == KB_SNAPSHOT.version:
+                return KB_SNAPSHOT
+            rows = conn.execute("""
+                SELECT content_type, topic_name, english_content, hindi_content
+                FROM knowledge_base ORDER BY id
+            """).fetchall()
+    except sqlite3.Error:
+        return KB_SNAPSHOT
+
+    snapshot = build_kb_snapshot(version, rows)
+    refresh_keyword_matcher(kb_vocabulary(snapshot))
+    KB_SNAPSHOT = snapshot
+    return snapshot
+
+# Admin data cache
+# Loader results are kept per (function, arguments) together with the
+# (data_generation, chat_generation) counters they were computed at. Writes
+# bump a counter in the same transaction as the write, so the new generation
+# becomes visible to every worker process exactly when the write commits.
+# Feedback, user, KB and admin writes bump data_generation, and an entry from
+# an older one is never served. Chat writes arrive continuously and only
+# bump chat_generation: an entry that is behind on chats alone is still
+# served for ADMIN_CACHE_MIN_AGE seconds, keeping admin clicks fast at the
+# cost of a few seconds' staleness. ADMIN_CACHE_TTL bounds the age of any entry.
+ADMIN_CACHE_TTL = 300
+ADMIN_CACHE_MIN_AGE = 5
+DATA_GENERATION = 'data_generation'
+CHAT_GENERATION = 'chat_generation'
+
+_admin_cache = {}
+_admin_cache_lock = threading.Lock()
+
+def mark_data_changed(conn):
+    """Invalidate every process's admin cache once the caller's transaction commits"""
+    bump_counter(conn, DATA_GENERATION)
+
+def mark_chats_changed(conn):
+    """Let admin caches go stale after ADMIN_CACHE_MIN_AGE, inside the caller's transaction"""
+    bump_counter(conn, CHAT_GENERATION)
+
+def read_generation(conn):
+    """(data_generation, chat_generation) in one query"""
+    counters = dict(conn.execute("SELECT name, value FROM app_counters WHERE name IN (?, ?)",
+                                 (DATA_GENERATION, CHAT_GENERATION)).fetchall())
+    return counters.get(DATA_GENERATION, 0), counters.get(CHAT_GENERATION, 0)
+
+def admin_cached(func):
+    """Decorator serving func(*args) from the admin cache while it is fresh"""
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args):
+        key = (name,) + args
+        # Read the generation before the data, so a load never claims a
+        # generation newer than the rows it saw
+        try:
+            with get_read_db() as conn:
+                generation = read_generation(conn)
+        except sqlite3.Error:
+            return func(*args)
+
+        now = time.monotonic()
+        entry = _admin_cache.get(key)
+        if entry is not None:
+            entry_generation, stored_at, value = entry
+            age = now - stored_at
+            if entry_generation[0] == generation[0] and age < ADMIN_CACHE_TTL and (
+                    entry_generation[1] == generation[1] or age < ADMIN_CACHE_MIN_AGE):
+                return value
+
+        value = func(*args)
+        # Failed loads return None/[] after reporting; don't pin them in the cache
+        if value:
+            with _admin_cache_lock:
+                # A slower load that started before a write must not replace a newer entry
+                current = _admin_cache.get(key)
+                if current is None or current[0] <= generation:
+                    _admin_cache[key] = (generation, now, value)
+        return value
+    return wrapper
+
+# Hinglish - ONLY specific Hinglish words, not common English (matched anywhere in the text)
+HINGLISH_PATTERN = re.compile("|".join(["bukaar", "bukhaar", "bukhar", "sirdard", "petdard", "khansi", "mujhe", "merko", "batao", "bataiye"]))
 
 def detect_language(text):
     """FIXED language detection - English stays English, Hindi stays Hindi"""
-    # Check for Devanagari script (Hindi)
-    hindi_chars = re.findall(r'[ऀ-ॿ]', text)
-    if len(hindi_chars) > 3:  # Need more than 3 Hindi characters to be considered Hindi
-        return 'hindi'
-
-    # Check for Hinglish - ONLY specific Hinglish words, not common English
-    text_lower = text.lower()
-    hinglish_specific = ["bukaar", "bukhaar", "bukhar", "sirdard", "petdard", "khansi", "mujhe", "merko", "batao", "bataiye"]
+    # Check for Devanagari script (Hindi). U+0900-U+097F is exactly the UTF-8
+    # sequences starting E0 A4 / E0 A5, so count those instead of scanning per character
+    if not text.isascii():
+        encoded = text.encode('utf-8', 'surrogatepass')
+        if encoded.count(b'\xe0\xa4') + encoded.count(b'\xe0\xa5') > 3:  # Need more than 3 Hindi characters to be considered Hindi
+            return 'hindi'
 
     # Only consider Hinglish if it has SPECIFIC Hinglish words
-    hinglish_count = sum(1 for word in hinglish_specific if word in text_lower)
-    if hinglish_count >= 1:
+    if HINGLISH_PATTERN.search(text.lower()):
         return 'hinglish'
 
     # Default to English for everything else
@@ -683,63 +841,16 @@ def detect_language(text):
 
 def extract_health_entities(text):
     """Extract health-related entities from text including Hinglish"""
-    text_lower = text.lower()
-    entities = {
-        "symptoms": [],
-        "body_parts": [],
-        "conditions": []
-    }
-
-    # Extract using keyword matching
-    for category, keywords in HEALTH_ENTITIES.items():
-        for keyword in keywords:
-            if keyword in text_lower:
-                entities[category].append(keyword)
-
-    # Extract Hindi/Hinglish entities
-    for hindi_word, english_word in HINDI_ENTITIES.items():
-        if hindi_word.lower() in text_lower:
-            if english_word in HEALTH_ENTITIES["symptoms"]:
-                entities["symptoms"].append(english_word)
-            elif english_word in HEALTH_ENTITIES["body_parts"]:
-                entities["body_parts"].append(english_word)
-            elif english_word in HEALTH_ENTITIES["conditions"]:
-                entities["conditions"].append(english_word)
-
-    # Remove duplicates
-    for category in entities:
-        entities[category] = list(set(entities[category]))
-
-    return entities
+    return KEYWORD_MATCHER.extract(text)
 
 def classify_intent(message):
     """Enhanced intent classification with entity extraction"""
-    message_lower = message.lower()
-    entities = extract_health_entities(message)
-
-    # Check for greetings (including Hinglish)
-    if any(word in message_lower for word in ['hello', 'hi', 'hey', 'namaste', 'namaskar', 'नमस्ते', 'good morning', 'good evening']):
-        return 'greeting', entities
-
-    # Check for farewells (including Hinglish)
-    elif any(word in message_lower for word in ['bye', 'goodbye', 'alvida', 'अलविदा', 'thanks', 'thank you', 'धन्यवाद']):
-        return 'farewell', entities
+    return KEYWORD_MATCHER.analyze(message)
 
-    # Check for first aid - PRIORITY CHECK
-    elif any(word in message_lower for word in ['choking', 'choke', 'ghut', 'cut', 'kat', 'burn', 'jal', 'bleeding', 'khoon', 
-                                                 'injury', 'accident', 'emergency', 'wound', 'sprain', 'nosebleed', 'allergic']):
-        return 'first_aid', entities
-
-    # Check for symptoms (including Hinglish)
-    elif entities["symptoms"] or any(word in message_lower for word in ['feel', 'have', 'experiencing', 'suffering', 'problem']):
-        return 'symptom', entities
-
-    # Check for wellness tips
-    elif any(word in message_lower for word in ['tips', 'advice', 'healthy', 'wellness', 'exercise', 'nutrition', 'diet', 'fitness']):
-        return 'wellness_tips', entities
-
-    else:
-        return 'general', entities
+def classify_many(messages):
+    """Classify a batch of messages against one precompiled matcher"""
+    analyze = KEYWORD_MATCHER.analyze
+    return [analyze(message) for message in messages]
 
 def generate_safe_response(intent, entities, original_message, is_hindi_hinglish=False):
     """Generate safe, ethical responses with disclaimers"""
@@ -747,35 +858,34 @@ def generate_safe_response(intent, entities, original_message, is_hindi_hinglish
     disclaimer = "\n\n⚠️ **Medical Disclaimer:** This is general wellness information only, not professional medical advice. Please consult a qualified healthcare provider for proper diagnosis and treatment."
     hindi_disclaimer = "\n\n⚠️ **चिकित्सा अस्वीकरण:** यह केवल सामान्य स्वास्थ्य जानकारी है, पेशेवर चिकित्सा सलाह नहीं। कृपया उचित निदान और उपचार के लिए योग्य स्वास्थ्य सेवा प्रदाता से परामर्श लें।"
 
+    kb = KB_SNAPSHOT
+    language = 'hindi' if is_hindi_hinglish else 'english'
+
     if intent == 'greeting':
-        greeting_item = random.choice(WELLNESS_KB['greetings'])
-        return greeting_item['hindi'] if is_hindi_hinglish else greeting_item['english']
+        return random.choice(kb.choices[('greetings', language)])
 
     elif intent == 'farewell':
-        farewell_item = random.choice(WELLNESS_KB['farewells'])
-        return farewell_item['hindi'] if is_hindi_hinglish else farewell_item['english']
+        return random.choice(kb.choices[('farewells', language)])
 
     elif intent == 'first_aid':
         # Check specific first aid keywords in message
-        message_lower = original_message.lower()
-
-        if 'burn' in message_lower or 'jal' in message_lower:
-            response_text = WELLNESS_KB['first_aid']['burn']['hindi' if is_hindi_hinglish else 'english']
-            return response_text + (hindi_disclaimer if is_hindi_hinglish else disclaimer)
+        for word in KEYWORD_MATCHER.words(original_message):
+            response_text = kb.entries.get(('first_aid', FIRST_AID_ALIASES.get(word, word), language))
+            if response_text:
+                return response_text + (hindi_disclaimer if is_hindi_hinglish else disclaimer)
 
-        else:
-            if is_hindi_hinglish:
-                return f"मैं जलने, कटने, मोच, नकसीर, घुटन और एलर्जिक प्रतिक्रियाओं के लिए प्राथमिक चिकित्सा मार्गदर्शन प्रदान कर सकता हूं। कृपया आपातकाल के प्रकार को निर्दिष्ट करें।{hindi_disclaimer}"
-            return f"I can provide first aid guidance for burns, cuts, sprains, nosebleeds, choking, and allergic reactions. Please specify the type of emergency.{disclaimer}"
+        if is_hindi_hinglish:
+            return f"मैं जलने, कटने, मोच, नकसीर, घुटन और एलर्जिक प्रतिक्रियाओं के लिए प्राथमिक चिकित्सा मार्गदर्शन प्रदान कर सकता हूं। कृपया आपातकाल के प्रकार को निर्दिष्ट करें।{hindi_disclaimer}"
+        return f"I can provide first aid guidance for burns, cuts, sprains, nosebleeds, choking, and allergic reactions. Please specify the type of emergency.{disclaimer}"
 
     elif intent == 'symptom':
         if entities["symptoms"]:
             responses = []
             for symptom in entities["symptoms"]:
                 symptom_clean = symptom.replace('_', ' ').replace(' ', '_')
-                if symptom_clean in WELLNESS_KB['symptoms']:
-                    info = WELLNESS_KB['symptoms'][symptom_clean]
-                    response_text = info['hindi' if is_hindi_hinglish else 'english']
+                response_text = (kb.entries.get(('symptoms', symptom_clean, language)) or
+                                 kb.entries.get(('mental_health', symptom_clean, language)))
+                if response_text:
                     responses.append(response_text)
 
             if responses:
@@ -788,8 +898,7 @@ def generate_safe_response(intent, entities, original_message, is_hindi_hinglish
         return f"I understand you're experiencing symptoms. Please describe your symptoms more specifically so I can provide better guidance.{disclaimer}"
 
     elif intent == 'wellness_tips':
-        tip_item = random.choice(WELLNESS_KB['wellness_tips'])
-        tip = tip_item['hindi' if is_hindi_hinglish else 'english']
+        tip = random.choice(kb.choices[('wellness_tips', language)])
         return f"{tip}{hindi_disclaimer if is_hindi_hinglish else disclaimer}"
 
     else:
@@ -797,9 +906,8 @@ def generate_safe_response(intent, entities, original_message, is_hindi_hinglish
             return f"मैं स्वास्थ्य और कल्याण के सवालों में मदद करने के लिए यहां हूं। मुझसे लक्षण, प्राथमिक चिकित्सा, या स्वास्थ्य सुझाव के बारे में पूछें।{hindi_disclaimer}"
         return f"I'm here to help with health and wellness questions. Ask me about symptoms, first aid, or wellness tips.{disclaimer}"
 
-def load_css():
-    st.markdown("""
-    <style>
+# App stylesheet, injected by load_css
+APP_CSS = """
     .stApp { background: linear-gradient(135deg, #E6D5F5 0%, #C8A2E0 100%); }
     .main-header {
         background: linear-gradient(90deg, #FF6B6B, #4ECDC4, #45B7D1);
@@ -888,125 +996,613 @@ def load_css():
     .metric-box h3, .metric-box p {
         color: black !important;
     }
-    </style>
-    """, unsafe_allow_html=True)
+"""
+
+@functools.lru_cache(maxsize=1)
+def css_markup():
+    """Minified <style> block, built once per process and tagged with its content hash"""
+    minified = re.sub(r"/\*.*?\*/", "", APP_CSS, flags=re.DOTALL)
+    minified = re.sub(r"\s*([{};:,])\s*", r"\1", re.sub(r"\s+", " ", minified)).strip()
+    digest = hashlib.sha256(minified.encode()).hexdigest()[:12]
+    return f'<style id="wellness-css-{digest}">{minified}</style>'
+
+def load_css():
+    # Streamlit drops elements a rerun doesn't emit, so the style block is sent
+    # every time; st.html routes style-only HTML outside the page layout
+    st.html(css_markup())
 
 def init_database():
-    conn = sqlite3.connect('milestone4_wellness_chatbot.db')
-    cursor = conn.cursor()
+    with get_db() as conn:
+        cursor = conn.cursor()
 
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            email TEXT UNIQUE NOT NULL,
-            password_hash TEXT NOT NULL,
-            full_name TEXT NOT NULL,
-            preferred_language TEXT DEFAULT 'english',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            age INTEGER,
-            gender TEXT,
-            height_cm INTEGER,
-            weight_kg REAL,
-            blood_pressure_systolic INTEGER,
-            blood_pressure_diastolic INTEGER,
-            health_goals TEXT,
-            medical_conditions TEXT,
-            allergies TEXT,
-            emergency_contact TEXT,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                email TEXT UNIQUE NOT NULL,
+                password_hash TEXT NOT NULL,
+                full_name TEXT NOT NULL,
+                preferred_language TEXT DEFAULT 'english',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                age INTEGER,
+                gender TEXT,
+                height_cm INTEGER,
+                weight_kg REAL,
+                blood_pressure_systolic INTEGER,
+                blood_pressure_diastolic INTEGER,
+                health_goals TEXT,
+                medical_conditions TEXT,
+                allergies TEXT,
+                emergency_contact TEXT,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                chat_count INTEGER NOT NULL DEFAULT 0,
+                last_activity TIMESTAMP
+            )
+        """)
 
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS chat_history (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            message TEXT NOT NULL,
-            response TEXT NOT NULL,
-            detected_entities TEXT,
-            intent TEXT,
-            language TEXT DEFAULT 'english',
-            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users (id)
-        )
-    """)
+        # Each distinct response is stored once, keyed by response_hash()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS response_bodies (
+                hash BLOB PRIMARY KEY,
+                body TEXT NOT NULL
+            )
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS chat_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                message TEXT NOT NULL,
+                response_hash BLOB NOT NULL,
+                detected_entities TEXT,
+                entity_mask INTEGER NOT NULL DEFAULT 0,
+                intent TEXT,
+                language TEXT DEFAULT 'english',
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users (id),
+                FOREIGN KEY (response_hash) REFERENCES response_bodies (hash)
+            )
+        """)
+
+        # Interned (entity_type, entity_value) pairs; chats link to them by id
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS entities (
+                id INTEGER PRIMARY KEY,
+                entity_type TEXT NOT NULL,
+                entity_value TEXT NOT NULL,
+                UNIQUE (entity_type, entity_value)
+            )
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS chat_entities (
+                chat_id INTEGER NOT NULL,
+                entity_id INTEGER NOT NULL,
+                PRIMARY KEY (chat_id, entity_id),
+                FOREIGN KEY (chat_id) REFERENCES chat_history (id),
+                FOREIGN KEY (entity_id) REFERENCES entities (id)
+            ) WITHOUT ROWID
+        """)
+
+        # Admin-specific tables
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS admin_logs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                admin_email TEXT NOT NULL,
+                action TEXT NOT NULL,
+                details TEXT,
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        # Knowledge Base Management Table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS knowledge_base (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                content_type TEXT NOT NULL,
+                topic_key TEXT NOT NULL UNIQUE,
+                topic_name TEXT NOT NULL,
+                english_content TEXT NOT NULL,
+                hindi_content TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                created_by TEXT
+            )
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS system_feedback (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER,
+                feedback_type TEXT NOT NULL,
+                rating INTEGER,
+                comments TEXT,
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users (id)
+            )
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS response_feedback (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                chat_message_id INTEGER,
+                feedback_type TEXT NOT NULL,
+                rating INTEGER,
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users (id)
+            )
+        """)
+
+        # Shared counters (e.g. kb_version) that tell every worker when to rebuild caches
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS app_counters (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+
+        # Timing spans flushed from the in-memory perf buffer (see record_perf)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS perf_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ts TIMESTAMP NOT NULL,
+                request_id TEXT,
+                stage TEXT NOT NULL,
+                intent TEXT,
+                duration_us REAL NOT NULL
+            )
+        """)
+
+        # Analytics rollups (see catch_up_rollups)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS rollup_daily_chats (
+                day TEXT NOT NULL,
+                language TEXT NOT NULL,
+                intent TEXT NOT NULL,
+                messages INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, language, intent)
+            )
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS rollup_hourly_chats (
+                day TEXT NOT NULL,
+                hour INTEGER NOT NULL,
+                messages INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, hour)
+            )
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS rollup_daily_users (
+                day TEXT NOT NULL,
+                user_id INTEGER NOT NULL,
+                messages INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, user_id)
+            )
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS rollup_daily_entities (
+                day TEXT NOT NULL,
+                entity_id INTEGER NOT NULL,
+                mentions INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, entity_id)
+            )
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS rollup_user_entities (
+                user_id INTEGER NOT NULL,
+                entity_id INTEGER NOT NULL,
+                mentions INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (user_id, entity_id)
+            )
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS rollup_daily_entity_masks (
+                day TEXT NOT NULL,
+                entity_mask INTEGER NOT NULL,
+                messages INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, entity_mask)
+            )
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS rollup_daily_feedback (
+                day TEXT NOT NULL,
+                feedback_type TEXT NOT NULL,
+                feedback_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, feedback_type)
+            )
+        """)
+
+        run_migrations(conn)
+        # Upgraded databases (and bulk-loaded ones) start with current rollups
+        catch_up_rollups(conn)
+
+# Databases this process has already checked or initialized
+_initialized_dbs = set()
+_init_lock = threading.Lock()
 
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS entity_logs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            entity_type TEXT NOT NULL,
-            entity_value TEXT NOT NULL,
-            context TEXT,
-            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users (id)
+def ensure_database():
+    """Once per process (and database path): create/migrate the schema if it is behind.
+
+    Every schema change bumps SCHEMA_VERSION, so a database already at that
+    version needs none of init_database's CREATE TABLE statements. Later
+    reruns return after a set lookup.
+    """
+    if DB_PATH in _initialized_dbs:
+        return False
+    with _init_lock:
+        if DB_PATH in _initialized_dbs:
+            return False
+        try:
+            with get_read_db() as conn:
+                current = conn.execute("PRAGMA user_version").fetchone()[0]
+        except sqlite3.Error:
+            # No database file yet (the read-only pool can't create one)
+            current = 0
+        if current < SCHEMA_VERSION:
+            init_database()
+        _initialized_dbs.add(DB_PATH)
+        return current < SCHEMA_VERSION
+
+# Schema migrations, tracked with PRAGMA user_version.
+# Each step runs once, in its own transaction; append new steps, never edit old ones.
+
+def _migration_1_indexes(conn):
+    # Indexed day column so time-range filters can use an index instead of DATE(timestamp)
+    columns = [row[1] for row in conn.execute("PRAGMA table_xinfo(chat_history)")]
+    if 'day' not in columns:
+        conn.execute("""
+            ALTER TABLE chat_history
+            ADD COLUMN day TEXT GENERATED ALWAYS AS (substr(timestamp, 1, 10)) VIRTUAL
+        """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_history_user_time ON chat_history (user_id, timestamp)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_history_day ON chat_history (day)")
+    # entity_logs is gone from fresh databases (see migration 5)
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'entity_logs'").fetchone():
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_entity_logs_user_entity ON entity_logs (user_id, entity_type, entity_value)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_response_feedback_time ON response_feedback (timestamp)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_users_created ON users (created_at)")
+
+def _migration_2_feedback_unique(conn):
+    # One vote per (user, message): keep the latest row, then enforce it
+    conn.execute("""
+        DELETE FROM response_feedback
+        WHERE chat_message_id IS NOT NULL AND id NOT IN (
+            SELECT MAX(id) FROM response_feedback
+            WHERE chat_message_id IS NOT NULL
+            GROUP BY user_id, chat_message_id
         )
     """)
+    conn.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_response_feedback_user_message
+        ON response_feedback (user_id, chat_message_id)
+    """)
+    rebuild_feedback_rollups(conn)
 
-    # Admin-specific tables
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS admin_logs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            admin_email TEXT NOT NULL,
-            action TEXT NOT NULL,
-            details TEXT,
-            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
+def _migration_3_perf_events_indexes(conn):
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_perf_events_ts ON perf_events (ts)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_perf_events_stage_ts ON perf_events (stage, ts)")
+
+def _migration_4_response_bodies(conn):
+    # Move response text into response_bodies, one row per distinct response
+    columns = [row[1] for row in conn.execute("PRAGMA table_xinfo(chat_history)")]
+    if 'response' not in columns:
+        return
+    conn.create_function('body_hash', 1, response_hash, deterministic=True)
+    conn.execute("ALTER TABLE chat_history ADD COLUMN response_hash BLOB REFERENCES response_bodies (hash)")
+    conn.execute("UPDATE chat_history SET response_hash = body_hash(response)")
+    # Plain INSERT: a row that doesn't fit must abort here, before the column is dropped
+    conn.execute("""
+        INSERT INTO response_bodies (hash, body)
+        SELECT response_hash, MIN(response) FROM chat_history GROUP BY response_hash
     """)
+    conn.execute("ALTER TABLE chat_history DROP COLUMN response")
+
+def _migration_5_chat_entities(conn):
+    # Replace entity_logs (type, value and the whole message per entity) with
+    # interned entity ids linked to chats; rebuilt from each chat's detected_entities
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'entity_logs'").fetchone():
+        conn.execute("""
+            INSERT OR IGNORE INTO entities (entity_type, entity_value)
+            SELECT DISTINCT cat.key, val.value
+            FROM chat_history ch, json_each(ch.detected_entities) cat, json_each(cat.value) val
+            WHERE ch.detected_entities IS NOT NULL
+        """)
+        conn.execute("""
+            INSERT OR IGNORE INTO chat_entities (chat_id, entity_id)
+            SELECT ch.id, e.id
+            FROM chat_history ch, json_each(ch.detected_entities) cat, json_each(cat.value) val
+            JOIN entities e ON e.entity_type = cat.key AND e.entity_value = val.value
+            WHERE ch.detected_entities IS NOT NULL
+        """)
+        conn.execute("DROP TABLE entity_logs")
+
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(rollup_daily_entities)")]
+    if 'entity_type' in columns:
+        conn.execute("DROP TABLE rollup_daily_entities")
+        conn.execute("""
+            CREATE TABLE rollup_daily_entities (
+                day TEXT NOT NULL,
+                entity_id INTEGER NOT NULL,
+                mentions INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, entity_id)
+            )
+        """)
+        # Refill up to the high-water mark; catch_up_rollups handles the rest
+        conn.execute("""
+            INSERT INTO rollup_daily_entities (day, entity_id, mentions)
+            SELECT ch.day, ce.entity_id, COUNT(*)
+            FROM chat_entities ce JOIN chat_history ch ON ch.id = ce.chat_id
+            WHERE ch.id <= COALESCE((SELECT value FROM app_counters WHERE name = 'rollup_chat_hwm'), 0)
+            GROUP BY 1, 2
+        """)
+        conn.execute("DELETE FROM rollup_user_entities")
+        conn.execute("""
+            INSERT INTO rollup_user_entities (user_id, entity_id, mentions)
+            SELECT ch.user_id, ce.entity_id, COUNT(*)
+            FROM chat_entities ce JOIN chat_history ch ON ch.id = ce.chat_id
+            WHERE ch.id <= COALESCE((SELECT value FROM app_counters WHERE name = 'rollup_chat_hwm'), 0)
+            GROUP BY 1, 2
+        """)
 
-    # Knowledge Base Management Table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS knowledge_base (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            content_type TEXT NOT NULL,
-            topic_key TEXT NOT NULL UNIQUE,
-            topic_name TEXT NOT NULL,
-            english_content TEXT NOT NULL,
-            hindi_content TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            created_by TEXT
+def _migration_6_entity_masks(conn):
+    # Per-chat entity bitmask (bit entity_id - 1) and its daily rollup, for vectorized analytics
+    columns = [row[1] for row in conn.execute("PRAGMA table_xinfo(chat_history)")]
+    if 'entity_mask' in columns:
+        return
+    conn.execute("ALTER TABLE chat_history ADD COLUMN entity_mask INTEGER NOT NULL DEFAULT 0")
+    conn.execute(f"""
+        UPDATE chat_history SET entity_mask = (
+            SELECT COALESCE(SUM(1 << (entity_id - 1)), 0) FROM chat_entities
+            WHERE chat_id = chat_history.id AND entity_id <= {ENTITY_MASK_BITS}
         )
+        WHERE id IN (SELECT chat_id FROM chat_entities)
+    """)
+    conn.execute("DELETE FROM rollup_daily_entity_masks")
+    conn.execute("""
+        INSERT INTO rollup_daily_entity_masks (day, entity_mask, messages)
+        SELECT day, entity_mask, COUNT(*)
+        FROM chat_history
+        WHERE entity_mask != 0
+          AND id <= COALESCE((SELECT value FROM app_counters WHERE name = 'rollup_chat_hwm'), 0)
+        GROUP BY 1, 2
     """)
 
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS system_feedback (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER,
-            feedback_type TEXT NOT NULL,
-            rating INTEGER,
-            comments TEXT,
-            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users (id)
+def _migration_7_history_pages(conn):
+    # Short previews for the history list, stored ahead of the body so reading
+    # them never walks the body's overflow pages; an index on user_id
+    # (ordered by (user_id, rowid)) serves the keyset pages on ch.id
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(response_bodies)")]
+    if 'preview' not in columns:
+        conn.create_function('preview', 1, response_preview, deterministic=True)
+        conn.execute("""
+            CREATE TABLE response_bodies_new (
+                hash BLOB PRIMARY KEY,
+                preview TEXT NOT NULL,
+                body TEXT NOT NULL
+            )
+        """)
+        conn.execute("""
+            INSERT INTO response_bodies_new (hash, preview, body)
+            SELECT hash, preview(body), body FROM response_bodies
+        """)
+        conn.execute("DROP TABLE response_bodies")
+        conn.execute("ALTER TABLE response_bodies_new RENAME TO response_bodies")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_history_user_id ON chat_history (user_id)")
+
+def _migration_8_chat_search(conn):
+    # Trigram FTS5 indexes over chat messages and response bodies (see search_chats).
+    # response_bodies gets a stable integer id: VACUUM may renumber an implicit rowid
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(response_bodies)")]
+    if 'id' not in columns:
+        conn.execute("""
+            CREATE TABLE response_bodies_new (
+                id INTEGER PRIMARY KEY,
+                hash BLOB NOT NULL UNIQUE,
+                preview TEXT NOT NULL,
+                body TEXT NOT NULL
+            )
+        """)
+        conn.execute("""
+            INSERT INTO response_bodies_new (id, hash, preview, body)
+            SELECT rowid, hash, preview, body FROM response_bodies
+        """)
+        conn.execute("DROP TABLE response_bodies")
+        conn.execute("ALTER TABLE response_bodies_new RENAME TO response_bodies")
+
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS response_search USING fts5(
+            body, content='response_bodies', content_rowid='id', tokenize='trigram'
         )
     """)
+    conn.execute("INSERT INTO response_search (response_search) VALUES ('rebuild')")
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS response_bodies_search_insert AFTER INSERT ON response_bodies BEGIN
+            INSERT INTO response_search (rowid, body) VALUES (new.id, new.body);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS response_bodies_search_delete AFTER DELETE ON response_bodies BEGIN
+            INSERT INTO response_search (response_search, rowid, body) VALUES ('delete', old.id, old.body);
+        END
+    """)
 
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS response_feedback (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            chat_message_id INTEGER,
-            feedback_type TEXT NOT NULL,
-            rating INTEGER,
-            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users (id)
+    # One row per chat: the message plus single-token owner and reply columns
+    conn.execute(f"""
+        CREATE VIEW IF NOT EXISTS chat_search_content AS
+        SELECT ch.id, ch.message,
+               {SEARCH_TOKEN_SQL.format('ch.user_id')} AS owner,
+               {SEARCH_TOKEN_SQL.format('rb.id')} AS reply
+        FROM chat_history ch LEFT JOIN response_bodies rb ON rb.hash = ch.response_hash
+    """)
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS chat_search USING fts5(
+            message, owner, reply, content='chat_search_content', content_rowid='id', tokenize='trigram'
         )
     """)
+    conn.execute("INSERT INTO chat_search (chat_search) VALUES ('rebuild')")
+    # Index entries are removed with the values they were added with, read
+    # through the view before the row changes
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS chat_history_search_insert AFTER INSERT ON chat_history BEGIN
+            INSERT INTO chat_search (rowid, message, owner, reply)
+            SELECT id, message, owner, reply FROM chat_search_content WHERE id = new.id;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS chat_history_search_delete BEFORE DELETE ON chat_history BEGIN
+            INSERT INTO chat_search (chat_search, rowid, message, owner, reply)
+            SELECT 'delete', id, message, owner, reply FROM chat_search_content WHERE id = old.id;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS chat_history_search_unindex
+        BEFORE UPDATE OF message, user_id, response_hash ON chat_history BEGIN
+            INSERT INTO chat_search (chat_search, rowid, message, owner, reply)
+            SELECT 'delete', id, message, owner, reply FROM chat_search_content WHERE id = old.id;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS chat_history_search_reindex
+        AFTER UPDATE OF message, user_id, response_hash ON chat_history BEGIN
+            INSERT INTO chat_search (rowid, message, owner, reply)
+            SELECT id, message, owner, reply FROM chat_search_content WHERE id = new.id;
+        END
+    """)
+
+def _migration_9_user_activity(conn):
+    # Per-user chat_count/last_activity kept with the rollups, and NOCASE
+    # indexes for prefix search, so user management pages never join chat_history
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(users)")]
+    if 'chat_count' not in columns:
+        conn.execute("ALTER TABLE users ADD COLUMN chat_count INTEGER NOT NULL DEFAULT 0")
+        conn.execute("ALTER TABLE users ADD COLUMN last_activity TIMESTAMP")
+        # Fill up to the high-water mark; catch_up_rollups handles the rest
+        conn.execute("""
+            UPDATE users SET chat_count = totals.chats, last_activity = totals.last_activity
+            FROM (
+                SELECT user_id, COUNT(*) AS chats, MAX(timestamp) AS last_activity
+                FROM chat_history
+                WHERE id <= COALESCE((SELECT value FROM app_counters WHERE name = 'rollup_chat_hwm'), 0)
+                GROUP BY user_id
+            ) totals
+            WHERE users.id = totals.user_id
+        """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_users_email_nocase ON users (email COLLATE NOCASE)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_users_name_nocase ON users (full_name COLLATE NOCASE)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_users_last_activity ON users (last_activity)")
+
+MIGRATIONS = [
+    (1, _migration_1_indexes),
+    (2, _migration_2_feedback_unique),
+    (3, _migration_3_perf_events_indexes),
+    (4, _migration_4_response_bodies),
+    (5, _migration_5_chat_entities),
+    (6, _migration_6_entity_masks),
+    (7, _migration_7_history_pages),
+    (8, _migration_8_chat_search),
+    (9, _migration_9_user_activity),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+def run_migrations(conn):
+    """Bring the schema up to SCHEMA_VERSION; returns the version found on entry"""
+    if conn.in_transaction:
+        conn.commit()
+    start = conn.execute("PRAGMA user_version").fetchone()[0]
+    for version, migrate in MIGRATIONS:
+        # Re-check under the write lock in case another worker migrated first
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("PRAGMA user_version").fetchone()[0] < version:
+                migrate(conn)
+                conn.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+        except:
+            conn.rollback()
+            raise
+    return start
+
+# Hot queries and sample parameters, checked with EXPLAIN QUERY PLAN
+HOT_QUERIES = {
+    "get_chat_history_page": ("""
+        SELECT ch.id, ch.message, rb.preview, ch.intent, ch.language, ch.timestamp
+        FROM chat_history ch LEFT JOIN response_bodies rb ON rb.hash = ch.response_hash
+        WHERE ch.user_id = ? AND ch.id < ? ORDER BY ch.id DESC LIMIT ?
+    """, (1, 1000, 21)),
+    "get_user_page": ("""
+        SELECT id, email, full_name, preferred_language, created_at, chat_count, last_activity
+        FROM users WHERE (created_at, id) < (?, ?) ORDER BY created_at DESC, id DESC LIMIT ?
+    """, ('2100-01-01', 1, 51)),
+    "get_user_page[email prefix]": ("""
+        SELECT id, email, full_name, preferred_language, created_at, chat_count, last_activity
+        FROM users
+        WHERE email >= ? COLLATE NOCASE AND email < ? COLLATE NOCASE
+          AND (email > ? COLLATE NOCASE OR (email = ? COLLATE NOCASE AND id > ?))
+        ORDER BY email COLLATE NOCASE, id LIMIT ?
+    """, ('user1', 'user1\U0010ffff', 'user1', 'user1', 1, 51)),
+    "active_users_7d": ("""
+        SELECT COUNT(*) FROM users WHERE last_activity >= ?
+    """, ('2000-01-01',)),
+    "get_user_entity_stats": ("""
+        SELECT entity_id, mentions FROM rollup_user_entities
+        WHERE user_id = ? ORDER BY mentions DESC LIMIT 10
+    """, (1,)),
+    "save_response_feedback": ("""
+        SELECT id, feedback_type, DATE(timestamp) FROM response_feedback 
+        WHERE user_id = ? AND chat_message_id = ?
+    """, (1, 1)),
+    "chat_volume_by_day": ("""
+        SELECT day, COUNT(*) FROM chat_history WHERE day >= ? GROUP BY day
+    """, ('2000-01-01',)),
+    "remove_user_rollups": ("""
+        SELECT COUNT(*) FROM chat_history WHERE user_id = ?
+    """, (1,)),
+    "recent_feedback": ("""
+        SELECT rf.feedback_type, ch.message
+        FROM response_feedback rf
+        LEFT JOIN chat_history ch ON rf.chat_message_id = ch.id
+        ORDER BY rf.timestamp DESC LIMIT 50
+    """, ()),
+    "new_users_week": ("""
+        SELECT COUNT(*) FROM users WHERE created_at >= ?
+    """, ('2000-01-01 00:00:00',)),
+    "entity_mask_window": ("""
+        SELECT entity_mask, SUM(messages) FROM rollup_daily_entity_masks
+        WHERE day >= ? GROUP BY entity_mask
+    """, ('2000-01-01',)),
+    "perf_events_window": ("""
+        SELECT stage, intent, duration_us FROM perf_events WHERE ts >= ?
+    """, ('2000-01-01 00:00:00',)),
+}
+
+def explain_hot_queries(conn):
+    """Return (name, plan, uses_index) for every hot query.
 
-    conn.commit()
-    conn.close()
+    A query passes when no step of its plan is a bare table SCAN; every
+    table access must go through an index or the rowid.
+    """
+    results = []
+    for name, (sql, params) in HOT_QUERIES.items():
+        details = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+        full_scan = any(detail.startswith("SCAN ") and " USING " not in detail for detail in details)
+        results.append((name, "; ".join(details), not full_scan))
+    return results
 
 def create_user(email, password, full_name, preferred_language='english'):
     try:
-        conn = sqlite3.connect('milestone4_wellness_chatbot.db')
-        cursor = conn.cursor()
         password_hash = hash_password(password)
-        cursor.execute("""
-            INSERT INTO users (email, password_hash, full_name, preferred_language)
-            VALUES (?, ?, ?, ?)
-        """, (email, password_hash, full_name, preferred_language))
-        conn.commit()
-        conn.close()
+        with get_db() as conn:
+            conn.execute("""
+                INSERT INTO users (email, password_hash, full_name, preferred_language)
+                VALUES (?, ?, ?, ?)
+            """, (email, password_hash, full_name, preferred_language))
+            mark_data_changed(conn)
         return True, "Account created successfully"
     except sqlite3.IntegrityError:
         return False, "Email already exists"
@@ -1043,83 +1639,266 @@ def authenticate_user(email, password):
     except Exception as e:
         return False, f"Error: {str(e)}"
 
+# Analytics rollups
+# Small per-day/per-hour/per-user aggregate tables kept current from chat and feedback
+# writes, so admin views never scan chat_history, chat_entities or response_feedback.
+
+def _apply_chat_rollups(conn, where_sql, params, sign=1):
+    """Add (sign=1) or remove (sign=-1) the chat_history rows matching where_sql.
+
+    Also keeps users.chat_count and last_activity. Rows are only ever removed
+    a whole user at a time, so a user's last_activity is cleared when the
+    count reaches zero and otherwise left alone on removal.
+    """
+    conn.execute(f"""
+        INSERT INTO rollup_daily_chats (day, language, intent, messages)
+        SELECT day, COALESCE(language, 'english'), COALESCE(intent, 'unknown'), {sign} * COUNT(*)
+        FROM chat_history WHERE {where_sql}
+        GROUP BY 1, 2, 3
+        ON CONFLICT(day, language, intent) DO UPDATE SET messages = messages + excluded.messages
+    """, params)
+    conn.execute(f"""
+        INSERT INTO rollup_hourly_chats (day, hour, messages)
+        SELECT day, CAST(strftime('%H', timestamp) AS INTEGER), {sign} * COUNT(*)
+        FROM chat_history WHERE {where_sql}
+        GROUP BY 1, 2
+        ON CONFLICT(day, hour) DO UPDATE SET messages = messages + excluded.messages
+    """, params)
+    conn.execute(f"""
+        INSERT INTO rollup_daily_users (day, user_id, messages)
+        SELECT day, user_id, {sign} * COUNT(*)
+        FROM chat_history WHERE {where_sql}
+        GROUP BY 1, 2
+        ON CONFLICT(day, user_id) DO UPDATE SET messages = messages + excluded.messages
+    """, params)
+    conn.execute(f"""
+        INSERT INTO rollup_daily_entities (day, entity_id, mentions)
+        SELECT ch.day, ce.entity_id, {sign} * COUNT(*)
+        FROM (SELECT id, day FROM chat_history WHERE {where_sql}) ch
+        JOIN chat_entities ce ON ce.chat_id = ch.id
+        GROUP BY 1, 2
+        ON CONFLICT(day, entity_id) DO UPDATE SET mentions = mentions + excluded.mentions
+    """, params)
+    conn.execute(f"""
+        INSERT INTO rollup_user_entities (user_id, entity_id, mentions)
+        SELECT ch.user_id, ce.entity_id, {sign} * COUNT(*)
+        FROM (SELECT id, user_id FROM chat_history WHERE {where_sql}) ch
+        JOIN chat_entities ce ON ce.chat_id = ch.id
+        GROUP BY 1, 2
+        ON CONFLICT(user_id, entity_id) DO UPDATE SET mentions = mentions + excluded.mentions
+    """, params)
+    conn.execute(f"""
+        INSERT INTO rollup_daily_entity_masks (day, entity_mask, messages)
+        SELECT day, entity_mask, {sign} * COUNT(*)
+        FROM chat_history WHERE entity_mask != 0 AND {where_sql}
+        GROUP BY 1, 2
+        ON CONFLICT(day, entity_mask) DO UPDATE SET messages = messages + excluded.messages
+    """, params)
+    conn.execute(f"""
+        UPDATE users SET
+            chat_count = chat_count + totals.chats,
+            last_activity = CASE WHEN chat_count + totals.chats > 0
+                                 THEN MAX(COALESCE(last_activity, ''), totals.latest) END
+        FROM (
+            SELECT user_id, {sign} * COUNT(*) AS chats, MAX(timestamp) AS latest
+            FROM chat_history WHERE {where_sql}
+            GROUP BY user_id
+        ) totals
+        WHERE users.id = totals.user_id
+    """, params)
+    if sign < 0:
+        conn.execute("DELETE FROM rollup_daily_chats WHERE messages <= 0")
+        conn.execute("DELETE FROM rollup_hourly_chats WHERE messages <= 0")
+        conn.execute("DELETE FROM rollup_daily_users WHERE messages <= 0")
+        conn.execute("DELETE FROM rollup_daily_entities WHERE mentions <= 0")
+        conn.execute("DELETE FROM rollup_user_entities WHERE mentions <= 0")
+        conn.execute("DELETE FROM rollup_daily_entity_masks WHERE messages <= 0")
+
+def _add_feedback_rollup(conn, day, feedback_type, delta):
+    conn.execute("""
+        INSERT INTO rollup_daily_feedback (day, feedback_type, feedback_count)
+        VALUES (COALESCE(?, DATE('now')), ?, ?)
+        ON CONFLICT(day, feedback_type) DO UPDATE SET feedback_count = feedback_count + excluded.feedback_count
+    """, (day, feedback_type, delta))
+    if delta < 0:
+        conn.execute("DELETE FROM rollup_daily_feedback WHERE feedback_count <= 0")
+
+def rebuild_feedback_rollups(conn):
+    conn.execute("DELETE FROM rollup_daily_feedback")
+    conn.execute("""
+        INSERT INTO rollup_daily_feedback (day, feedback_type, feedback_count)
+        SELECT DATE(timestamp), feedback_type, COUNT(*)
+        FROM response_feedback
+        GROUP BY 1, 2
+    """)
+
+def catch_up_rollups(conn):
+    """Fold chat_history rows above the high-water mark into the rollups.
+
+    Called on the chat write path for the rows just written, once by
+    init_database after migrations, and through refresh_rollups before admin
+    reads to pick up rows written any other way (bulk loads, older versions).
+    """
+    if not conn.in_transaction:
+        # Take the write lock before reading the mark so two workers can't both apply a batch
+        conn.execute("BEGIN IMMEDIATE")
+    row = conn.execute("SELECT value FROM app_counters WHERE name = 'rollup_chat_hwm'").fetchone()
+    if row is None:
+        # First run against this database: build feedback rollups from scratch too
+        rebuild_feedback_rollups(conn)
+    hwm = row[0] if row else 0
+    top = conn.execute("SELECT COALESCE(MAX(id), 0) FROM chat_history").fetchone()[0]
+    if top > hwm:
+        _apply_chat_rollups(conn, "id > ? AND id <= ?", (hwm, top))
+    if row is None or top > hwm:
+        conn.execute("""
+            INSERT INTO app_counters (name, value) VALUES ('rollup_chat_hwm', ?)
+            ON CONFLICT(name) DO UPDATE SET value = excluded.value
+        """, (top,))
+
+def refresh_rollups():
+    """catch_up_rollups for admin reads, without the write lock when nothing is pending.
+
+    The high-water mark is compared with MAX(id) on a read connection first;
+    only rows written outside the chat write path (bulk loads) make this
+    take the lock. Returns True when it caught up.
+    """
+    with get_read_db() as conn:
+        row = conn.execute("SELECT value FROM app_counters WHERE name = 'rollup_chat_hwm'").fetchone()
+        top = conn.execute("SELECT COALESCE(MAX(id), 0) FROM chat_history").fetchone()[0]
+    if row is not None and top <= row[0]:
+        return False
+    with get_db() as conn:
+        catch_up_rollups(conn)
+    return True
+
+def remove_user_rollups(conn, user_id, include_feedback=False):
+    """Subtract a user's rows from the rollups before they are deleted"""
+    catch_up_rollups(conn)
+    _apply_chat_rollups(conn, "user_id = ?", (user_id,), sign=-1)
+    if include_feedback:
+        for day, feedback_type, total in conn.execute("""
+            SELECT DATE(timestamp), feedback_type, COUNT(*)
+            FROM response_feedback WHERE user_id = ?
+            GROUP BY 1, 2
+        """, (user_id,)).fetchall():
+            _add_feedback_rollup(conn, day, feedback_type, -total)
+        conn.execute("DELETE FROM rollup_daily_feedback WHERE feedback_count <= 0")
+
+def rebuild_rollups(conn):
+    """Recompute every rollup table from the raw tables (after bulk deletes)"""
+    for table in ('rollup_daily_chats', 'rollup_hourly_chats', 'rollup_daily_users', 'rollup_daily_entities',
+                  'rollup_user_entities', 'rollup_daily_entity_masks'):
+        conn.execute(f"DELETE FROM {table}")
+    conn.execute("UPDATE users SET chat_count = 0, last_activity = NULL")
+    conn.execute("DELETE FROM app_counters WHERE name = 'rollup_chat_hwm'")
+    catch_up_rollups(conn)
+
+def get_rollup_table_counts(conn):
+    """Row counts for the settings page, read from rollups instead of COUNT(*) scans"""
+    return {
+        'chat_history': conn.execute("SELECT COALESCE(SUM(messages), 0) FROM rollup_daily_chats").fetchone()[0],
+        'chat_entities': conn.execute("SELECT COALESCE(SUM(mentions), 0) FROM rollup_daily_entities").fetchone()[0],
+        'response_feedback': conn.execute("SELECT COALESCE(SUM(feedback_count), 0) FROM rollup_daily_feedback").fetchone()[0]
+    }
+
 # Admin Functions
-def get_admin_dashboard_data():
-    """Get comprehensive dashboard data for admin"""
+# Dashboard aggregates are independent, so they run in parallel on pooled
+# read-only connections (WAL readers don't block each other or the writer).
+DASHBOARD_WORKERS = 4
+
+# Per-query timings of the last uncached dashboard load; kept apart from the
+# cached data so a cache hit never shows timings it did not measure
+LAST_DASHBOARD_TIMINGS = {'time': None, 'timings': {}}
+
+_dashboard_executor = None
+_dashboard_executor_lock = threading.Lock()
+
+def _get_dashboard_executor():
+    global _dashboard_executor
+    if _dashboard_executor is None:
+        with _dashboard_executor_lock:
+            if _dashboard_executor is None:
+                _dashboard_executor = ThreadPoolExecutor(max_workers=DASHBOARD_WORKERS, thread_name_prefix="dashboard")
+    return _dashboard_executor
+
+def _run_dashboard_query(sql, params, fetch):
+    """Run one aggregate on a read connection; returns (result, milliseconds, query counts)"""
+    # Workers count into their own budget; the caller merges it once the future resolves
+    budget = _query_local.budget = {'count': 0, 'statements': {}}
+    started = time.perf_counter()
     try:
-        conn = sqlite3.connect('milestone4_wellness_chatbot.db')
-        cursor = conn.cursor()
-        
-        # Total users
-        cursor.execute("SELECT COUNT(*) FROM users")
-        total_users = cursor.fetchone()[0]
-        
-        # New users this week
-        week_ago = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d %H:%M:%S')
-        cursor.execute("SELECT COUNT(*) FROM users WHERE created_at >= ?", (week_ago,))
-        new_users_week = cursor.fetchone()[0]
-        
-        # Total conversations
-        cursor.execute("SELECT COUNT(*) FROM chat_history")
-        total_conversations = cursor.fetchone()[0]
-        
+        with get_read_db() as conn:
+            cursor = conn.execute(sql, params)
+            result = cursor.fetchone()[0] if fetch == 'one' else cursor.fetchall()
+    finally:
+        _query_local.budget = None
+    return result, (time.perf_counter() - started) * 1000, budget
+
+def _merge_query_counts(counts):
+    """Add a worker thread's query counts to this thread's budget"""
+    budget = getattr(_query_local, 'budget', None)
+    if budget is None:
+        return
+    budget['count'] += counts['count']
+    for sql, n in counts['statements'].items():
+        budget['statements'][sql] = budget['statements'].get(sql, 0) + n
+    if budget['count'] > QUERY_BUDGET_PER_RERUN and QUERY_BUDGET_STRICT:
+        raise QueryBudgetExceeded(f"More than {QUERY_BUDGET_PER_RERUN} queries in one rerun")
+
+def dashboard_queries():
+    """name -> (sql, params, 'one' | 'all') for every dashboard aggregate"""
+    # New users this week
+    week_ago = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d %H:%M:%S')
+    week_ago_day = week_ago[:10]
+    # Daily chat volume (last 30 days)
+    thirty_days_ago = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
+    return {
+        'total_users': ("SELECT COUNT(*) FROM users", (), 'one'),
+        'new_users_week': ("SELECT COUNT(*) FROM users WHERE created_at >= ?", (week_ago,), 'one'),
+        'total_conversations': ("SELECT COALESCE(SUM(messages), 0) FROM rollup_daily_chats", (), 'one'),
         # Active users (users who chatted in last 7 days)
-        cursor.execute("""
-            SELECT COUNT(DISTINCT user_id) FROM chat_history 
-            WHERE timestamp >= ?
-        """, (week_ago,))
-        active_users = cursor.fetchone()[0]
-        
-        # Most common symptoms
-        cursor.execute("""
-            SELECT entity_value, COUNT(*) as count 
-            FROM entity_logs 
-            WHERE entity_type = 'symptoms' 
-            GROUP BY entity_value 
-            ORDER BY count DESC 
+        'active_users': ("""
+            SELECT COUNT(DISTINCT user_id) FROM rollup_daily_users 
+            WHERE day >= ?
+        """, (week_ago_day,), 'one'),
+        'top_symptoms': ("""
+            SELECT e.entity_value, t.count
+            FROM (SELECT entity_id, SUM(mentions) as count
+                  FROM rollup_daily_entities
+                  WHERE entity_id IN (SELECT id FROM entities WHERE entity_type = 'symptoms')
+                  GROUP BY entity_id) t
+            JOIN entities e ON e.id = t.entity_id
+            ORDER BY t.count DESC
             LIMIT 10
-        """)
-        top_symptoms = cursor.fetchall()
-        
-        # Language distribution
-        cursor.execute("""
-            SELECT language, COUNT(*) as count 
-            FROM chat_history 
+        """, (), 'all'),
+        'language_dist': ("""
+            SELECT language, SUM(messages) as count 
+            FROM rollup_daily_chats 
             GROUP BY language 
             ORDER BY count DESC
-        """)
-        language_dist = cursor.fetchall()
-        
-        # Intent distribution
-        cursor.execute("""
-            SELECT intent, COUNT(*) as count 
-            FROM chat_history 
+        """, (), 'all'),
+        'intent_dist': ("""
+            SELECT intent, SUM(messages) as count 
+            FROM rollup_daily_chats 
             GROUP BY intent 
             ORDER BY count DESC
-        """)
-        intent_dist = cursor.fetchall()
-        
-        # Daily chat volume (last 30 days)
-        thirty_days_ago = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
-        cursor.execute("""
-            SELECT DATE(timestamp) as date, COUNT(*) as count 
-            FROM chat_history 
-            WHERE DATE(timestamp) >= ? 
-            GROUP BY DATE(timestamp) 
+        """, (), 'all'),
+        'daily_chats': ("""
+            SELECT day as date, SUM(messages) as count 
+            FROM rollup_daily_chats 
+            WHERE day >= ? 
+            GROUP BY day 
             ORDER BY date
-        """, (thirty_days_ago,))
-        daily_chats = cursor.fetchall()
-        
+        """, (thirty_days_ago,), 'all'),
         # User demographics
-        cursor.execute("""
+        'gender_dist': ("""
             SELECT gender, COUNT(*) as count 
             FROM users 
             WHERE gender IS NOT NULL 
             GROUP BY gender
-        """)
-        gender_dist = cursor.fetchall()
-        
-        cursor.execute("""
+        """, (), 'all'),
+        'age_dist': ("""
             SELECT 
                 CASE 
                     WHEN age < 18 THEN 'Under 18'
@@ -1132,110 +1911,151 @@ def get_admin_dashboard_data():
                 COUNT(*) as count
             FROM users 
             GROUP BY age_group
-        """)
-        age_dist = cursor.fetchall()
-        
+        """, (), 'all'),
         # Response feedback metrics
-        cursor.execute("""
-            SELECT feedback_type, COUNT(*) as count 
-            FROM response_feedback 
+        'feedback_metrics': ("""
+            SELECT feedback_type, SUM(feedback_count) as count 
+            FROM rollup_daily_feedback 
             GROUP BY feedback_type
-        """)
-        feedback_metrics = cursor.fetchall()
-        
+        """, (), 'all'),
         # Recent feedback (last 7 days)
-        cursor.execute("""
-            SELECT COUNT(*) FROM response_feedback 
-            WHERE timestamp >= ?
-        """, (week_ago,))
-        recent_feedback = cursor.fetchone()[0]
-        
-        conn.close()
-        
-        return {
-            'total_users': total_users,
-            'new_users_week': new_users_week,
-            'total_conversations': total_conversations,
-            'active_users': active_users,
-            'top_symptoms': top_symptoms,
-            'language_dist': language_dist,
-            'intent_dist': intent_dist,
-            'daily_chats': daily_chats,
-            'gender_dist': gender_dist,
-            'age_dist': age_dist,
-            'feedback_metrics': feedback_metrics,
-            'recent_feedback': recent_feedback
-        }
+        'recent_feedback': ("""
+            SELECT COALESCE(SUM(feedback_count), 0) FROM rollup_daily_feedback 
+            WHERE day >= ?
+        """, (week_ago_day,), 'one'),
+    }
+
+@perf_timed
+@admin_cached
+def get_admin_dashboard_data():
+    """Get comprehensive dashboard data for admin"""
+    try:
+        # Fold in any chat rows the rollups have not seen yet
+        refresh_rollups()
+
+        executor = _get_dashboard_executor()
+        futures = {name: executor.submit(_run_dashboard_query, sql, params, fetch)
+                   for name, (sql, params, fetch) in dashboard_queries().items()}
+
+        data, timings = {}, {}
+        for name, future in futures.items():
+            data[name], timings[name], counts = future.result()
+            _merge_query_counts(counts)
+            record_perf(f"dashboard.{name}", timings[name] * 1000)
+        LAST_DASHBOARD_TIMINGS.update(time=datetime.now().strftime('%H:%M:%S'), timings=timings)
+        return data
     except Exception as e:
         st.error(f"Error fetching dashboard data: {str(e)}")
         return None
 
-def get_user_management_data():
-    """Get user data for management"""
+# User management pages: newest accounts first, or a case-insensitive prefix
+# search on one indexed column. Pages are keyset (a cursor of the last row's
+# sort key), so any page costs one index range scan of USER_PAGE_SIZE rows.
+USER_PAGE_SIZE = 50
+USER_SEARCH_FIELDS = {'Email': 'email', 'Name': 'full_name'}
+
+@perf_timed
+@admin_cached
+def get_user_summary():
+    """(total users, users active in the last 7 days, total chats)"""
     try:
-        conn = sqlite3.connect('milestone4_wellness_chatbot.db')
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT u.id, u.email, u.full_name, u.preferred_language, 
-                   u.created_at, COUNT(ch.id) as chat_count,
-                   MAX(ch.timestamp) as last_activity
-            FROM users u
-            LEFT JOIN chat_history ch ON u.id = ch.user_id
-            GROUP BY u.id, u.email, u.full_name, u.preferred_language, u.created_at
-            ORDER BY u.created_at DESC
-        """)
-        
-        users_data = cursor.fetchall()
-        conn.close()
-        
-        return users_data
+        refresh_rollups()
+        cutoff = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d %H:%M:%S')
+        with get_read_db() as conn:
+            total_users = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+            active_users = conn.execute("SELECT COUNT(*) FROM users WHERE last_activity >= ?", (cutoff,)).fetchone()[0]
+            total_chats = conn.execute("SELECT COALESCE(SUM(messages), 0) FROM rollup_daily_chats").fetchone()[0]
+        return total_users, active_users, total_chats
+    except Exception as e:
+        st.error(f"Error fetching user summary: {str(e)}")
+        return None
+
+@perf_timed
+def get_user_page(search="", field='email', cursor=None, limit=USER_PAGE_SIZE):
+    """One page of users for management.
+
+    With no search, newest accounts first; otherwise users whose `field`
+    (email or full_name) starts with search, ignoring ASCII case, in that
+    column's order. Returns (rows, next_cursor); rows are (id, email,
+    full_name, preferred_language, created_at, chat_count, last_activity).
+    """
+    if search:
+        if field not in USER_SEARCH_FIELDS.values():
+            raise ValueError(f"Unknown search field: {field}")
+        # [search, search + U+10FFFF) holds every string starting with search
+        condition = f"{field} >= ? COLLATE NOCASE AND {field} < ? COLLATE NOCASE"
+        params = [search, search + "\U0010ffff"]
+        if cursor is not None:
+            condition += f" AND ({field} > ? COLLATE NOCASE OR ({field} = ? COLLATE NOCASE AND id > ?))"
+            params += [cursor[0], cursor[0], cursor[1]]
+        order = f"{field} COLLATE NOCASE, id"
+        key_index = 1 if field == 'email' else 2
+    else:
+        condition = "1"
+        params = []
+        if cursor is not None:
+            condition = "(created_at, id) < (?, ?)"
+            params = list(cursor)
+        order = "created_at DESC, id DESC"
+        key_index = 4
+
+    try:
+        with get_read_db() as conn:
+            rows = conn.execute(f"""
+                SELECT id, email, full_name, preferred_language, created_at, chat_count, last_activity
+                FROM users
+                WHERE {condition}
+                ORDER BY {order}
+                LIMIT ?
+            """, params + [limit + 1]).fetchall()
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            return rows[:limit], (last[key_index], last[0])
+        return rows, None
     except Exception as e:
         st.error(f"Error fetching user data: {str(e)}")
-        return []
+        return [], None
 
 def log_admin_action(admin_email, action, details=""):
     """Log admin actions"""
     try:
-        conn = sqlite3.connect('milestone4_wellness_chatbot.db')
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO admin_logs (admin_email, action, details)
-            VALUES (?, ?, ?)
-        """, (admin_email, action, details))
-        conn.commit()
-        conn.close()
+        with get_db() as conn:
+            conn.execute("""
+                INSERT INTO admin_logs (admin_email, action, details)
+                VALUES (?, ?, ?)
+            """, (admin_email, action, details))
     except Exception as e:
         st.error(f"Error logging admin action: {str(e)}")
 
 def add_kb_entry(content_type, topic_key, topic_name, english_content, hindi_content, admin_email):
     """Add new knowledge base entry to database"""
     try:
-        conn = sqlite3.connect('milestone4_wellness_chatbot.db')
-        cursor = conn.cursor()
-        
-        # First ensure table exists
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS knowledge_base (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                content_type TEXT NOT NULL,
-                topic_key TEXT NOT NULL UNIQUE,
-                topic_name TEXT NOT NULL,
-                english_content TEXT NOT NULL,
-                hindi_content TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                created_by TEXT
-            )
-        """)
-        
-        cursor.execute("""
-            INSERT INTO knowledge_base 
-            (content_type, topic_key, topic_name, english_content, hindi_content, created_by)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (content_type, topic_key, topic_name, english_content, hindi_content, admin_email))
-        conn.commit()
-        conn.close()
+        with get_db() as conn:
+            cursor = conn.cursor()
+
+            # First ensure table exists
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS knowledge_base (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    content_type TEXT NOT NULL,
+                    topic_key TEXT NOT NULL UNIQUE,
+                    topic_name TEXT NOT NULL,
+                    english_content TEXT NOT NULL,
+                    hindi_content TEXT NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    created_by TEXT
+                )
+            """)
+
+            cursor.execute("""
+                INSERT INTO knowledge_base 
+                (content_type, topic_key, topic_name, english_content, hindi_content, created_by)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (content_type, topic_key, topic_name, english_content, hindi_content, admin_email))
+            bump_counter(conn, 'kb_version')
+            mark_data_changed(conn)
+        sync_knowledge_base()
         return True
     except sqlite3.IntegrityError as e:
         st.error(f"Duplicate entry: {str(e)}")
@@ -1247,16 +2067,16 @@ def add_kb_entry(content_type, topic_key, topic_name, english_content, hindi_con
 def update_kb_entry(entry_id, topic_name, english_content, hindi_content):
     """Update existing knowledge base entry"""
     try:
-        conn = sqlite3.connect('milestone4_wellness_chatbot.db')
-        cursor = conn.cursor()
-        cursor.execute("""
-            UPDATE knowledge_base 
-            SET topic_name = ?, english_content = ?, hindi_content = ?, 
-                updated_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        """, (topic_name, english_content, hindi_content, entry_id))
-        conn.commit()
-        conn.close()
+        with get_db() as conn:
+            conn.execute("""
+                UPDATE knowledge_base 
+                SET topic_name = ?, english_content = ?, hindi_content = ?, 
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            """, (topic_name, english_content, hindi_content, entry_id))
+            bump_counter(conn, 'kb_version')
+            mark_data_changed(conn)
+        sync_knowledge_base()
         return True
     except Exception as e:
         st.error(f"Error updating entry: {str(e)}")
@@ -1265,47 +2085,44 @@ def update_kb_entry(entry_id, topic_name, english_content, hindi_content):
 def delete_kb_entry(entry_id):
     """Delete knowledge base entry"""
     try:
-        conn = sqlite3.connect('milestone4_wellness_chatbot.db')
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM knowledge_base WHERE id = ?", (entry_id,))
-        conn.commit()
-        conn.close()
+        with get_db() as conn:
+            conn.execute("DELETE FROM knowledge_base WHERE id = ?", (entry_id,))
+            bump_counter(conn, 'kb_version')
+            mark_data_changed(conn)
+        sync_knowledge_base()
         return True
     except Exception as e:
         st.error(f"Error deleting entry: {str(e)}")
         return False
 
+@perf_timed
+@admin_cached
 def get_all_kb_entries():
     """Get all knowledge base entries from database"""
     try:
-        conn = sqlite3.connect('milestone4_wellness_chatbot.db')
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT id, content_type, topic_key, topic_name, 
-                   english_content, hindi_content, created_at, updated_at
-            FROM knowledge_base
-            ORDER BY content_type, topic_name
-        """)
-        entries = cursor.fetchall()
-        conn.close()
+        with get_read_db() as conn:
+            entries = conn.execute("""
+                SELECT id, content_type, topic_key, topic_name, 
+                       english_content, hindi_content, created_at, updated_at
+                FROM knowledge_base
+                ORDER BY content_type, topic_name
+            """).fetchall()
         return entries
     except Exception as e:
         st.error(f"Error fetching entries: {str(e)}")
         return []
 
+@perf_timed
 def get_kb_entry_by_id(entry_id):
     """Get single knowledge base entry by ID"""
     try:
-        conn = sqlite3.connect('milestone4_wellness_chatbot.db')
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT id, content_type, topic_key, topic_name, 
-                   english_content, hindi_content
-            FROM knowledge_base
-            WHERE id = ?
-        """, (entry_id,))
-        entry = cursor.fetchone()
-        conn.close()
+        with get_db() as conn:
+            entry = conn.execute("""
+                SELECT id, content_type, topic_key, topic_name, 
+                       english_content, hindi_content
+                FROM knowledge_base
+                WHERE id = ?
+            """, (entry_id,)).fetchone()
         return entry
     except Exception as e:
         st.error(f"Error fetching entry: {str(e)}")
@@ -1314,26 +2131,31 @@ def get_kb_entry_by_id(entry_id):
 def clear_duplicate_kb_entries():
     """Remove duplicate knowledge base entries, keeping only the first one"""
     try:
-        conn = sqlite3.connect('milestone4_wellness_chatbot.db')
-        cursor = conn.cursor()
-        cursor.execute("""
-            DELETE FROM knowledge_base
-            WHERE id NOT IN (
-                SELECT MIN(id)
-                FROM knowledge_base
-                GROUP BY topic_name, content_type
-            )
-        """)
-        deleted = cursor.rowcount
-        conn.commit()
-        conn.close()
+        with get_db() as conn:
+            cursor = conn.execute("""
+                DELETE FROM knowledge_base
+                WHERE id NOT IN (
+                    SELECT MIN(id)
+                    FROM knowledge_base
+                    GROUP BY topic_name, content_type
+                )
+            """)
+            deleted = cursor.rowcount
+            if deleted:
+                bump_counter(conn, 'kb_version')
+                mark_data_changed(conn)
+        sync_knowledge_base()
         return deleted
     except Exception as e:
         st.error(f"Error clearing duplicates: {str(e)}")
         return 0
 
+@perf_timed
 def show_admin_dashboard():
     """Display the admin dashboard"""
+    import pandas as pd
+    import plotly.express as px
+
     st.markdown('<div class="admin-header">🔧 Admin Dashboard - Wellness Chatbot Analytics</div>', unsafe_allow_html=True)
     
     # Get dashboard data
@@ -1427,29 +2249,20 @@ def show_admin_dashboard():
     
     # Query Types, Daily Activity, and Age Distribution sections removed as requested
     
-    # Response Feedback Summary
+    # Response Feedback Summary (same rollup numbers the metric row uses)
     try:
-        conn = sqlite3.connect('milestone4_wellness_chatbot.db')
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT feedback_type, COUNT(*) as count 
-            FROM response_feedback 
-            GROUP BY feedback_type
-        """)
-        
-        feedback_summary = cursor.fetchall()
-        
+        feedback_summary = data['feedback_metrics']
+
         if feedback_summary:
             st.subheader("👍👎 Response Feedback Summary")
-            
+        
             col1, col2 = st.columns(2)
-            
+        
             feedback_df = pd.DataFrame(feedback_summary, columns=['Feedback', 'Count'])
             total_feedback = feedback_df['Count'].sum()
             thumbs_up = feedback_df[feedback_df['Feedback'] == 'thumbs_up']['Count'].sum() if len(feedback_df[feedback_df['Feedback'] == 'thumbs_up']) > 0 else 0
             satisfaction_rate = (thumbs_up / total_feedback * 100) if total_feedback > 0 else 0
-            
+        
             with col1:
                 st.markdown(f"""
                 <div class="metric-card">
@@ -1458,7 +2271,7 @@ def show_admin_dashboard():
                     <p style="color: #666; margin: 0;">{thumbs_up} positive / {total_feedback} total</p>
                 </div>
                 """, unsafe_allow_html=True)
-            
+        
             with col2:
                 fig = px.pie(feedback_df, values='Count', names='Feedback',
                            title="Response Ratings",
@@ -1466,19 +2279,56 @@ def show_admin_dashboard():
                 fig.update_layout(height=300)
                 st.plotly_chart(fig, use_container_width=True)
         
-        conn.close()
-        
     except Exception as e:
         st.error(f"Error loading feedback summary: {str(e)}")
 
+    # Per-query timings from the last parallel dashboard load
+    timings = LAST_DASHBOARD_TIMINGS['timings']
+    if timings:
+        with st.expander("⏱️ Dashboard Query Timings"):
+            st.caption(f"Measured on the last uncached load, at {LAST_DASHBOARD_TIMINGS['time']}")
+            timing_df = pd.DataFrame(sorted(timings.items(), key=lambda item: -item[1]),
+                                     columns=['Query', 'Duration (ms)'])
+            st.caption(f"Slowest query {timing_df['Duration (ms)'].max():.1f} ms; "
+                       f"sum of all queries {timing_df['Duration (ms)'].sum():.1f} ms")
+            st.dataframe(timing_df.round(2), use_container_width=True)
+
+@perf_timed
 def show_user_management():
     """Display user management interface"""
+    import pandas as pd
+
     st.subheader("👥 User Management")
     
-    users_data = get_user_management_data()
+    summary = get_user_summary()
     
-    if users_data:
-        # Convert to DataFrame for better display
+    if summary and summary[0]:
+        total_users, active_users, total_chats = summary
+        
+        # Display metrics
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Total Users", total_users)
+        with col2:
+            st.metric("Active Users (7 days)", active_users)
+        with col3:
+            st.metric("Avg Chats per User", f"{total_chats / total_users:.1f}")
+        
+        # Search and filter: prefix match on an indexed column, one page at a time
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            search_term = st.text_input("🔍 Search users by email or name (starts with):").strip()
+        with col2:
+            search_field = st.radio("Search by", list(USER_SEARCH_FIELDS), horizontal=True)
+        field = USER_SEARCH_FIELDS[search_field]
+        
+        # Cursors of the pages visited so far; the last one is the page shown
+        if st.session_state.get('user_page_search') != (search_term, field):
+            st.session_state.user_page_search = (search_term, field)
+            st.session_state.user_page_cursors = [None]
+        cursors = st.session_state.user_page_cursors
+        users_data, next_cursor = get_user_page(search_term, field, cursors[-1])
+        
         df = pd.DataFrame(users_data, columns=[
             'ID', 'Email', 'Full Name', 'Language', 'Created At', 'Chat Count', 'Last Activity'
         ])
@@ -1487,24 +2337,20 @@ def show_user_management():
         df['Created At'] = pd.to_datetime(df['Created At']).dt.strftime('%Y-%m-%d %H:%M')
         df['Last Activity'] = pd.to_datetime(df['Last Activity']).dt.strftime('%Y-%m-%d %H:%M')
         
-        # Display metrics
-        col1, col2, col3 = st.columns(3)
+        # Display users table
+        if users_data:
+            st.dataframe(df, use_container_width=True, height=400)
+        else:
+            st.info("No users match your search.")
+        
+        col1, col2, col3 = st.columns([1, 2, 1])
         with col1:
-            st.metric("Total Users", len(df))
+            st.button("⬅️ Previous", key="user_page_prev", disabled=len(cursors) == 1, on_click=cursors.pop)
         with col2:
-            st.metric("Active Users (7 days)", len(df[df['Chat Count'] > 0]))
+            st.caption(f"Page {len(cursors)}")
         with col3:
-            avg_chats = df['Chat Count'].mean()
-            st.metric("Avg Chats per User", f"{avg_chats:.1f}")
-        
-        # Search and filter
-        search_term = st.text_input("🔍 Search users by email or name:")
-        if search_term:
-            df = df[df['Email'].str.contains(search_term, case=False) | 
-                   df['Full Name'].str.contains(search_term, case=False)]
-        
-        # Display users table
-        st.dataframe(df, use_container_width=True, height=400)
+            st.button("Next ➡️", key="user_page_next", disabled=next_cursor is None,
+                      on_click=cursors.append, args=(next_cursor,))
         
         # User details section
         st.subheader("📋 User Details")
@@ -1544,16 +2390,15 @@ def show_user_management():
     else:
         st.info("No users found in the system.")
 
+@perf_timed
 def get_user_details(email):
     """Get detailed user information"""
     try:
-        conn = sqlite3.connect('milestone4_wellness_chatbot.db')
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM users WHERE email = ?
-        """, (email,))
-        result = cursor.fetchone()
-        conn.close()
+        with get_read_db() as conn:
+            cursor = conn.execute("""
+                SELECT * FROM users WHERE email = ?
+            """, (email,))
+            result = cursor.fetchone()
         
         if result:
             columns = [desc[0] for desc in cursor.description]
@@ -1563,8 +2408,117 @@ def get_user_details(email):
         st.error(f"Error fetching user details: {str(e)}")
         return None
 
+@perf_timed
+@admin_cached
+def get_system_analytics_data(days):
+    """Daily and hourly message volume for the last `days` days (None = all time)"""
+    refresh_rollups()
+
+    with get_read_db() as conn:
+        cursor = conn.cursor()
+        
+        # Base query condition
+        time_condition = ""
+        params = []
+        if days:
+            cutoff_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+            time_condition = "WHERE day >= ?"
+            params = [cutoff_date]
+        
+        # Query execution with time filter
+        cursor.execute(f"""
+            SELECT day as date, SUM(messages) as count 
+            FROM rollup_daily_chats 
+            {time_condition}
+            GROUP BY day 
+            ORDER BY date
+        """, params)
+        daily_data = cursor.fetchall()
+        
+        # Most active hours
+        cursor.execute(f"""
+            SELECT hour, SUM(messages) as count 
+            FROM rollup_hourly_chats 
+            {time_condition}
+            GROUP BY hour 
+            ORDER BY hour
+        """, params)
+        hourly_data = cursor.fetchall()
+    
+    return daily_data, hourly_data
+
+@perf_timed
+@admin_cached
+def get_entity_cooccurrence(days, entity_type='symptoms'):
+    """Messages mentioning each pair of entities of one type in the last `days` days.
+
+    Works on the distinct (entity_mask, messages) pairs of the mask rollup, so
+    the cost follows the number of distinct entity combinations rather than
+    the number of chats. Entities with ids past ENTITY_MASK_BITS have no mask
+    bit; their rows and columns are counted from chat_entities instead, over
+    the days the daily entity rollup says they were mentioned. Returns
+    (labels, matrix); the diagonal holds per-entity message counts.
+    """
+    import numpy as np
+
+    refresh_rollups()
+
+    # '' sorts before every day, so "All time" is the same range query
+    since = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d') if days else ''
+    with get_read_db() as conn:
+        vocabulary = conn.execute(
+            "SELECT id, entity_value FROM entities WHERE entity_type = ? ORDER BY id", (entity_type,)
+        ).fetchall()
+        rows = conn.execute("""
+            SELECT entity_mask, SUM(messages) FROM rollup_daily_entity_masks
+            WHERE day >= ?
+            GROUP BY entity_mask
+        """, (since,)).fetchall()
+        high_ids = [entity_id for entity_id, _ in vocabulary if entity_id > ENTITY_MASK_BITS]
+        chats = []
+        if high_ids:
+            marks = ", ".join("?" * len(high_ids))
+            chats = conn.execute(f"""
+                SELECT ch.entity_mask, GROUP_CONCAT(ce.entity_id)
+                FROM chat_history ch JOIN chat_entities ce ON ce.chat_id = ch.id
+                WHERE ch.day IN (
+                    SELECT day FROM rollup_daily_entities
+                    WHERE entity_id IN ({marks}) AND mentions > 0 AND day >= ?
+                ) AND ce.entity_id IN ({marks})
+                GROUP BY ch.id
+            """, high_ids + [since] + high_ids).fetchall()
+
+    if not vocabulary or not (rows or chats):
+        return [], np.zeros((0, 0), dtype=np.int64)
+    low_count = len(vocabulary) - len(high_ids)
+    bits = np.array([entity_id - 1 for entity_id, _ in vocabulary[:low_count]], dtype=np.int64)
+    masks = np.array([mask for mask, _ in rows], dtype=np.int64)
+    counts = np.array([total for _, total in rows], dtype=np.int64)
+    # present[m, e] is 1 when mask m has entity e's bit set
+    present = (masks[:, None] >> bits[None, :]) & 1
+    matrix = np.zeros((len(vocabulary), len(vocabulary)), dtype=np.int64)
+    matrix[:low_count, :low_count] = present.T @ (present * counts[:, None])
+
+    if chats:
+        # One row per chat mentioning a high-id entity: mask bits plus its high ids
+        column = {entity_id: low_count + i for i, entity_id in enumerate(high_ids)}
+        present = np.zeros((len(chats), len(vocabulary)), dtype=np.int64)
+        chat_masks = np.array([mask for mask, _ in chats], dtype=np.int64)
+        present[:, :low_count] = (chat_masks[:, None] >> bits[None, :]) & 1
+        for row, (_, ids) in enumerate(chats):
+            for entity_id in ids.split(","):
+                present[row, column[int(entity_id)]] = 1
+        pairs = present.T @ present
+        matrix[low_count:, :] = pairs[low_count:, :]
+        matrix[:, low_count:] = pairs[:, low_count:]
+    return [value for _, value in vocabulary], matrix
+
+@perf_timed
 def show_system_analytics():
     """Display detailed system analytics"""
+    import pandas as pd
+    import plotly.express as px
+
     st.subheader("📈 System Analytics")
     
     # Time range selector
@@ -1581,27 +2535,7 @@ def show_system_analytics():
     days = days_map[time_range]
     
     try:
-        conn = sqlite3.connect('milestone4_wellness_chatbot.db')
-        cursor = conn.cursor()
-        
-        # Base query condition
-        time_condition = ""
-        params = []
-        if days:
-            cutoff_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S')
-            time_condition = "WHERE timestamp >= ?"
-            params = [cutoff_date]
-        
-        # Query execution with time filter
-        cursor.execute(f"""
-            SELECT DATE(timestamp) as date, COUNT(*) as count 
-            FROM chat_history 
-            {time_condition}
-            GROUP BY DATE(timestamp) 
-            ORDER BY date
-        """, params)
-        
-        daily_data = cursor.fetchall()
+        daily_data, hourly_data = get_system_analytics_data(days)
         
         if daily_data:
             df = pd.DataFrame(daily_data, columns=['Date', 'Messages'])
@@ -1624,17 +2558,6 @@ def show_system_analytics():
             with col4:
                 st.metric("Active Days", len(df))
         
-        # Most active hours
-        cursor.execute(f"""
-            SELECT CAST(strftime('%H', timestamp) AS INTEGER) as hour, COUNT(*) as count 
-            FROM chat_history 
-            {time_condition}
-            GROUP BY hour 
-            ORDER BY hour
-        """, params)
-        
-        hourly_data = cursor.fetchall()
-        
         if hourly_data:
             st.subheader("🕐 Peak Usage Hours")
             hourly_df = pd.DataFrame(hourly_data, columns=['Hour', 'Messages'])
@@ -1643,13 +2566,22 @@ def show_system_analytics():
                         title="Messages by Hour of Day",
                         color='Messages', color_continuous_scale='Viridis')
             fig.update_layout(showlegend=False)
+            st.plotly_chart(fig, use_container_width=True)        
+
+        labels, matrix = get_entity_cooccurrence(days)
+        mentioned = [i for i in matrix.diagonal().argsort()[::-1] if matrix[i, i] > 0][:15]
+        if len(mentioned) > 1:
+            st.subheader("🔗 Symptom Co-occurrence")
+            names = [labels[i] for i in mentioned]
+            fig = px.imshow(matrix[mentioned][:, mentioned], x=names, y=names, text_auto=True,
+                            color_continuous_scale='Greens',
+                            labels={'color': 'Messages'},
+                            title="Messages mentioning both symptoms (diagonal: all messages mentioning it)")
             st.plotly_chart(fig, use_container_width=True)
-        
-        conn.close()
-        
     except Exception as e:
         st.error(f"Error generating analytics: {str(e)}")
 
+@perf_timed
 def show_content_management():
     """Display content management interface"""
     st.subheader("📝 Content Management")
@@ -1819,93 +2751,95 @@ def show_content_management():
         st.write("**User Feedback Management:**")
         
         try:
-            conn = sqlite3.connect('milestone4_wellness_chatbot.db')
-            cursor = conn.cursor()
+            with get_read_db() as conn:
+                cursor = conn.cursor()
             
-            # Get detailed feedback with user info
-            cursor.execute("""
-                SELECT u.full_name, u.email, rf.feedback_type, rf.rating, rf.timestamp,
-                       ch.message, ch.response
-                FROM response_feedback rf
-                JOIN users u ON rf.user_id = u.id
-                LEFT JOIN chat_history ch ON rf.chat_message_id = ch.id
-                ORDER BY rf.timestamp DESC
-                LIMIT 50
-            """)
+                # Get detailed feedback with user info
+                cursor.execute("""
+                    SELECT u.full_name, u.email, rf.feedback_type, rf.rating, rf.timestamp,
+                           ch.message, rb.body
+                    FROM response_feedback rf
+                    JOIN users u ON rf.user_id = u.id
+                    LEFT JOIN chat_history ch ON rf.chat_message_id = ch.id
+                    LEFT JOIN response_bodies rb ON rb.hash = ch.response_hash
+                    ORDER BY rf.timestamp DESC
+                    LIMIT 50
+                """)
             
-            detailed_feedback = cursor.fetchall()
+                detailed_feedback = cursor.fetchall()
             
-            if detailed_feedback:
-                # Display feedback in normal form (not table)
-                st.write("**Recent Feedback Entries:**")
+                if detailed_feedback:
+                    # Display feedback in normal form (not table)
+                    st.write("**Recent Feedback Entries:**")
                 
-                for idx, feedback in enumerate(detailed_feedback[:10], 1):
-                    user_name, email, feedback_type, rating, timestamp, user_msg, bot_response = feedback
+                    for idx, feedback in enumerate(detailed_feedback[:10], 1):
+                        user_name, email, feedback_type, rating, timestamp, user_msg, bot_response = feedback
                     
-                    with st.expander(f"🔹 Feedback #{idx} - {user_name} ({feedback_type})"):
-                        col1, col2 = st.columns(2)
+                        with st.expander(f"🔹 Feedback #{idx} - {user_name} ({feedback_type})"):
+                            col1, col2 = st.columns(2)
                         
-                        with col1:
-                            st.write(f"**User:** {user_name}")
-                            st.write(f"**Email:** {email}")
-                            st.write(f"**Feedback:** {feedback_type}")
+                            with col1:
+                                st.write(f"**User:** {user_name}")
+                                st.write(f"**Email:** {email}")
+                                st.write(f"**Feedback:** {feedback_type}")
                         
-                        with col2:
-                            st.write(f"**Rating:** {'⭐' * (rating if rating else 0)}")
-                            st.write(f"**Time:** {timestamp}")
+                            with col2:
+                                st.write(f"**Rating:** {'⭐' * (rating if rating else 0)}")
+                                st.write(f"**Time:** {timestamp}")
                         
-                        if user_msg:
-                            st.write(f"**User Message:** {user_msg[:200]}...")
-                        if bot_response:
-                            st.write(f"**Bot Response:** {bot_response[:200]}...")
+                            if user_msg:
+                                st.write(f"**User Message:** {user_msg[:200]}...")
+                            if bot_response:
+                                st.write(f"**Bot Response:** {bot_response[:200]}...")
                 
-                st.markdown("---")
+                    st.markdown("---")
                 
-                # Feedback summary in colored boxes
-                st.write("### 📊 Feedback Summary")
+                    # Feedback summary in colored boxes
+                    st.write("### 📊 Feedback Summary")
                 
-                col1, col2, col3 = st.columns(3)
+                    col1, col2, col3 = st.columns(3)
                 
-                with col1:
-                    total_feedback = len(detailed_feedback)
-                    st.markdown(f"""
-                    <div class="metric-box" style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);">
-                        <h3 style="color: black !important; margin: 0;">📊 Total Feedback</h3>
-                        <p style="color: black !important; font-size: 2.5rem; font-weight: bold; margin: 10px 0;">{total_feedback}</p>
-                    </div>
-                    """, unsafe_allow_html=True)
+                    with col1:
+                        total_feedback = len(detailed_feedback)
+                        st.markdown(f"""
+                        <div class="metric-box" style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);">
+                            <h3 style="color: black !important; margin: 0;">📊 Total Feedback</h3>
+                            <p style="color: black !important; font-size: 2.5rem; font-weight: bold; margin: 10px 0;">{total_feedback}</p>
+                        </div>
+                        """, unsafe_allow_html=True)
                 
-                with col2:
-                    thumbs_up_count = sum(1 for f in detailed_feedback if f[2] == 'thumbs_up')
-                    satisfaction_rate = (thumbs_up_count / total_feedback * 100) if total_feedback > 0 else 0
-                    st.markdown(f"""
-                    <div class="metric-box" style="background: linear-gradient(135deg, #4ECDC4 0%, #45B7D1 100%);">
-                        <h3 style="color: black !important; margin: 0;">😊 Satisfaction Rate</h3>
-                        <p style="color: black !important; font-size: 2.5rem; font-weight: bold; margin: 10px 0;">{satisfaction_rate:.1f}%</p>
-                    </div>
-                    """, unsafe_allow_html=True)
+                    with col2:
+                        thumbs_up_count = sum(1 for f in detailed_feedback if f[2] == 'thumbs_up')
+                        satisfaction_rate = (thumbs_up_count / total_feedback * 100) if total_feedback > 0 else 0
+                        st.markdown(f"""
+                        <div class="metric-box" style="background: linear-gradient(135deg, #4ECDC4 0%, #45B7D1 100%);">
+                            <h3 style="color: black !important; margin: 0;">😊 Satisfaction Rate</h3>
+                            <p style="color: black !important; font-size: 2.5rem; font-weight: bold; margin: 10px 0;">{satisfaction_rate:.1f}%</p>
+                        </div>
+                        """, unsafe_allow_html=True)
                 
-                with col3:
-                    thumbs_down = total_feedback - thumbs_up_count
-                    st.markdown(f"""
-                    <div class="metric-box" style="background: linear-gradient(135deg, #FF6B6B 0%, #FF8E53 100%);">
-                        <h3 style="color: black !important; margin: 0;">👎 Thumbs Down</h3>
-                        <p style="color: black !important; font-size: 2.5rem; font-weight: bold; margin: 10px 0;">{thumbs_down}</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-            else:
-                st.info("No feedback data available yet. Users need to rate chatbot responses.")
-            
-            conn.close()
+                    with col3:
+                        thumbs_down = total_feedback - thumbs_up_count
+                        st.markdown(f"""
+                        <div class="metric-box" style="background: linear-gradient(135deg, #FF6B6B 0%, #FF8E53 100%);">
+                            <h3 style="color: black !important; margin: 0;">👎 Thumbs Down</h3>
+                            <p style="color: black !important; font-size: 2.5rem; font-weight: bold; margin: 10px 0;">{thumbs_down}</p>
+                        </div>
+                        """, unsafe_allow_html=True)
+                else:
+                    st.info("No feedback data available yet. Users need to rate chatbot responses.")
             
         except Exception as e:
             st.error(f"Error loading feedback data: {str(e)}")
 
+@perf_timed
 def show_admin_settings():
     """Display admin settings and database management"""
+    import pandas as pd
+
     st.subheader("⚙️ System Settings")
     
-    tab1, tab2 = st.tabs(["Database Management", "User Management"])
+    tab1, tab2, tab3 = st.tabs(["Database Management", "User Management", "Query Log"])
     
     with tab1:
         st.write("**Database Operations:**")
@@ -1915,18 +2849,25 @@ def show_admin_settings():
         with col1:
             st.subheader("📊 Database Statistics")
             try:
-                conn = sqlite3.connect('milestone4_wellness_chatbot.db')
-                cursor = conn.cursor()
-                
-                # Get table statistics
-                tables = ['users', 'chat_history', 'entity_logs', 'response_feedback', 'system_feedback', 'admin_logs']
+                refresh_rollups()
+
+                with get_read_db() as conn:
+                    cursor = conn.cursor()
                 
-                for table in tables:
-                    cursor.execute(f"SELECT COUNT(*) FROM {table}")
-                    count = cursor.fetchone()[0]
-                    st.metric(f"{table.replace('_', ' ').title()}", count)
+                    # Get table statistics
+                    tables = ['users', 'chat_history', 'response_bodies', 'entities', 'chat_entities',
+                              'response_feedback', 'system_feedback', 'admin_logs']
                 
-                conn.close()
+                    # The big tables are counted from the rollups rather than scanned
+                    rollup_counts = get_rollup_table_counts(conn)
+
+                    for table in tables:
+                        if table in rollup_counts:
+                            count = rollup_counts[table]
+                        else:
+                            cursor.execute(f"SELECT COUNT(*) FROM {table}")
+                            count = cursor.fetchone()[0]
+                        st.metric(f"{table.replace('_', ' ').title()}", count)
                 
             except Exception as e:
                 st.error(f"Error getting database stats: {str(e)}")
@@ -1937,13 +2878,15 @@ def show_admin_settings():
             if st.button("🗑️ Clear All Chat History", type="secondary"):
                 if st.session_state.get('confirm_clear_chats', False):
                     try:
-                        conn = sqlite3.connect('milestone4_wellness_chatbot.db')
-                        cursor = conn.cursor()
-                        cursor.execute("DELETE FROM chat_history")
-                        cursor.execute("DELETE FROM entity_logs")
-                        cursor.execute("DELETE FROM response_feedback")
-                        conn.commit()
-                        conn.close()
+                        with get_db() as conn:
+                            cursor = conn.cursor()
+                            cursor.execute("DELETE FROM chat_history")
+                            cursor.execute("DELETE FROM response_bodies")
+                            cursor.execute("DELETE FROM chat_entities")
+                            cursor.execute("DELETE FROM response_feedback")
+                            rebuild_rollups(conn)
+                            rebuild_feedback_rollups(conn)
+                            mark_data_changed(conn)
                         st.success("All chat history cleared!")
                         log_admin_action(st.session_state.get('admin_email', 'admin'), 
                                        "Cleared all chat history", "Database cleanup")
@@ -1957,12 +2900,12 @@ def show_admin_settings():
             if st.button("🗑️ Clear All Feedback", type="secondary"):
                 if st.session_state.get('confirm_clear_feedback', False):
                     try:
-                        conn = sqlite3.connect('milestone4_wellness_chatbot.db')
-                        cursor = conn.cursor()
-                        cursor.execute("DELETE FROM response_feedback")
-                        cursor.execute("DELETE FROM system_feedback")
-                        conn.commit()
-                        conn.close()
+                        with get_db() as conn:
+                            cursor = conn.cursor()
+                            cursor.execute("DELETE FROM response_feedback")
+                            cursor.execute("DELETE FROM system_feedback")
+                            rebuild_feedback_rollups(conn)
+                            mark_data_changed(conn)
                         st.success("All feedback cleared!")
                         log_admin_action(st.session_state.get('admin_email', 'admin'), 
                                        "Cleared all feedback", "Database cleanup")
@@ -1972,6 +2915,37 @@ def show_admin_settings():
                 else:
                     st.session_state.confirm_clear_feedback = True
                     st.warning("⚠️ Click again to confirm deletion of ALL feedback!")
+
+            # Deletes and the response_bodies migration free pages but don't shrink the file
+            if st.button("🧹 Compact Database", type="secondary"):
+                try:
+                    size_before = os.path.getsize(DB_PATH)
+                    with get_db() as conn:
+                        conn.execute("VACUUM")
+                        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                    size_after = os.path.getsize(DB_PATH)
+                    st.success(f"Database compacted: {size_before / 1e6:.1f} MB → {size_after / 1e6:.1f} MB")
+                    log_admin_action(st.session_state.get('admin_email', 'admin'),
+                                   "Compacted database", f"{size_before} -> {size_after} bytes")
+                except Exception as e:
+                    st.error(f"Error compacting database: {str(e)}")
+
+        st.markdown("---")
+        st.subheader("🔎 Query Plan Check")
+        try:
+            with get_read_db() as conn:
+                schema_version = conn.execute("PRAGMA user_version").fetchone()[0]
+                plans = explain_hot_queries(conn)
+
+            st.caption(f"Schema version {schema_version} (latest {SCHEMA_VERSION})")
+            plan_df = pd.DataFrame(plans, columns=['Query', 'Plan', 'Uses Index'])
+            st.dataframe(plan_df, use_container_width=True)
+            if plan_df['Uses Index'].all():
+                st.success("All hot queries are served by an index.")
+            else:
+                st.warning("Some hot queries fall back to a full table scan.")
+        except Exception as e:
+            st.error(f"Error checking query plans: {str(e)}")
     
     with tab2:
         st.write("**User Account Management:**")
@@ -1983,26 +2957,25 @@ def show_admin_settings():
         if st.button("🗑️ Delete User Account", type="secondary"):
             if user_email and st.session_state.get('confirm_delete_user', False):
                 try:
-                    conn = sqlite3.connect('milestone4_wellness_chatbot.db')
-                    cursor = conn.cursor()
-                    
-                    # Get user ID first
-                    cursor.execute("SELECT id FROM users WHERE email = ?", (user_email,))
-                    user_result = cursor.fetchone()
-                    
+                    with get_db() as conn:
+                        cursor = conn.cursor()
+
+                        # Get user ID first
+                        cursor.execute("SELECT id FROM users WHERE email = ?", (user_email,))
+                        user_result = cursor.fetchone()
+
+                        if user_result:
+                            user_id = user_result[0]
+
+                            # Delete all user data
+                            remove_user_rollups(conn, user_id, include_feedback=True)
+                            delete_user_chats(conn, user_id)
+                            cursor.execute("DELETE FROM response_feedback WHERE user_id = ?", (user_id,))
+                            cursor.execute("DELETE FROM system_feedback WHERE user_id = ?", (user_id,))
+                            cursor.execute("DELETE FROM users WHERE id = ?", (user_id,))
+                            mark_data_changed(conn)
+
                     if user_result:
-                        user_id = user_result[0]
-                        
-                        # Delete all user data
-                        cursor.execute("DELETE FROM chat_history WHERE user_id = ?", (user_id,))
-                        cursor.execute("DELETE FROM entity_logs WHERE user_id = ?", (user_id,))
-                        cursor.execute("DELETE FROM response_feedback WHERE user_id = ?", (user_id,))
-                        cursor.execute("DELETE FROM system_feedback WHERE user_id = ?", (user_id,))
-                        cursor.execute("DELETE FROM users WHERE id = ?", (user_id,))
-                        
-                        conn.commit()
-                        conn.close()
-                        
                         st.success(f"User account {user_email} and all associated data deleted!")
                         log_admin_action(st.session_state.get('admin_email', 'admin'), 
                                        f"Deleted user account", f"Email: {user_email}")
@@ -2024,147 +2997,809 @@ def show_admin_settings():
         if st.button("🔑 Reset Password"):
             if reset_email and new_password:
                 try:
-                    conn = sqlite3.connect('milestone4_wellness_chatbot.db')
-                    cursor = conn.cursor()
-                    
                     password_hash = hash_password(new_password)
-                    cursor.execute("UPDATE users SET password_hash = ? WHERE email = ?", 
-                                 (password_hash, reset_email))
-                    
-                    if cursor.rowcount > 0:
-                        conn.commit()
+                    with get_db() as conn:
+                        cursor = conn.execute("UPDATE users SET password_hash = ? WHERE email = ?", 
+                                              (password_hash, reset_email))
+                        updated = cursor.rowcount
+                        if updated:
+                            mark_data_changed(conn)
+
+                    if updated > 0:
                         st.success(f"Password reset for {reset_email}")
                         log_admin_action(st.session_state.get('admin_email', 'admin'), 
                                        f"Reset password", f"Email: {reset_email}")
                     else:
                         st.error("User not found!")
-                    
-                    conn.close()
-                    
+
                 except Exception as e:
                     st.error(f"Error resetting password: {str(e)}")
+
+    with tab3:
+        st.write("**Query Budget and Slow Queries:**")
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Query Budget per Rerun", QUERY_BUDGET_PER_RERUN)
+        with col2:
+            st.metric("Slow Query Threshold", f"{SLOW_QUERY_MS:.0f} ms")
+        with col3:
+            st.metric("Budget Mode", "Strict" if QUERY_BUDGET_STRICT else "Report")
+
+        # The current rerun is still running, so its own count is logged after this render
+        st.subheader("🔁 Recent Reruns")
+        if RERUN_QUERY_LOG:
+            rerun_df = pd.DataFrame(list(RERUN_QUERY_LOG)[::-1])
+            rerun_df.columns = ['Time', 'Page', 'Queries', 'Duration (ms)', 'Over Budget', 'Repeated Statements']
+            over = int(rerun_df['Over Budget'].sum())
+            if over:
+                st.warning(f"{over} of the last {len(rerun_df)} reruns exceeded the query budget.")
+            st.dataframe(rerun_df, use_container_width=True)
+        else:
+            st.info("No reruns recorded yet in this process.")
+
+        st.subheader("🐢 Slow Queries")
+        if SLOW_QUERY_LOG:
+            slow_df = pd.DataFrame(list(SLOW_QUERY_LOG)[::-1])
+            slow_df.columns = ['Time', 'SQL', 'Parameters', 'Duration (ms)', 'Rows', 'Query Plan']
+            st.dataframe(slow_df, use_container_width=True)
+        else:
+            st.success(f"No queries slower than {SLOW_QUERY_MS:.0f} ms recorded in this process.")
+
+        if st.button("🧹 Clear Query Log"):
+            SLOW_QUERY_LOG.clear()
+            RERUN_QUERY_LOG.clear()
+            st.success("Query log cleared!")
     
 
+@perf_timed
+def show_performance():
+    """Display per-stage latency percentiles and the slowest requests"""
+    import pandas as pd
+    import plotly.express as px
 
-def save_chat_message(user_id, message, response, entities, intent, language):
-    try:
-        conn = sqlite3.connect('milestone4_wellness_chatbot.db')
-        cursor = conn.cursor()
-        entities_json = json.dumps(entities) if entities else None
-        cursor.execute("""
-            INSERT INTO chat_history (user_id, message, response, detected_entities, intent, language) 
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (user_id, message, response, entities_json, intent, language))
-        
-        chat_id = cursor.lastrowid
+    st.subheader("⏱️ Performance")
 
-        if entities:
-            for entity_type, entity_list in entities.items():
-                for entity in entity_list:
-                    cursor.execute("""
-                        INSERT INTO entity_logs (user_id, entity_type, entity_value, context)
-                        VALUES (?, ?, ?, ?)
-                    """, (user_id, entity_type, entity, message))
+    time_range = st.selectbox("Select time range:", ["Last hour", "Last 24 hours", "Last 7 days"], index=1)
+    hours = {"Last hour": 1, "Last 24 hours": 24, "Last 7 days": 24 * 7}[time_range]
 
-        conn.commit()
-        conn.close()
-        return chat_id
+    # Include this process's spans that have not reached the flush threshold yet
+    flush_perf_events()
+
+    try:
+        cutoff = (datetime.now(timezone.utc) - timedelta(hours=hours)).strftime('%Y-%m-%d %H:%M:%S')
+        with get_read_db() as conn:
+            events = conn.execute("""
+                SELECT request_id, stage, intent, duration_us, ts FROM perf_events WHERE ts >= ?
+            """, (cutoff,)).fetchall()
     except Exception as e:
+        st.error(f"Error loading performance data: {str(e)}")
+        return
+
+    if not events:
+        st.info("No timing data recorded in this time range yet.")
+        return
+
+    df = pd.DataFrame(events, columns=['Request', 'Stage', 'Intent', 'Duration (us)', 'Time'])
+    df['Duration (ms)'] = df['Duration (us)'] / 1000
+
+    def percentiles(group):
+        durations = group['Duration (ms)']
+        return pd.Series({
+            'Count': len(durations),
+            'p50 (ms)': durations.quantile(0.50),
+            'p95 (ms)': durations.quantile(0.95),
+            'p99 (ms)': durations.quantile(0.99),
+            'Max (ms)': durations.max(),
+        })
+
+    # Per stage
+    stage_df = df.groupby('Stage')[['Duration (ms)']].apply(percentiles).reset_index()
+    stage_df = stage_df.sort_values('p95 (ms)', ascending=False)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Recorded Spans", len(df))
+    with col2:
+        st.metric("Chat Messages", int(df[df['Stage'] == 'respond_total']['Request'].nunique()))
+    with col3:
+        totals = df[df['Stage'] == 'respond_total']['Duration (ms)']
+        st.metric("Pipeline p95", f"{totals.quantile(0.95):.2f} ms" if len(totals) else "N/A")
+
+    fig = px.bar(stage_df, x='Stage', y=['p50 (ms)', 'p95 (ms)', 'p99 (ms)'], barmode='group',
+                 title="Latency by Stage")
+    st.plotly_chart(fig, use_container_width=True)
+    st.dataframe(stage_df.round(3), use_container_width=True)
+
+    # Per intent, for the message pipeline stages
+    pipeline = df[df['Intent'].notna()]
+    if not pipeline.empty:
+        st.subheader("🎯 Latency by Intent")
+        intent_df = pipeline.groupby(['Stage', 'Intent'])[['Duration (ms)']].apply(percentiles).reset_index()
+        st.dataframe(intent_df.round(3), use_container_width=True)
+
+    # Slowest requests with their stage breakdown
+    totals_df = df[df['Stage'] == 'respond_total'].nlargest(20, 'Duration (ms)')
+    if not totals_df.empty:
+        st.subheader("🐢 Slowest Requests")
+        breakdown = (df[df['Request'].isin(totals_df['Request'])]
+                     .pivot_table(index='Request', columns='Stage', values='Duration (ms)', aggfunc='sum'))
+        slowest = totals_df[['Request', 'Intent', 'Time']].set_index('Request').join(breakdown)
+        st.dataframe(slowest.sort_values('respond_total', ascending=False).round(3), use_container_width=True)
+
+def show_chat_search():
+    """Display full-text search across every user's chats"""
+    st.subheader("🔎 Chat Search")
+
+    query = st.text_input("Search messages and responses:", key="admin_search_query",
+                          placeholder="e.g. headache, सिर दर्द, pet dard")
+    if query.strip():
+        render_search_results(query)
+
+def response_hash(response):
+    """Content address of a response body: the first 16 bytes of its SHA-256"""
+    return hashlib.sha256(response.encode()).digest()[:16]
+
+HISTORY_PREVIEW_CHARS = 80
+
+def response_preview(response):
+    """One-line snippet of a response for the history list, without markdown markers"""
+    text = " ".join(re.sub(r"[*_#>`]+|^\s*[•-]\s*", " ", response or "", flags=re.M).split())
+    return text if len(text) <= HISTORY_PREVIEW_CHARS else text[:HISTORY_PREVIEW_CHARS - 1].rstrip() + "…"
+
+# chat_history.entity_mask sets bit (entity_id - 1) for each detected entity.
+# Ids past ENTITY_MASK_BITS (admin-added vocabulary) are only in chat_entities;
+# get_entity_cooccurrence counts those from there.
+ENTITY_MASK_BITS = 63
+
+def entity_mask(entity_ids):
+    mask = 0
+    for entity_id in entity_ids:
+        if entity_id <= ENTITY_MASK_BITS:
+            mask |= 1 << (entity_id - 1)
+    return mask
+
+def _entity_pairs(entities):
+    return {(entity_type, entity) for entity_type, entity_list in (entities or {}).items() for entity in entity_list}
+
+def _write_chat_batch(conn, events):
+    """Insert chat events as one group; returns the new chat_history ids in order.
+
+    events are (user_id, message, response, entities, intent, language) tuples.
+    Responses go to response_bodies once per distinct text; chat_history keeps the hash.
+    """
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    cursor = conn.cursor()
+    hashes = [response_hash(response) for _, _, response, _, _, _ in events]
+    cursor.executemany("INSERT OR IGNORE INTO response_bodies (hash, preview, body) VALUES (?, ?, ?)",
+                       [(digest, response_preview(response), response)
+                        for digest, response in {digest: event[2] for digest, event in zip(hashes, events)}.items()])
+
+    # Intern the batch's entities first so each row's ids and mask are known up front
+    event_pairs = [_entity_pairs(entities) for _, _, _, entities, _, _ in events]
+    entity_ids = {}
+    if any(event_pairs):
+        pairs = list(set().union(*event_pairs))
+        cursor.executemany("INSERT OR IGNORE INTO entities (entity_type, entity_value) VALUES (?, ?)", pairs)
+        # Look up only the batch's pairs, one UNIQUE (entity_type, entity_value) index probe each
+        entity_ids = {(entity_type, value): entity_id for entity_id, entity_type, value in conn.execute(f"""
+            SELECT e.id, e.entity_type, e.entity_value
+            FROM (VALUES {", ".join(["(?, ?)"] * len(pairs))}) AS wanted
+            JOIN entities e ON e.entity_type = wanted.column1 AND e.entity_value = wanted.column2
+        """, [item for pair in pairs for item in pair])}
+    event_entity_ids = [[entity_ids[pair] for pair in pairs] for pairs in event_pairs]
+
+    cursor.executemany("""
+        INSERT INTO chat_history (user_id, message, response_hash, detected_entities, entity_mask, intent, language)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, [(user_id, message, digest, json.dumps(entities) if entities else None, entity_mask(ids), intent, language)
+          for (user_id, message, _, entities, intent, language), digest, ids
+          in zip(events, hashes, event_entity_ids)])
+
+    # We hold the write lock, so AUTOINCREMENT handed out a consecutive block ending here
+    last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+    chat_ids = list(range(last_id - len(events) + 1, last_id + 1))
+
+    cursor.executemany("INSERT INTO chat_entities (chat_id, entity_id) VALUES (?, ?)",
+                       [(chat_id, entity_id) for chat_id, ids in zip(chat_ids, event_entity_ids) for entity_id in ids])
+
+    catch_up_rollups(conn)
+    mark_chats_changed(conn)
+    return chat_ids
+
+@perf_timed
+def save_chat_message(user_id, message, response, entities, intent, language):
+    try:
+        with get_db() as conn:
+            return _write_chat_batch(conn, [(user_id, message, response, entities, intent, language)])[0]
+    except Exception:
         return False
 
+# Write-behind chat persistence settings
+CHAT_WRITE_QUEUE_SIZE = 1000
+CHAT_WRITE_BATCH_SIZE = 64
+CHAT_WRITE_INTERVAL_MS = 20
+
+class ChatWriter:
+    """Background thread that group-commits chat events.
+
+    submit() returns a Future resolving to the chat_history id (or False if
+    the write failed, matching save_chat_message). Events are written with
+    executemany in one transaction per batch of up to batch_size events or
+    interval_ms of waiting, whichever comes first. The thread also writes
+    buffered perf spans, after a batch once PERF_FLUSH_EVENTS are waiting or
+    when flush_spans() asks.
+    """
+
+    FLUSH_SPANS = object()
+
+    def __init__(self, queue_size=CHAT_WRITE_QUEUE_SIZE, batch_size=CHAT_WRITE_BATCH_SIZE,
+                 interval_ms=CHAT_WRITE_INTERVAL_MS):
+        self.batch_size = batch_size
+        self.interval = interval_ms / 1000
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._run, name="ChatWriter", daemon=True)
+        self._thread.start()
+
+    def submit(self, user_id, message, response, entities, intent, language):
+        future = Future()
+        # Blocks when the queue is full, pushing back on callers instead of dropping chats
+        self._queue.put(((user_id, message, response, entities, intent, language), future))
+        return future
+
+    def flush_spans(self):
+        """Ask the thread to write buffered perf spans; never blocks the caller"""
+        try:
+            self._queue.put_nowait(self.FLUSH_SPANS)
+        except queue.Full:
+            # The thread is busy with chats and flushes spans after the batch
+            pass
+
+    def flush(self):
+        """Block until everything submitted so far is committed"""
+        self._queue.join()
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            items = [item]
+            stopping = False
+            deadline = time.monotonic() + self.interval
+            while len(items) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                items.append(item)
+
+            batch = [item for item in items if item is not self.FLUSH_SPANS]
+            if batch:
+                self._write(batch)
+            if len(batch) < len(items) or len(_perf_buffer) >= PERF_FLUSH_EVENTS:
+                flush_perf_events()
+            for _ in items:
+                self._queue.task_done()
+            if stopping:
+                self._queue.task_done()
+                return
+
+    def _write(self, batch):
+        try:
+            with PerfSpan('chat_write_batch'), get_db() as conn:
+                chat_ids = _write_chat_batch(conn, [event for event, _ in batch])
+        except Exception:
+            chat_ids = [False] * len(batch)
+        for (_, future), chat_id in zip(batch, chat_ids):
+            future.set_result(chat_id)
+
+_chat_writer = None
+_chat_writer_lock = threading.Lock()
+
+def get_chat_writer():
+    """Process-wide ChatWriter, started on first use and flushed at exit"""
+    global _chat_writer
+    if _chat_writer is None:
+        with _chat_writer_lock:
+            if _chat_writer is None:
+                _chat_writer = ChatWriter()
+                atexit.register(_chat_writer.close)
+    return _chat_writer
+
+def save_chat_message_async(user_id, message, response, entities, intent, language):
+    """Queue a chat for the background writer; returns a Future of its chat_id"""
+    return get_chat_writer().submit(user_id, message, response, entities, intent, language)
+
+def resolve_chat_id(chat_message, timeout=None):
+    """Fill chat_message['chat_id'] from its pending write.
+
+    With timeout=None this only checks a finished write (never blocks a
+    render); pass a timeout to wait, e.g. when the user clicks feedback.
+    """
+    future = chat_message.get("chat_future")
+    if future is not None and (timeout is not None or future.done()):
+        try:
+            chat_id = future.result(timeout=timeout)
+        except Exception:
+            return chat_message.get("chat_id")
+        del chat_message["chat_future"]
+        if chat_id:
+            chat_message["chat_id"] = chat_id
+    return chat_message.get("chat_id")
+
+# Chat engine: the UI-free message pipeline shared by the Streamlit page and any other caller
+class ChatResult(namedtuple('ChatResult', ['user_id', 'message', 'language', 'intent', 'entities',
+                                           'response', 'chat_future', 'timings'])):
+    """One answered message.
+
+    chat_future resolves to the chat_history id (False if the write failed)
+    and is None when the engine does not persist. timings holds per-stage
+    milliseconds: language, classify, respond and total.
+    """
+    __slots__ = ()
+
+    def chat_id(self, timeout=None):
+        """Wait for the chat write and return its id"""
+        if self.chat_future is None:
+            return None
+        return self.chat_future.result(timeout=timeout)
+
+class WellnessEngine:
+    """detect_language -> classify_intent -> generate_safe_response -> save, without Streamlit.
+
+    The engine works against the module's warmed state (KB snapshot, keyword
+    matcher, connection pools), so many engines or threads can share one
+    process. With persist=False nothing is written, e.g. for load tests.
+    """
+
+    # perf_events stage name for each timings key
+    PERF_STAGES = (
+        ('detect_language', 'language'),
+        ('classify_intent', 'classify'),
+        ('generate_safe_response', 'respond'),
+        ('respond_total', 'total'),
+    )
+
+    def __init__(self, persist=True, writer=None):
+        self.persist = persist
+        self._writer = writer
+
+    @property
+    def writer(self):
+        if self._writer is None:
+            self._writer = get_chat_writer()
+        return self._writer
+
+    def refresh(self):
+        """Pick up knowledge base edits made by other processes"""
+        sync_knowledge_base()
+
+    def _answer(self, user_id, text, language, intent, entities, timings):
+        """Build the response and queue the write; timings arrives with language and classify filled"""
+        started = time.perf_counter()
+        response = generate_safe_response(intent, entities, text, language in ['hindi', 'hinglish'])
+        responded = time.perf_counter()
+
+        chat_future = None
+        if self.persist:
+            chat_future = self.writer.submit(user_id, text, response, entities, intent, language)
+
+        timings['respond'] = (responded - started) * 1000
+        timings['total'] = timings['language'] + timings['classify'] + (time.perf_counter() - started) * 1000
+
+        request_id = new_perf_request_id()
+        for stage, key in self.PERF_STAGES:
+            record_perf(stage, timings[key] * 1000, intent, request_id)
+        return ChatResult(user_id, text, language, intent, entities, response, chat_future, timings)
+
+    def respond(self, user_id, text):
+        """Answer one message and queue it for persistence"""
+        started = time.perf_counter()
+        language = detect_language(text)
+        detected = time.perf_counter()
+        intent, entities = classify_intent(text)
+        timings = {
+            'language': (detected - started) * 1000,
+            'classify': (time.perf_counter() - detected) * 1000,
+        }
+        return self._answer(user_id, text, language, intent, entities, timings)
+
+    def respond_batch(self, requests):
+        """Answer (user_id, text) pairs in order.
+
+        Classification runs once over the whole batch and the writes reach the
+        writer's queue together, so they share group commits. Language and
+        classify timings are the per-message batch averages.
+        """
+        requests = list(requests)
+        if not requests:
+            return []
+        texts = [text for _, text in requests]
+        started = time.perf_counter()
+        languages = [detect_language(text) for text in texts]
+        detected = time.perf_counter()
+        analyses = classify_many(texts)
+        language_ms = (detected - started) * 1000 / len(texts)
+        classify_ms = (time.perf_counter() - detected) * 1000 / len(texts)
+
+        return [
+            self._answer(user_id, text, language, intent, entities,
+                         {'language': language_ms, 'classify': classify_ms})
+            for (user_id, text), language, (intent, entities) in zip(requests, languages, analyses)
+        ]
+
+_engine = None
+
+def get_engine():
+    """Process-wide persisting WellnessEngine"""
+    global _engine
+    if _engine is None:
+        _engine = WellnessEngine()
+    return _engine
+
 def save_response_feedback(user_id, chat_message_id, feedback_type):
-    """Save user feedback for chatbot responses"""
-    try:
-        conn = sqlite3.connect('milestone4_wellness_chatbot.db')
+    """Save user feedback for chatbot responses.
+
+    Runs off the script thread (the feedback executor, chat_server), so it
+    reports nothing itself: a database error is raised to the caller.
+    """
+    with get_db() as conn:
         cursor = conn.cursor()
-        
-        # Check if feedback already exists for this message
+    
+        # Previous vote (if any) so the rollups can move it
         cursor.execute("""
-            SELECT id FROM response_feedback 
+            SELECT id, feedback_type, DATE(timestamp) FROM response_feedback 
             WHERE user_id = ? AND chat_message_id = ?
         """, (user_id, chat_message_id))
-        
+    
         existing = cursor.fetchone()
-        
+    
+        # Insert or update in one statement (unique on user_id, chat_message_id)
+        cursor.execute("""
+            INSERT INTO response_feedback (user_id, chat_message_id, feedback_type, rating)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(user_id, chat_message_id) DO UPDATE SET
+                feedback_type = excluded.feedback_type,
+                rating = excluded.rating,
+                timestamp = CURRENT_TIMESTAMP
+        """, (user_id, chat_message_id, feedback_type, 1 if feedback_type == 'thumbs_up' else 0))
+
+        # Move the vote to today's bucket under its (new) type
         if existing:
-            # Update existing feedback
-            cursor.execute("""
-                UPDATE response_feedback 
-                SET feedback_type = ?, timestamp = CURRENT_TIMESTAMP
-                WHERE user_id = ? AND chat_message_id = ?
-            """, (feedback_type, user_id, chat_message_id))
-        else:
-            # Insert new feedback
-            cursor.execute("""
-                INSERT INTO response_feedback (user_id, chat_message_id, feedback_type, rating)
-                VALUES (?, ?, ?, ?)
-            """, (user_id, chat_message_id, feedback_type, 1 if feedback_type == 'thumbs_up' else 0))
-        
-        conn.commit()
-        conn.close()
-        return True
-    except Exception as e:
-        st.error(f"Error saving feedback: {str(e)}")
+            _add_feedback_rollup(conn, existing[2], existing[1], -1)
+        _add_feedback_rollup(conn, None, feedback_type, 1)
+        mark_data_changed(conn)
+    return True
+
+# Feedback writes run on one background thread: a click never waits on the
+# database, and one user's successive votes on a message land in order.
+_feedback_executor = None
+_feedback_executor_lock = threading.Lock()
+
+def _get_feedback_executor():
+    global _feedback_executor
+    if _feedback_executor is None:
+        with _feedback_executor_lock:
+            if _feedback_executor is None:
+                _feedback_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="feedback")
+    return _feedback_executor
+
+def _save_feedback_when_written(user_id, chat_id, chat_future, feedback_type):
+    if not chat_id and chat_future is not None:
+        chat_id = chat_future.result(timeout=30)
+    if chat_id:
+        return save_response_feedback(user_id, chat_id, feedback_type)
+    return False
+
+def save_response_feedback_async(user_id, chat_message, feedback_type):
+    """Queue a vote for chat_message (waiting for its chat write if still pending).
+
+    Returns a Future; a failed write surfaces as its exception.
+    """
+    return _get_feedback_executor().submit(_save_feedback_when_written, user_id, chat_message.get("chat_id"),
+                                           chat_message.get("chat_future"), feedback_type)
+
+def _submit_feedback(message_index, feedback_type):
+    """on_click for the feedback buttons: remember the choice and queue the write"""
+    message = st.session_state.messages[message_index]
+    message["feedback"] = feedback_type
+    message["feedback_future"] = save_response_feedback_async(st.session_state.user_data['id'], message, feedback_type)
+
+def reset_history_pages():
+    """Forget the loaded history pages so the next view starts from the newest chat"""
+    st.session_state.pop('history_rows', None)
+    st.session_state.pop('history_next', None)
+    st.session_state.pop('history_query', None)
+    st.session_state.pop('search_user', None)
+
+def _load_more_results(state_key, user_id):
+    """on_click for "Load more results": append the next page of search hits"""
+    results = st.session_state[state_key]
+    more, results['next'] = search_chats(results['query'], user_id, results['next'])
+    results['rows'] = results['rows'] + more
+
+def render_search_results(query, user_id=None):
+    """Search hits with highlighted snippets, a page at a time.
+
+    user_id scopes the search to one user's chats; None searches everyone's
+    and shows who sent each message (admin).
+    """
+    if len(" ".join(query.split())) < SEARCH_MIN_CHARS:
+        st.info(f"Type at least {SEARCH_MIN_CHARS} characters to search.")
+        return
+
+    state_key = 'search_all' if user_id is None else 'search_user'
+    results = st.session_state.get(state_key)
+    if results is None or results['query'] != query:
+        rows, next_before_id = search_chats(query, user_id)
+        results = st.session_state[state_key] = {'query': query, 'rows': rows, 'next': next_before_id}
+
+    if not results['rows']:
+        st.info("No chats match your search.")
+        return
+
+    for chat_id, owner, email, message, response, intent, lang, timestamp in results['rows']:
+        sender = f"{email} · " if user_id is None else ""
+        st.caption(f"{sender}{timestamp} · {(intent or 'general').upper()} · {lang}")
+        st.markdown(f"**You:** {message}")
+        st.markdown(f"**Bot:** {response}")
+        st.markdown("---")
+
+    if results['next'] is not None:
+        st.button("⬇️ Load more results", key=f"{state_key}_more", on_click=_load_more_results,
+                  args=(state_key, user_id))
+
+def _load_older_history(user_id):
+    """on_click for "Load older chats": append the next page"""
+    older, st.session_state.history_next = get_chat_history_page(user_id, st.session_state.history_next)
+    st.session_state.history_rows = st.session_state.history_rows + older
+
+@st.fragment
+def render_chat_history(user_id):
+    """Chat history a page at a time; a response is fetched only when its entry is opened"""
+    query = st.text_input("🔍 Search your chats", key="history_query",
+                          placeholder="e.g. headache, सिर दर्द, pet dard")
+    if query.strip():
+        render_search_results(query, user_id)
+        return
+
+    if 'history_rows' not in st.session_state:
+        st.session_state.history_rows, st.session_state.history_next = get_chat_history_page(user_id)
+    rows = st.session_state.history_rows
+
+    if not rows:
+        st.info("No chat history found.")
+        return
+
+    for i, (chat_id, msg, preview, intent, lang, timestamp) in enumerate(rows):
+        entry = st.expander(f"Chat {i+1}: {msg[:50]}... ({timestamp.split()[0]}) - {(intent or 'general').upper()}",
+                            key=f"history_{chat_id}", on_change="rerun")
+        with entry:
+            st.write(f"**You ({lang}):** {msg}")
+            if entry.open:
+                st.write(f"**Bot:** {get_chat_response(user_id, chat_id) or ''}")
+        st.caption(f"🤖 {preview or ''}")
+
+    if st.session_state.history_next is not None:
+        st.button("⬇️ Load older chats", key="history_load_older", on_click=_load_older_history, args=(user_id,))
+
+@st.fragment
+def render_assistant_message(message_index):
+    """One assistant message with its 👍/👎 buttons; a click reruns only this fragment"""
+    message = st.session_state.messages[message_index]
+    st.markdown(message["content"])
+
+    # Pick up the chat_id once its background write has landed
+    resolve_chat_id(message)
+
+    # A vote that failed in the background is reported here, on the script thread
+    future = message.get("feedback_future")
+    if future is not None and future.done():
+        del message["feedback_future"]
+        if future.exception() is not None:
+            message.pop("feedback", None)
+            st.error(f"Error saving feedback: {future.exception()}")
+    selected = message.get("feedback")
+
+    col1, col2, col3 = st.columns([1, 1, 8])
+    with col1:
+        st.button("👍 ✓" if selected == "thumbs_up" else "👍", key=f"thumbs_up_{message_index}",
+                  help="This response was helpful", on_click=_submit_feedback, args=(message_index, "thumbs_up"))
+    with col2:
+        st.button("👎 ✓" if selected == "thumbs_down" else "👎", key=f"thumbs_down_{message_index}",
+                  help="This response was not helpful", on_click=_submit_feedback, args=(message_index, "thumbs_down"))
+
+HISTORY_PAGE_SIZE = 20
+
+@perf_timed
+def get_chat_history_page(user_id, before_id=None, limit=HISTORY_PAGE_SIZE):
+    """One page of a user's chats, newest first, with response previews instead of bodies.
+
+    Returns (rows, next_before_id): rows are (id, message, preview, intent,
+    language, timestamp), and next_before_id fetches the next older page
+    (None when there is none).
+    """
+    id_condition = ""
+    params = [user_id]
+    if before_id is not None:
+        id_condition = "AND ch.id < ?"
+        params.append(before_id)
+    try:
+        with get_read_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT ch.id, ch.message, rb.preview, ch.intent, ch.language, ch.timestamp
+                FROM chat_history ch LEFT JOIN response_bodies rb ON rb.hash = ch.response_hash
+                WHERE ch.user_id = ? {id_condition}
+                ORDER BY ch.id DESC LIMIT ?
+            """, params + [limit + 1])
+            rows = cursor.fetchall()
+        if len(rows) > limit:
+            return rows[:limit], rows[limit - 1][0]
+        return rows, None
+    except Exception:
+        return [], None
+
+def get_chat_response(user_id, chat_id):
+    """Full response text of one of the user's chats"""
+    try:
+        with get_read_db() as conn:
+            row = conn.execute("""
+                SELECT rb.body FROM chat_history ch
+                JOIN response_bodies rb ON rb.hash = ch.response_hash
+                WHERE ch.id = ? AND ch.user_id = ?
+            """, (chat_id, user_id)).fetchone()
+        return row[0] if row else None
+    except Exception:
+        return None
+
+def user_owns_chat(user_id, chat_id):
+    """True when chat_id is one of the user's chats"""
+    try:
+        with get_read_db() as conn:
+            row = conn.execute("SELECT 1 FROM chat_history WHERE id = ? AND user_id = ?",
+                               (chat_id, user_id)).fetchone()
+        return row is not None
+    except Exception:
         return False
 
-def get_chat_history(user_id, limit=20):
+# Chat search: chat_search indexes each chat's message with the trigram
+# tokenizer, so any 3+ character substring matches (Devanagari and Hinglish
+# included). Its owner and reply columns hold one 3-character token each,
+# built from the user id and the response_bodies id, so "this user's chats"
+# and "chats that got one of these responses" are index lookups too.
+SEARCH_PAGE_SIZE = 20
+SEARCH_MIN_CHARS = 3
+SEARCH_TOKEN_SQL = "char(57344 + {0} / 40960000 % 6400, 57344 + {0} / 6400 % 6400, 57344 + {0} % 6400)"
+
+def search_token(n):
+    """Python side of SEARCH_TOKEN_SQL: n as three Private Use Area characters"""
+    return ''.join(chr(57344 + digit) for digit in (n // 40960000 % 6400, n // 6400 % 6400, n % 6400))
+
+def fts_phrase(text):
+    """text as a quoted FTS5 string, matched literally"""
+    return '"' + text.replace('"', '""') + '"'
+
+@perf_timed
+def search_chats(query, user_id=None, before_id=None, limit=SEARCH_PAGE_SIZE):
+    """One page of chats whose message or response contains query, newest first.
+
+    Scoped to user_id when given (the history page), across all users
+    otherwise (admin). Returns (rows, next_before_id); rows are (id, user_id,
+    email, message_snippet, response_snippet, intent, language, timestamp)
+    with matches wrapped in ** for markdown. response_snippet is the
+    preview when only the message matched.
+    """
+    query = " ".join(query.split())
+    if len(query) < SEARCH_MIN_CHARS:
+        return [], None
+    phrase = fts_phrase(query)
+    id_condition = ""
+    params = []
+    if before_id is not None:
+        id_condition = "AND s.rowid < ?"
+        params.append(before_id)
     try:
-        conn = sqlite3.connect('milestone4_wellness_chatbot.db')
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT message, response, detected_entities, intent, language, timestamp 
-            FROM chat_history WHERE user_id = ? ORDER BY timestamp DESC LIMIT ?
-        """, (user_id, limit))
-        result = cursor.fetchall()
-        conn.close()
-        return result
+        with get_read_db() as conn:
+            # Responses are few and shared, so match them first and look
+            # for their reply tokens alongside the message text
+            reply_ids = [row[0] for row in conn.execute(
+                "SELECT rowid FROM response_search WHERE response_search MATCH ?", (phrase,))]
+            expression = f"message : {phrase}"
+            if reply_ids:
+                replies = " OR ".join(fts_phrase(search_token(reply_id)) for reply_id in reply_ids)
+                expression = f"({expression} OR reply : ({replies}))"
+            if user_id is not None:
+                expression = f"owner : {fts_phrase(search_token(user_id))} AND {expression}"
+
+            rows = conn.execute(f"""
+                SELECT s.rowid, ch.user_id, u.email, snippet(chat_search, 0, '**', '**', '…', 48),
+                       rb.id, rb.preview, ch.intent, ch.language, ch.timestamp
+                FROM chat_search s
+                JOIN chat_history ch ON ch.id = s.rowid
+                LEFT JOIN users u ON u.id = ch.user_id
+                LEFT JOIN response_bodies rb ON rb.hash = ch.response_hash
+                WHERE chat_search MATCH ? {id_condition}
+                ORDER BY s.rowid DESC LIMIT ?
+            """, [expression] + params + [limit + 1]).fetchall()
+            next_before_id = rows[limit - 1][0] if len(rows) > limit else None
+            rows = rows[:limit]
+
+            matched = set(reply_ids) & {row[4] for row in rows}
+            snippets = {}
+            if matched:
+                snippets = dict(conn.execute(f"""
+                    SELECT rowid, snippet(response_search, 0, '**', '**', '…', 64) FROM response_search
+                    WHERE response_search MATCH ? AND rowid IN ({','.join('?' * len(matched))})
+                """, [phrase] + list(matched)).fetchall())
+
+        return [(chat_id, owner, email, message, snippets.get(body_id, preview), intent, language, timestamp)
+                for chat_id, owner, email, message, body_id, preview, intent, language, timestamp in rows], next_before_id
     except Exception as e:
-        return []
+        st.error(f"Error searching chats: {str(e)}")
+        return [], None
 
+@perf_timed
 def get_user_entity_stats(user_id):
     try:
-        conn = sqlite3.connect('milestone4_wellness_chatbot.db')
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT entity_type, entity_value, COUNT(*) as frequency
-            FROM entity_logs WHERE user_id = ?
-            GROUP BY entity_type, entity_value
-            ORDER BY frequency DESC LIMIT 10
-        """, (user_id,))
-        result = cursor.fetchall()
-        conn.close()
+        with get_read_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT e.entity_type, e.entity_value, r.mentions as frequency
+                FROM rollup_user_entities r JOIN entities e ON e.id = r.entity_id
+                WHERE r.user_id = ?
+                ORDER BY frequency DESC LIMIT 10
+            """, (user_id,))
+            result = cursor.fetchall()
         return result
-    except Exception as e:
+    except Exception:
         return []
 
+def delete_user_chats(conn, user_id):
+    """Delete a user's chat_history rows and their entity links"""
+    conn.execute("""
+        DELETE FROM chat_entities
+        WHERE chat_id IN (SELECT id FROM chat_history WHERE user_id = ?)
+    """, (user_id,))
+    conn.execute("DELETE FROM chat_history WHERE user_id = ?", (user_id,))
+
 def clear_chat_history(user_id):
     try:
-        conn = sqlite3.connect('milestone4_wellness_chatbot.db')
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM chat_history WHERE user_id = ?", (user_id,))
-        cursor.execute("DELETE FROM entity_logs WHERE user_id = ?", (user_id,))
-        conn.commit()
-        conn.close()
+        with get_db() as conn:
+            remove_user_rollups(conn, user_id)
+            delete_user_chats(conn, user_id)
+            mark_data_changed(conn)
         return True
-    except Exception as e:
+    except Exception:
         return False
 
 def update_user_profile(user_id, profile_data):
     try:
-        conn = sqlite3.connect('milestone4_wellness_chatbot.db')
-        cursor = conn.cursor()
-        cursor.execute("""
-            UPDATE users SET 
-                full_name = ?, preferred_language = ?, age = ?, gender = ?, height_cm = ?, weight_kg = ?,
-                blood_pressure_systolic = ?, blood_pressure_diastolic = ?, health_goals = ?, 
-                medical_conditions = ?, allergies = ?, emergency_contact = ?, updated_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        """, (profile_data['full_name'], profile_data['preferred_language'], profile_data['age'], 
-              profile_data['gender'], profile_data['height_cm'], profile_data['weight_kg'],
-              profile_data['bp_systolic'], profile_data['bp_diastolic'], profile_data['health_goals'],
-              profile_data['medical_conditions'], profile_data['allergies'], profile_data['emergency_contact'], user_id))
-        conn.commit()
-        conn.close()
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE users SET 
+                    full_name = ?, preferred_language = ?, age = ?, gender = ?, height_cm = ?, weight_kg = ?,
+                    blood_pressure_systolic = ?, blood_pressure_diastolic = ?, health_goals = ?, 
+                    medical_conditions = ?, allergies = ?, emergency_contact = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            """, (profile_data['full_name'], profile_data['preferred_language'], profile_data['age'], 
+                  profile_data['gender'], profile_data['height_cm'], profile_data['weight_kg'],
+                  profile_data['bp_systolic'], profile_data['bp_diastolic'], profile_data['health_goals'],
+                  profile_data['medical_conditions'], profile_data['allergies'], profile_data['emergency_contact'], user_id))
+            mark_data_changed(conn)
         return True
     except Exception as e:
         st.error(f"Profile update error: {str(e)}")
@@ -2178,7 +3813,8 @@ def main():
     )
 
     load_css()
-    init_database()
+    ensure_database()
+    sync_knowledge_base()
 
     # Initialize session state
     if 'authenticated' not in st.session_state:
@@ -2204,7 +3840,7 @@ def main():
         st.markdown('<div class="admin-header">🔧 Admin Panel - Wellness Chatbot Management</div>', unsafe_allow_html=True)
         
         # Navigation buttons with large icons
-        col1, col2, col3, col4, col5, col6 = st.columns(6)
+        col1, col2, col3, col4, col5, col6, col7, col8 = st.columns(8)
         
         with col1:
             if st.button("📊\n\nDashboard", key="nav_dashboard", use_container_width=True, help="View Dashboard"):
@@ -2227,6 +3863,14 @@ def main():
                 st.session_state.admin_view = 'settings'
         
         with col6:
+            if st.button("⏱️\n\nPerformance", key="nav_performance", use_container_width=True, help="Latency by Stage"):
+                st.session_state.admin_view = 'performance'
+        
+        with col7:
+            if st.button("🔎\n\nSearch", key="nav_search", use_container_width=True, help="Search Chats"):
+                st.session_state.admin_view = 'search'
+
+        with col8:
             if st.button("🔓\n\nLogout", key="nav_logout", use_container_width=True, help="Logout"):
                 st.session_state.admin_authenticated = False
                 st.session_state.admin_email = None
@@ -2250,6 +3894,10 @@ def main():
             show_content_management()
         elif st.session_state.admin_view == 'settings':
             show_admin_settings()
+        elif st.session_state.admin_view == 'performance':
+            show_performance()
+        elif st.session_state.admin_view == 'search':
+            show_chat_search()
         
         return
 
@@ -2348,6 +3996,7 @@ def main():
 
             if st.button("📜 View History"):
                 st.session_state.show_history = not st.session_state.show_history
+                reset_history_pages()
                 st.session_state.show_analytics = False
                 st.session_state.show_profile = False
 
@@ -2364,12 +4013,14 @@ def main():
             if st.button("🗑️ Clear All History"):
                 if clear_chat_history(st.session_state.user_data['id']):
                     st.session_state.messages = []
+                    reset_history_pages()
                     st.success("History cleared!")
 
             if st.button("🔓 Logout"):
                 st.session_state.authenticated = False
                 st.session_state.user_data = None
                 st.session_state.messages = []
+                reset_history_pages()
                 st.rerun()
 
             st.markdown("---")
@@ -2450,15 +4101,7 @@ def main():
         # Chat History
         elif st.session_state.show_history:
             st.subheader("📜 Chat History")
-            history = get_chat_history(st.session_state.user_data['id'])
-
-            if not history:
-                st.info("No chat history found.")
-            else:
-                for i, (msg, resp, entities_json, intent, lang, timestamp) in enumerate(history):
-                    with st.expander(f"Chat {i+1}: {msg[:50]}... ({timestamp.split()[0]}) - {intent.upper()}"):
-                        st.write(f"**You ({lang}):** {msg}")
-                        st.write(f"**Bot:** {resp}")
+            render_chat_history(st.session_state.user_data['id'])
 
         # User Analytics
         elif st.session_state.show_analytics:
@@ -2499,37 +4142,13 @@ def main():
         else:
             st.subheader("💬 Chat with Your Advanced Wellness Assistant")
 
-            # Display chat messages with feedback buttons
+            # Display chat messages; each assistant message is its own fragment
             for i, message in enumerate(st.session_state.messages):
                 with st.chat_message(message["role"]):
-                    st.markdown(message["content"])
-                    
-                    # Add feedback buttons for ALL assistant responses
                     if message["role"] == "assistant":
-                        # Get chat_id if it exists, otherwise use message index
-                        chat_id = message.get("chat_id", f"msg_{i}")
-                        feedback_key = f"feedback_{chat_id}"
-                        
-                        col1, col2, col3 = st.columns([1, 1, 8])
-                        
-                        # Always show buttons, but indicate if already clicked
-                        with col1:
-                            button_label = "👍 ✓" if feedback_key in st.session_state and st.session_state[feedback_key] == "thumbs_up" else "👍"
-                            if st.button(button_label, key=f"thumbs_up_{i}", help="This response was helpful"):
-                                # Only save to database if we have a real chat_id
-                                if "chat_id" in message:
-                                    save_response_feedback(st.session_state.user_data['id'], message["chat_id"], "thumbs_up")
-                                st.session_state[feedback_key] = "thumbs_up"
-                                st.rerun()
-                        
-                        with col2:
-                            button_label = "👎 ✓" if feedback_key in st.session_state and st.session_state[feedback_key] == "thumbs_down" else "👎"
-                            if st.button(button_label, key=f"thumbs_down_{i}", help="This response was not helpful"):
-                                # Only save to database if we have a real chat_id
-                                if "chat_id" in message:
-                                    save_response_feedback(st.session_state.user_data['id'], message["chat_id"], "thumbs_down")
-                                st.session_state[feedback_key] = "thumbs_down"
-                                st.rerun()
+                        render_assistant_message(i)
+                    else:
+                        st.markdown(message["content"])
 
             if prompt := st.chat_input("Ask me about health in English, Hindi, or Hinglish... / स्वास्थ्य के बारे में पूछें..."):
                 st.session_state.messages.append({"role": "user", "content": prompt})
@@ -2539,35 +4158,19 @@ def main():
 
                 with st.chat_message("assistant"):
                     with st.spinner("Processing your health query..."):
-                        detected_lang = detect_language(prompt)
-
-                        processed_text = prompt
-                        if detected_lang in ['hindi', 'hinglish']:
-                            processed_text = prompt  # Keep original for better processing
-
-                        intent, entities = classify_intent(processed_text)
-
-                        response = generate_safe_response(intent, entities, processed_text, detected_lang in ['hindi', 'hinglish'])
-
-                        st.markdown(response)
-
-                # Save chat message and get the chat ID
-                chat_id = save_chat_message(
-                    st.session_state.user_data['id'], 
-                    prompt, 
-                    response, 
-                    entities, 
-                    intent, 
-                    detected_lang
-                )
+                        result = get_engine().respond(st.session_state.user_data['id'], prompt)
+                        st.markdown(result.response)
 
+                # chat_id resolves from the background write on a later rerun
                 st.session_state.messages.append({
                     "role": "assistant", 
-                    "content": response,
-                    "entities": entities,
-                    "intent": intent,
-                    "chat_id": chat_id
+                    "content": result.response,
+                    "entities": result.entities,
+                    "intent": result.intent,
+                    "chat_future": result.chat_future
                 })
 
-if __name__ == "__main__":
-    main()
\ No newline at end of file
+def run():
+    """One Streamlit rerun"""
+    with query_budget():
+        main()
\ No newline at end of file
@@ -0,0 +1,155 @@
+"""Admin panel scale benchmark.
+
+For each scale, builds (or reuses) a synthetic database with datagen.py and
+times every admin data loader, the raw hot queries, and the admin views
+themselves rendered in Streamlit's bare mode (no server; widgets return
+their defaults). Each target is timed cold, with the admin cache emptied
+before every call, and warm, served from the cache the cold runs filled.
+
+    python benchmarks/bench_admin.py --scales 10k,1m --workdir /tmp/wellness_bench
+
+Anything whose cold median exceeds --budget-ms is flagged as over budget.
+"""
+import argparse
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+import tempfile
+
+from common import load_bot, write_results
+import datagen
+
+
+def clear_admin_cache(bot):
+    with bot._admin_cache_lock:
+        bot._admin_cache.clear()
+
+
+def timed(bot, func, repeat):
+    """Cold and warm median/max milliseconds over repeat calls each, plus the last result"""
+    samples = {'cold': [], 'warm': []}
+    result = None
+    for mode in ('cold', 'warm'):
+        for _ in range(repeat):
+            if mode == 'cold':
+                clear_admin_cache(bot)
+            started = time.perf_counter()
+            result = func()
+            samples[mode].append((time.perf_counter() - started) * 1000)
+    stats = {}
+    for mode, values in samples.items():
+        stats[f'{mode}_median_ms'] = round(statistics.median(values), 2)
+        stats[f'{mode}_max_ms'] = round(max(values), 2)
+    return stats, result
+
+
+def rows_of(result):
+    if isinstance(result, (list, tuple)):
+        return len(result)
+    if isinstance(result, dict):
+        return sum(len(v) if isinstance(v, (list, tuple)) else 1 for v in result.values())
+    return None
+
+
+def targets(bot):
+    """(group, name, callable) for everything timed at each scale"""
+    with bot.get_read_db() as conn:
+        heavy_user, heavy_email = conn.execute("""
+            SELECT u.id, u.email FROM users u
+            WHERE u.id = (SELECT user_id FROM chat_history GROUP BY user_id ORDER BY COUNT(*) DESC LIMIT 1)
+        """).fetchone()
+        # Cursor for the heaviest user's 50th history page, as "Load older chats" would reach it
+        deep_cursor = conn.execute("""
+            SELECT id FROM chat_history WHERE user_id = ? ORDER BY id DESC LIMIT 1 OFFSET ?
+        """, (heavy_user, 49 * bot.HISTORY_PAGE_SIZE)).fetchone()
+        deep_cursor = deep_cursor[0] + 1 if deep_cursor else None
+    # Cursor for page 20 of a name-prefix search, reached the way "Next" would
+    name_cursor = None
+    for _ in range(19):
+        name_cursor = bot.get_user_page("User 1", "full_name", name_cursor)[1] or name_cursor
+
+    loaders = [
+        ("get_admin_dashboard_data", bot.get_admin_dashboard_data),
+        ("get_user_summary", bot.get_user_summary),
+        ("get_user_page", lambda: bot.get_user_page()[0]),
+        ("get_user_page[email prefix]", lambda: bot.get_user_page("user1", "email")[0]),
+        ("get_user_page[name prefix, page 20]", lambda: bot.get_user_page("User 1", "full_name", name_cursor)[0]),
+        ("get_user_details", lambda: bot.get_user_details(heavy_email)),
+        ("get_all_kb_entries", bot.get_all_kb_entries),
+        ("get_chat_history_page[heaviest user]", lambda: bot.get_chat_history_page(heavy_user)[0]),
+        ("get_chat_history_page[heaviest user, page 50]",
+         lambda: bot.get_chat_history_page(heavy_user, deep_cursor)[0]),
+        ("get_user_entity_stats[heaviest user]", lambda: bot.get_user_entity_stats(heavy_user)),
+        ("search_chats[headache]", lambda: bot.search_chats("headache")[0]),
+        ("search_chats[hydrated, heaviest user]", lambda: bot.search_chats("hydrated", heavy_user)[0]),
+        ("search_chats[सिर दर्द]", lambda: bot.search_chats("सिर दर्द")[0]),
+    ]
+
+    def run_query(sql, params):
+        with bot.get_read_db() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    queries = [(name, lambda sql=sql, params=params: run_query(sql, params))
+               for name, (sql, params) in bot.HOT_QUERIES.items()]
+    views = [(func.__name__, func) for func in (
+        bot.show_admin_dashboard, bot.show_user_management, bot.show_system_analytics,
+        bot.show_content_management, bot.show_admin_settings)]
+    return ([("loader",) + item for item in loaders] + [("query",) + item for item in queries]
+            + [("view",) + item for item in views])
+
+
+def bench_scale(bot, scale, workdir, repeat, budget_ms, rebuild):
+    db_path = Path(workdir) / f"admin_{scale}.db"
+    if rebuild and db_path.exists():
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+    fresh = not db_path.exists()
+
+    # Point the app at this scale's database
+    bot.close_db_pools()
+    bot.DB_PATH = str(db_path)
+    bot.init_database()
+    counts = datagen.generate(bot, datagen.SCALES[scale]) if fresh else None
+
+    results = {}
+    for group, name, func in targets(bot):
+        stats, result = timed(bot, func, repeat)
+        stats.update({'group': group, 'rows': rows_of(result), 'over_budget': stats['cold_median_ms'] > budget_ms})
+        results[name] = stats
+        flag = "  OVER BUDGET" if stats['over_budget'] else ""
+        print(f"[{scale}] {group:6s} {name:40s} cold median {stats['cold_median_ms']:>10.2f} ms"
+              f"  max {stats['cold_max_ms']:>10.2f} ms  warm median {stats['warm_median_ms']:>8.2f} ms{flag}")
+    return {'database': str(db_path), 'generated': counts, 'timings': results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Admin panel scale benchmark")
+    parser.add_argument("--scales", default="10k", help=f"comma-separated, from {', '.join(datagen.SCALES)}")
+    parser.add_argument("--workdir", default=str(Path(tempfile.gettempdir()) / "wellness_bench"))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--budget-ms", type=float, default=1000.0, help="flag anything slower than this")
+    parser.add_argument("--rebuild", action="store_true", help="regenerate databases that already exist")
+    parser.add_argument("--output", help="results file (default benchmarks/results/admin.json)")
+    args = parser.parse_args(argv)
+
+    scales = [scale.strip() for scale in args.scales.split(",") if scale.strip()]
+    unknown = [scale for scale in scales if scale not in datagen.SCALES]
+    if unknown:
+        parser.error(f"unknown scale(s): {', '.join(unknown)}")
+
+    # Bare-mode Streamlit logs a warning per widget call
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    Path(args.workdir).mkdir(parents=True, exist_ok=True)
+    bot = load_bot()
+
+    results = {'config': {'repeat': args.repeat, 'budget_ms': args.budget_ms}}
+    for scale in scales:
+        results[scale] = bench_scale(bot, scale, args.workdir, args.repeat, args.budget_ms, args.rebuild)
+    print(f"Saved {write_results('admin', results, args.output)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""Cold-start cost of importing the app, chat-only versus admin.
+
+    python benchmarks/bench_imports.py
+
+Each scenario runs in a fresh interpreter under `-X importtime`:
+
+- import: `import FINAL_OM_CHATBOT` and nothing else.
+- chat: import, ensure_database() and one answered message through the
+  engine - what a regular user's session pays.
+- admin: the chat scenario plus the pandas/plotly.express imports that the
+  admin views do on first use.
+
+Reports total import time, the slowest top-level packages (self time summed
+per package, so nested imports are not double-counted), peak RSS, and
+whether pandas, numpy, plotly.express and pyarrow ended up loaded.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+
+from common import REPO_ROOT, write_results
+
+HEAVY_MODULES = ('pandas', 'numpy', 'plotly.express', 'pyarrow')
+
+SCENARIOS = {
+    'import': "",
+    'chat': (
+        "bot.ensure_database()\n"
+        "bot.sync_knowledge_base()\n"
+        "bot.WellnessEngine(persist=False).respond(0, 'I have a headache and feel stressed')\n"
+    ),
+    'admin': (
+        "bot.ensure_database()\n"
+        "bot.sync_knowledge_base()\n"
+        "bot.WellnessEngine(persist=False).respond(0, 'I have a headache and feel stressed')\n"
+        "import pandas, plotly.express\n"
+    ),
+}
+
+PROBE = """
+import json, logging, resource, sys, time
+logging.disable(logging.WARNING)
+sys.path.insert(0, {root!r})
+started = time.perf_counter()
+import FINAL_OM_CHATBOT as bot
+{body}
+elapsed = time.perf_counter() - started
+print(json.dumps({{
+    'elapsed_ms': round(elapsed * 1000, 1),
+    'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    'loaded': {{name: name in sys.modules for name in {heavy!r}}},
+}}))
+"""
+
+
+def parse_importtime(stderr):
+    """Self microseconds per top-level package from `-X importtime` output"""
+    per_package = defaultdict(int)
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_us, _, name = (part.strip() for part in line[len('import time:'):].split('|'))
+        if self_us.isdigit():
+            per_package[name.split('.')[0]] += int(self_us)
+    return sum(per_package.values()), per_package
+
+
+def run_scenario(name, db_path, top):
+    code = PROBE.format(root=str(REPO_ROOT), body=SCENARIOS[name], heavy=HEAVY_MODULES)
+    env = dict(os.environ, WELLNESS_DB_PATH=str(db_path))
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          capture_output=True, text=True, env=env, check=True)
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    total_us, per_package = parse_importtime(proc.stderr)
+    result['import_ms'] = round(total_us / 1000, 1)
+    result['top_packages_ms'] = {
+        package: round(us / 1000, 1)
+        for package, us in sorted(per_package.items(), key=lambda item: -item[1])[:top]
+    }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--top', type=int, default=8, help="packages to list per scenario")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "imports.db"
+        for name in SCENARIOS:
+            results[name] = run_scenario(name, db_path, args.top)
+
+    for name, result in results.items():
+        loaded = ', '.join(module for module, present in result['loaded'].items() if present) or 'none'
+        print(f"{name:7} import {result['import_ms']:8.1f} ms   total {result['elapsed_ms']:8.1f} ms   "
+              f"max RSS {result['max_rss_mb']:7.1f} MB   heavy loaded: {loaded}")
+        for package, ms in result['top_packages_ms'].items():
+            print(f"          {package:24} {ms:8.1f} ms")
+    write_results('imports', results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""Throughput, latency and allocation benchmark for the NLP/response hot path.
+
+    python benchmarks/bench_nlp.py                       # writes benchmarks/results/nlp.json
+    python benchmarks/bench_nlp.py --compare old.json    # also prints msgs/sec deltas
+
+Each stage runs over the same seeded corpus. Allocation figures come from a
+separate tracemalloc pass so they do not distort the timings.
+"""
+import argparse
+import sys
+import tracemalloc
+
+from common import load_bot, summarize, time_calls, write_results, compare_results
+from corpus import generate_corpus
+
+
+def stage_args(bot, corpus):
+    """(name, function, per-message argument tuples) for every benchmarked stage"""
+    texts = [(item['text'],) for item in corpus]
+    analyses = [bot.classify_intent(item['text']) for item in corpus]
+    hindi = [item['language'] in ('hindi', 'hinglish') for item in corpus]
+    responses = [(intent, entities, item['text'], is_hindi)
+                 for item, (intent, entities), is_hindi in zip(corpus, analyses, hindi)]
+    return [
+        ("detect_language", bot.detect_language, texts),
+        ("extract_health_entities", bot.extract_health_entities, texts),
+        ("classify_intent", bot.classify_intent, texts),
+        ("generate_safe_response", bot.generate_safe_response, responses),
+    ]
+
+
+def allocations(func, args_list, sample=500):
+    """Mean peak bytes allocated per call, and net blocks left behind, over a sample of calls"""
+    args_list = args_list[:sample]
+    peak = 0
+    blocks_before = sys.getallocatedblocks()
+    tracemalloc.start()
+    try:
+        for args in args_list:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            func(*args)
+            peak += tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+    return {
+        'alloc_peak_bytes_per_call': round(peak / len(args_list), 1),
+        'alloc_blocks_retained_per_call': round((sys.getallocatedblocks() - blocks_before) / len(args_list), 3),
+    }
+
+
+def run(bot, corpus, repeat):
+    results = {}
+    for name, func, args_list in stage_args(bot, corpus):
+        time_calls(func, args_list[:200])  # warm up
+        best = None
+        for _ in range(repeat):
+            latencies, wall = time_calls(func, args_list)
+            stats = summarize(latencies, wall)
+            if best is None or stats['per_sec'] > best['per_sec']:
+                best = stats
+        best.update(allocations(func, args_list))
+        results[name] = best
+
+        # Per-language breakdown
+        for language in ('english', 'hindi', 'hinglish'):
+            subset = [args for args, item in zip(args_list, corpus) if item['language'] == language]
+            latencies, wall = time_calls(func, subset)
+            results[f"{name}[{language}]"] = summarize(latencies, wall)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="NLP hot path benchmark")
+    parser.add_argument("--size", type=int, default=3000, help="corpus messages")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--repeat", type=int, default=3, help="timed passes per stage (best is kept)")
+    parser.add_argument("--output", help="results file (default benchmarks/results/nlp.json)")
+    parser.add_argument("--compare", help="previous results file to diff against")
+    args = parser.parse_args(argv)
+
+    bot = load_bot()
+    corpus = generate_corpus(bot, args.size, args.seed)
+    results = run(bot, corpus, args.repeat)
+
+    for name, stats in results.items():
+        extra = f"  {stats['alloc_peak_bytes_per_call']:>8.0f} B/call" if 'alloc_peak_bytes_per_call' in stats else ""
+        print(f"{name:40s} {stats['per_sec']:>12.1f} msgs/s  p50 {stats['p50_us']:>8.2f}us  p99 {stats['p99_us']:>8.2f}us{extra}")
+    path = write_results("nlp", {'config': {'size': args.size, 'seed': args.seed, 'repeat': args.repeat}, **results}, args.output)
+    print(f"Saved {path}")
+
+    if args.compare:
+        regressions = compare_results(results, args.compare)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
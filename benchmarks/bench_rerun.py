@@ -0,0 +1,112 @@
+"""Per-rerun cost of the Streamlit app's startup path.
+
+    python benchmarks/bench_rerun.py
+
+Reports, before vs after the one-time startup path:
+
+- module_exec: executing FINAL_OM_CHATBOT.py top to bottom (KB literals,
+  keyword matcher, pools). Streamlit used to pay this on every rerun because
+  it re-executes the main script; it is now paid once per process.
+- startup: init_database() plus the raw CSS block every rerun, versus
+  ensure_database() plus the cached, minified CSS.
+- rerun: full reruns of the login page and of a chat page with --messages
+  messages, driven by streamlit.testing's AppTest. Times come from the app's
+  own per-rerun log (query_budget), since AppTest's wall time is dominated by
+  its polling loop.
+"""
+import argparse
+import logging
+import runpy
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from common import REPO_ROOT, load_bot, write_results
+
+APP = REPO_ROOT / "FINAL_OM_CHATBOT.py"
+
+
+def median_ms(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(samples), 3)
+
+
+def bench_startup(bot, repeat):
+    import streamlit as st
+
+    def before():
+        st.markdown(f"<style>{bot.APP_CSS}</style>", unsafe_allow_html=True)
+        bot.init_database()
+
+    def after():
+        bot.load_css()
+        bot.ensure_database()
+
+    bot.ensure_database()
+    return {
+        'module_exec_ms': median_ms(lambda: runpy.run_path(str(APP), run_name="rerun_bench"), max(3, repeat // 10)),
+        'startup_before_ms': median_ms(before, repeat),
+        'startup_after_ms': median_ms(after, repeat),
+        'css_bytes_before': len(f"<style>{bot.APP_CSS}</style>".encode()),
+        'css_bytes_after': len(bot.css_markup().encode()),
+    }
+
+
+def bench_reruns(bot, repeat, messages):
+    from streamlit.testing.v1 import AppTest
+
+    def rerun_ms(app):
+        samples = []
+        for _ in range(repeat):
+            app.run()
+            samples.append(bot.RERUN_QUERY_LOG[-1]['duration_ms'])
+        return round(statistics.median(samples), 3)
+
+    login = AppTest.from_file(str(APP), default_timeout=60)
+    login.run()
+
+    bot.create_user("rerun@example.com", "bench", "Rerun Bench")
+    _, user = bot.authenticate_user("rerun@example.com", "bench")
+    chat = AppTest.from_file(str(APP), default_timeout=60)
+    chat.session_state.authenticated = True
+    chat.session_state.user_data = user
+    chat.session_state.messages = [
+        {"role": role, "content": "I have a headache" if role == "user" else "Rest and drink water."}
+        for _ in range(messages // 2) for role in ("user", "assistant")
+    ]
+    chat.run()
+
+    return {
+        'rerun_login_page_ms': rerun_ms(login),
+        f'rerun_chat_page_{messages}_messages_ms': rerun_ms(chat),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Streamlit rerun overhead benchmark")
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--messages", type=int, default=20, help="messages in the chat page scenario")
+    parser.add_argument("--output", help="results file (default benchmarks/results/rerun.json)")
+    args = parser.parse_args(argv)
+
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    bot = load_bot(Path(tempfile.mkdtemp()) / "rerun_bench.db")
+
+    results = bench_startup(bot, args.repeat)
+    results['per_rerun_overhead_before_ms'] = round(results['module_exec_ms'] + results['startup_before_ms'], 3)
+    results['per_rerun_overhead_after_ms'] = results['startup_after_ms']
+    results.update(bench_reruns(bot, max(3, args.repeat // 5), args.messages))
+    for name, value in results.items():
+        print(f"{name:40s} {value:>12}")
+    print(f"Saved {write_results('rerun', results, args.output)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""Admin cache check: chat writes between two admin loads keep the cache warm.
+
+    python benchmarks/check_admin_cache.py
+
+Creates a scratch database, loads the admin dashboard, writes chats through
+the background writer and loads it again. The second load must be a cache
+hit: it issues only the generation read. A feedback write, or chats older
+than ADMIN_CACHE_MIN_AGE, must make the next load a miss.
+Exits non-zero on the first failed check.
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+from common import load_bot
+
+
+def check(label, ok, detail=""):
+    if not ok:
+        sys.exit(f"FAIL {label}: {detail}")
+    print(f"ok   {label}")
+
+
+def dashboard_queries(bot):
+    """Queries one get_admin_dashboard_data() call issues; 1 means a cache hit"""
+    with bot.query_budget("check") as budget:
+        bot.get_admin_dashboard_data()
+    return budget['count']
+
+
+def write_chats(bot, user_id, count):
+    futures = [bot.save_chat_message_async(user_id, f"I have a headache {n}", "Drink water and rest",
+                                           {"symptoms": ["headache"]}, "symptom", "english")
+               for n in range(count)]
+    return [future.result(timeout=10) for future in futures]
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        bot = load_bot(Path(tmp) / "cache.db")
+        bot.ensure_database()
+        bot.create_user("cache@example.com", "secret", "Cache Check", "english")
+        with bot.get_read_db() as conn:
+            user_id = conn.execute("SELECT id FROM users WHERE email = ?", ("cache@example.com",)).fetchone()[0]
+
+        check("first load is a miss", dashboard_queries(bot) > 1)
+        check("repeat load is a hit", dashboard_queries(bot) == 1)
+
+        chat_ids = write_chats(bot, user_id, 20)
+        check("chats written", all(chat_ids), chat_ids)
+        queries = dashboard_queries(bot)
+        check("load after chat writes is a hit", queries == 1, f"{queries} queries")
+
+        bot.save_response_feedback(user_id, chat_ids[0], "thumbs_up")
+        queries = dashboard_queries(bot)
+        check("load after a feedback write is a miss", queries > 1, f"{queries} queries")
+
+        write_chats(bot, user_id, 5)
+        bot.ADMIN_CACHE_MIN_AGE = 0
+        queries = dashboard_queries(bot)
+        check("load after chats past ADMIN_CACHE_MIN_AGE is a miss", queries > 1, f"{queries} queries")
+        data = bot.get_admin_dashboard_data()
+        check("dashboard counts every chat", data['total_conversations'] == 25, data['total_conversations'])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Keyword matcher check: whole-word matching and inflection folding.
+
+    python benchmarks/check_matcher.py
+
+Runs extract_health_entities() and classify_intent() over messages with a
+known answer: inflected forms that must fold onto their keyword, and words
+that merely start or end like a keyword and must not match.
+Exits non-zero on the first failed check.
+"""
+import sys
+
+from common import load_bot
+
+# message -> entities that must be found, as (category, value)
+MATCHES = {
+    "I have headaches every day": {("symptoms", "headache")},
+    "she keeps coughing at night": {("symptoms", "cough")},
+    "my eyes and ears hurt": {("body_parts", "eye"), ("body_parts", "ear"), ("symptoms", "hurt")},
+    "both knees are aching": {("body_parts", "knee"), ("symptoms", "ache")},
+    "मेरी आंखों में दर्द है": {("body_parts", "eye"), ("symptoms", "pain")},
+}
+
+# message -> entities that must NOT be found
+NON_MATCHES = {
+    "the guard was armed": {("body_parts", "arm")},
+    "he is left handed": {("body_parts", "hand")},
+    "we are heading home": {("body_parts", "head")},
+    "a long nosed dog": {("body_parts", "nose")},
+    "thanks for backing me up": {("body_parts", "back")},
+    "I won the competition": {("symptoms", "stomach"), ("body_parts", "stomach")},
+    "my headache is bad": {("symptoms", "ache")},
+    "she was legendary": {("body_parts", "leg")},
+}
+
+# message -> intent
+INTENTS = {
+    "I burned my hand on the stove": "first_aid",
+    "he sprained his ankle": "first_aid",
+    "feeling low today": "symptom",
+    "this is a test": "general",
+    "heading out now, bye": "farewell",
+}
+
+
+def check(label, ok, detail=""):
+    if not ok:
+        sys.exit(f"FAIL {label}: {detail}")
+    print(f"ok   {label}")
+
+
+def found(bot, message):
+    return {(category, value) for category, values in bot.extract_health_entities(message).items()
+            for value in values}
+
+
+def main():
+    bot = load_bot()
+    for message, expected in MATCHES.items():
+        entities = found(bot, message)
+        check(f"matches {message!r}", expected <= entities, sorted(entities))
+    for message, unexpected in NON_MATCHES.items():
+        entities = found(bot, message)
+        check(f"no match in {message!r}", not (unexpected & entities), sorted(entities))
+    for message, intent in INTENTS.items():
+        got = bot.classify_intent(message)[0]
+        check(f"intent of {message!r}", got == intent, got)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Upgrade check: migrate a database created with the original schema.
+
+    python benchmarks/check_upgrade.py
+
+Builds a scratch database with the tables as the app first created them
+(response text inline in chat_history, entity_logs, no user_version), fills
+it with a few users and chats, runs ensure_database(), and checks that
+nothing was lost: every chat still resolves to its original response and
+is found by search_chats (the search index is backfilled on upgrade).
+Exits non-zero on the first failed check.
+"""
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+from common import load_bot
+
+# init_database() as of the first release, before any migration existed
+BASELINE_SCHEMA = """
+CREATE TABLE users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    email TEXT UNIQUE NOT NULL,
+    password_hash TEXT NOT NULL,
+    full_name TEXT NOT NULL,
+    preferred_language TEXT DEFAULT 'english',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    age INTEGER,
+    gender TEXT,
+    height_cm INTEGER,
+    weight_kg REAL,
+    blood_pressure_systolic INTEGER,
+    blood_pressure_diastolic INTEGER,
+    health_goals TEXT,
+    medical_conditions TEXT,
+    allergies TEXT,
+    emergency_contact TEXT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE chat_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    message TEXT NOT NULL,
+    response TEXT NOT NULL,
+    detected_entities TEXT,
+    intent TEXT,
+    language TEXT DEFAULT 'english',
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users (id)
+);
+CREATE TABLE entity_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    entity_type TEXT NOT NULL,
+    entity_value TEXT NOT NULL,
+    context TEXT,
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users (id)
+);
+CREATE TABLE admin_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    admin_email TEXT NOT NULL,
+    action TEXT NOT NULL,
+    details TEXT,
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE knowledge_base (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    content_type TEXT NOT NULL,
+    topic_key TEXT NOT NULL UNIQUE,
+    topic_name TEXT NOT NULL,
+    english_content TEXT NOT NULL,
+    hindi_content TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    created_by TEXT
+);
+CREATE TABLE system_feedback (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER,
+    feedback_type TEXT NOT NULL,
+    rating INTEGER,
+    comments TEXT,
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users (id)
+);
+CREATE TABLE response_feedback (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    chat_message_id INTEGER,
+    feedback_type TEXT NOT NULL,
+    rating INTEGER,
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users (id)
+);
+"""
+
+CHATS = [
+    (1, "I have a headache", "**Headache relief:**\n\n• Drink water\n• Rest", '{"symptoms": ["headache"]}', "symptom", "english"),
+    (1, "mujhe sirdard hai", "**सिरदर्द के लिए:** पानी पिएं", '{"symptoms": ["sirdard"]}', "symptom", "hinglish"),
+    (2, "I have a headache", "**Headache relief:**\n\n• Drink water\n• Rest", '{"symptoms": ["headache"]}', "symptom", "english"),
+    (2, "hello", "Hello! How can I help you today?", "{}", "greeting", "english"),
+]
+
+
+def build_baseline(path):
+    conn = sqlite3.connect(path)
+    conn.executescript(BASELINE_SCHEMA)
+    conn.executemany("INSERT INTO users (email, password_hash, full_name) VALUES (?, 'x', ?)",
+                     [("a@example.com", "User A"), ("b@example.com", "User B")])
+    conn.executemany("""
+        INSERT INTO chat_history (user_id, message, response, detected_entities, intent, language)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, CHATS)
+    conn.executemany("""
+        INSERT INTO entity_logs (user_id, entity_type, entity_value, context) VALUES (?, ?, ?, ?)
+    """, [(1, "symptoms", "headache", CHATS[0][1]), (1, "symptoms", "sirdard", CHATS[1][1]),
+          (2, "symptoms", "headache", CHATS[2][1])])
+    conn.commit()
+    conn.close()
+
+
+def check(label, ok, detail=""):
+    if not ok:
+        sys.exit(f"FAIL {label}: {detail}")
+    print(f"ok   {label}")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "baseline.db"
+        build_baseline(db_path)
+        bot = load_bot(db_path)
+        bot.ensure_database()
+
+        with bot.get_read_db() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            check("schema version", version == bot.SCHEMA_VERSION, version)
+            rows = conn.execute("""
+                SELECT ch.id, ch.message, rb.body FROM chat_history ch
+                LEFT JOIN response_bodies rb ON rb.hash = ch.response_hash
+                ORDER BY ch.id
+            """).fetchall()
+        check("chat count", len(rows) == len(CHATS), len(rows))
+        for (chat_id, message, body), chat in zip(rows, CHATS):
+            check(f"chat {chat_id} response", body == chat[2], repr(body))
+            hits = [row[0] for row in bot.search_chats(message, chat[0])[0]]
+            check(f"chat {chat_id} searchable", chat_id in hits, hits)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Shared helpers for the benchmark scripts: app import, timing summaries, JSON results."""
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def load_bot(db_path=None):
+    """Import FINAL_OM_CHATBOT from the repo root, optionally against a scratch database"""
+    if db_path:
+        os.environ['WELLNESS_DB_PATH'] = str(db_path)
+    if str(REPO_ROOT) not in sys.path:
+        sys.path.insert(0, str(REPO_ROOT))
+    import FINAL_OM_CHATBOT as bot
+    return bot
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies_ns, wall_seconds=None):
+    """msgs/sec and latency percentiles (microseconds) for one run"""
+    values = sorted(latencies_ns)
+    total = wall_seconds if wall_seconds is not None else sum(values) / 1e9
+    return {
+        'calls': len(values),
+        'per_sec': round(len(values) / total, 1) if total else 0.0,
+        'p50_us': round(percentile(values, 0.50) / 1000, 2),
+        'p99_us': round(percentile(values, 0.99) / 1000, 2),
+        'max_us': round(values[-1] / 1000, 2) if values else 0.0,
+    }
+
+
+def time_calls(func, args_list):
+    """Run func(*args) for each args tuple; returns per-call ns and wall seconds"""
+    latencies = []
+    clock = time.perf_counter_ns
+    started = clock()
+    for args in args_list:
+        before = clock()
+        func(*args)
+        latencies.append(clock() - before)
+    return latencies, (clock() - started) / 1e9
+
+
+def write_results(name, results, output=None):
+    """Save results with run metadata; returns the path written"""
+    path = Path(output) if output else RESULTS_DIR / f"{name}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        'benchmark': name,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    path.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding='utf-8')
+    return path
+
+
+def compare_results(current, baseline_path, metric='per_sec', threshold=0.10):
+    """Print metric changes vs a previous results file; returns names that regressed past threshold"""
+    baseline = json.loads(Path(baseline_path).read_text(encoding='utf-8'))['results']
+    regressions = []
+    for name, stats in current.items():
+        old = baseline.get(name, {}).get(metric)
+        new = stats.get(metric)
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        flag = ""
+        if change < -threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:40s} {old:>12.1f} -> {new:>12.1f} {metric} ({change:+.1%}){flag}")
+    return regressions
@@ -0,0 +1,63 @@
+"""Seeded synthetic chat corpus: English, Devanagari Hindi and Hinglish messages
+of varying length and entity density."""
+import random
+
+LANGUAGES = ("english", "hindi", "hinglish")
+LENGTHS = {"short": (3, 6), "medium": (10, 20), "long": (40, 80)}
+# Share of words drawn from the health vocabulary
+DENSITIES = {"none": 0.0, "low": 0.1, "high": 0.4}
+
+FILLER = {
+    "english": ("i", "have", "been", "feeling", "since", "yesterday", "and", "it", "is", "getting", "worse",
+                "what", "should", "do", "my", "the", "a", "today", "morning", "night", "very", "little",
+                "please", "help", "with", "after", "work", "sometimes", "really", "can", "you", "tell", "me"),
+    "hindi": ("मुझे", "है", "हो", "रहा", "कल", "से", "और", "बहुत", "क्या", "करूं", "मेरा", "मेरी", "आज",
+              "सुबह", "रात", "थोड़ा", "कृपया", "बताइए", "काम", "के", "बाद", "कभी", "कभी"),
+    "hinglish": ("mujhe", "hai", "ho", "raha", "kal", "se", "aur", "bahut", "kya", "karu", "mera", "meri",
+                 "aaj", "subah", "raat", "thoda", "please", "batao", "kaam", "ke", "baad", "kabhi"),
+}
+OPENERS = {
+    "english": ("hello", "hi", "tips", "thanks", "burn", "cut"),
+    "hindi": ("नमस्ते", "धन्यवाद", "अलविदा"),
+    "hinglish": ("namaste", "alvida", "jal", "kat"),
+}
+
+
+def health_terms(bot):
+    """Entity vocabulary per language, taken from the app's own tables"""
+    english = sorted({term for terms in bot.HEALTH_ENTITIES.values() for term in terms})
+    hindi = sorted(term for term in bot.HINDI_ENTITIES if any('ऀ' <= ch <= 'ॿ' for ch in term))
+    hinglish = sorted(term for term in bot.HINDI_ENTITIES if term not in hindi)
+    return {"english": english, "hindi": hindi, "hinglish": hinglish}
+
+
+def make_message(rng, terms, language, length, density):
+    low, high = LENGTHS[length]
+    words = []
+    if rng.random() < 0.3:
+        words.append(rng.choice(OPENERS[language]))
+    for _ in range(rng.randint(low, high)):
+        if rng.random() < DENSITIES[density]:
+            words.append(rng.choice(terms[language]))
+        else:
+            words.append(rng.choice(FILLER[language]))
+    text = " ".join(words)
+    return text[0].upper() + text[1:] if language != "hindi" else text
+
+
+def generate_corpus(bot, size=3000, seed=1234):
+    """List of {'text', 'language', 'length', 'density'} dicts, identical for a given seed"""
+    rng = random.Random(seed)
+    terms = health_terms(bot)
+    corpus = []
+    for i in range(size):
+        language = LANGUAGES[i % len(LANGUAGES)]
+        length = rng.choice(tuple(LENGTHS))
+        density = rng.choice(tuple(DENSITIES))
+        corpus.append({
+            'text': make_message(rng, terms, language, length, density),
+            'language': language,
+            'length': length,
+            'density': density,
+        })
+    return corpus
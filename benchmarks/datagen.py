@@ -0,0 +1,177 @@
+"""Synthetic data generator for admin-panel scale testing.
+
+Fills users, chat_history, chat_entities, response_feedback and admin_logs in
+a scratch database with skewed, realistic-looking distributions:
+
+- a few heavy users and a long tail (Pareto activity per user)
+- more traffic in recent weeks and in the evening (timestamp weights)
+- English-heavy language mix, messages reused from a seeded pool with
+  Zipf-like popularity, entities/intents from the app's own classifier
+
+    python benchmarks/datagen.py --scale 1m --db /tmp/wellness_1m.db
+
+Rows are written with executemany in chunked transactions; the rollup
+tables are rebuilt once at the end.
+"""
+import argparse
+import bisect
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from common import load_bot
+from corpus import generate_corpus
+
+# Scale name -> chat_history rows
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+CHATS_PER_USER = 50
+FEEDBACK_RATE = 0.2
+ADMIN_LOGS_PER_CHAT = 0.001
+HISTORY_DAYS = 180
+MESSAGE_POOL_SIZE = 5000
+CHUNK_ROWS = 50_000
+
+# Evening-heavy hour-of-day weights
+HOUR_WEIGHTS = [1, 1, 1, 1, 1, 2, 3, 5, 6, 6, 6, 6, 7, 6, 6, 6, 7, 8, 10, 11, 11, 9, 6, 3]
+GENDERS = ["Male", "Female", "Other", None]
+LANGUAGE_PREFS = ["english", "english", "english", "hindi", "hinglish"]
+
+
+def cumulative(weights):
+    total, out = 0, []
+    for weight in weights:
+        total += weight
+        out.append(total)
+    return out
+
+
+def weighted_index(rng, cumulative_weights):
+    return bisect.bisect_right(cumulative_weights, rng.random() * cumulative_weights[-1])
+
+
+def message_pool(bot, seed):
+    """Pre-analyzed (message, response_hash, response, entities_json, entity_rows, intent, language) tuples"""
+    pool = []
+    for item in generate_corpus(bot, MESSAGE_POOL_SIZE, seed):
+        text = item['text']
+        language = bot.detect_language(text)
+        intent, entities = bot.classify_intent(text)
+        response = bot.generate_safe_response(intent, entities, text, language in ['hindi', 'hinglish'])
+        has_entities = any(entities.values())
+        entity_rows = [(entity_type, value) for entity_type, values in entities.items() for value in values]
+        pool.append((text, bot.response_hash(response), response, json.dumps(entities) if has_entities else None,
+                     entity_rows, intent, language))
+    return pool
+
+
+def generate(bot, chats, seed=42, log=print):
+    """Append chats chat_history rows (plus matching users, entities, feedback, admin logs)"""
+    rng = random.Random(seed)
+    now = datetime.now().replace(microsecond=0)
+    users = max(20, chats // CHATS_PER_USER)
+    pool = message_pool(bot, seed)
+    pool_weights = cumulative(1 / (rank + 1) for rank in range(len(pool)))
+    # Recent days get more traffic: weight grows linearly toward today
+    day_weights = cumulative(1 + 3 * (HISTORY_DAYS - d) / HISTORY_DAYS for d in range(HISTORY_DAYS))
+    hour_weights = cumulative(HOUR_WEIGHTS)
+
+    def timestamp(max_days=HISTORY_DAYS):
+        day = min(weighted_index(rng, day_weights), max_days - 1)
+        moment = now - timedelta(days=day)
+        moment = moment.replace(hour=weighted_index(rng, hour_weights), minute=rng.randrange(60), second=rng.randrange(60))
+        return min(moment, now).strftime('%Y-%m-%d %H:%M:%S')
+
+    started = time.perf_counter()
+    password_hash = bot.hash_password("password")
+    with bot.get_db() as conn:
+        first_user = conn.execute("SELECT COALESCE(MAX(id), 0) FROM users").fetchone()[0] + 1
+        conn.executemany("""
+            INSERT INTO users (email, password_hash, full_name, preferred_language, created_at, age, gender,
+                               height_cm, weight_kg)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [(f"user{first_user + n}@example.com", password_hash, f"User {first_user + n}",
+               rng.choice(LANGUAGE_PREFS), timestamp(), rng.choice([None, rng.randint(14, 80)]),
+               rng.choice(GENDERS), rng.randint(145, 195), round(rng.uniform(40, 110), 1))
+              for n in range(users)])
+    log(f"users: {users} in {time.perf_counter() - started:.1f}s")
+
+    # Heavy users: Pareto activity weights over user ids
+    user_weights = cumulative(rng.paretovariate(1.2) for _ in range(users))
+
+    started = time.perf_counter()
+    entity_total = feedback_total = 0
+    with bot.get_db() as conn:
+        conn.executemany("INSERT OR IGNORE INTO response_bodies (hash, preview, body) VALUES (?, ?, ?)",
+                         [(digest, bot.response_preview(response), response)
+                          for digest, response in {digest: response for _, digest, response, *_ in pool}.items()])
+        conn.executemany("INSERT OR IGNORE INTO entities (entity_type, entity_value) VALUES (?, ?)",
+                         {pair for item in pool for pair in item[4]})
+        entity_ids = {(entity_type, value): entity_id
+                      for entity_id, entity_type, value in conn.execute("SELECT id, entity_type, entity_value FROM entities")}
+        next_chat_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM chat_history").fetchone()[0] + 1
+    pool_masks = [bot.entity_mask(entity_ids[pair] for pair in item[4]) for item in pool]
+    remaining = chats
+    while remaining:
+        size = min(CHUNK_ROWS, remaining)
+        chat_rows, entity_rows, feedback_rows = [], [], []
+        for chat_id in range(next_chat_id, next_chat_id + size):
+            user_id = first_user + weighted_index(rng, user_weights)
+            index = weighted_index(rng, pool_weights)
+            message, digest, _, entities_json, entities, intent, language = pool[index]
+            ts = timestamp()
+            chat_rows.append((user_id, message, digest, entities_json, pool_masks[index], intent, language, ts))
+            entity_rows.extend((chat_id, entity_ids[pair]) for pair in entities)
+            if rng.random() < FEEDBACK_RATE:
+                feedback_type = 'thumbs_up' if rng.random() < 0.72 else 'thumbs_down'
+                feedback_rows.append((user_id, chat_id, feedback_type, 1 if feedback_type == 'thumbs_up' else 0, ts))
+        with bot.get_db() as conn:
+            conn.executemany("""
+                INSERT INTO chat_history (user_id, message, response_hash, detected_entities, entity_mask, intent,
+                                          language, timestamp)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, chat_rows)
+            conn.executemany("INSERT OR IGNORE INTO chat_entities (chat_id, entity_id) VALUES (?, ?)", entity_rows)
+            conn.executemany("""
+                INSERT INTO response_feedback (user_id, chat_message_id, feedback_type, rating, timestamp)
+                VALUES (?, ?, ?, ?, ?)
+            """, feedback_rows)
+        next_chat_id += size
+        remaining -= size
+        entity_total += len(entity_rows)
+        feedback_total += len(feedback_rows)
+        log(f"chat_history: {chats - remaining}/{chats} ({time.perf_counter() - started:.1f}s)")
+
+    admin_rows = [("admin@wellness.com", rng.choice(["Added KB entry", "Deleted user account", "Reset password",
+                                                     "Cleared all feedback", "Updated KB entry"]),
+                   "synthetic", timestamp())
+                  for _ in range(max(1, int(chats * ADMIN_LOGS_PER_CHAT)))]
+    with bot.get_db() as conn:
+        conn.executemany("INSERT INTO admin_logs (admin_email, action, details, timestamp) VALUES (?, ?, ?, ?)", admin_rows)
+
+    started = time.perf_counter()
+    with bot.get_db() as conn:
+        bot.rebuild_rollups(conn)
+        bot.rebuild_feedback_rollups(conn)
+    log(f"rollups rebuilt in {time.perf_counter() - started:.1f}s")
+    return {'users': users, 'chat_history': chats, 'chat_entities': entity_total,
+            'response_feedback': feedback_total, 'admin_logs': len(admin_rows)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fill a scratch database with synthetic chat data")
+    parser.add_argument("--scale", choices=SCALES, default="10k")
+    parser.add_argument("--db", required=True, help="scratch SQLite file (created if missing)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    bot = load_bot(args.db)
+    bot.init_database()
+    counts = generate(bot, SCALES[args.scale], args.seed)
+    print(json.dumps(counts, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""Prebuild the knowledge base bundle loaded by FINAL_OM_CHATBOT.py.
+
+Compiles wellness_kb_source.py (the built-in KB, health entities and
+Hindi/Hinglish vocabulary) and the keyword matcher tables into
+wellness_kb.bundle. Run it as a deploy step after editing the source:
+
+    python build_kb.py
+    python build_kb.py --output /srv/wellness/wellness_kb.bundle
+
+The app rebuilds a missing or stale bundle on its own, so this step only
+moves that cost out of the first worker's startup.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import FINAL_OM_CHATBOT as bot
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prebuild the knowledge base bundle")
+    parser.add_argument("--output", type=Path, default=bot.KB_BUNDLE_PATH, help="bundle path")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    payload = bot.compile_kb_source()
+    size = bot.write_kb_bundle(payload, args.output)
+    built_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    if bot.read_kb_bundle(args.output) != payload:
+        sys.exit(f"{args.output}: bundle did not round-trip")
+    load_ms = (time.perf_counter() - started) * 1000
+
+    print(f"{args.output}: {size / 1024:.1f} KiB, built in {built_ms:.1f} ms, loads in {load_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
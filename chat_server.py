@@ -0,0 +1,452 @@
+"""Optional asyncio HTTP/WebSocket front end for the wellness chatbot.
+
+Serves the same pipeline as the Streamlit app (WellnessEngine) without a
+browser rerun per message:
+
+    POST /login      {"email", "password"}            -> {"token", "user"}
+    POST /logout                                       -> {"ok"}
+    POST /chat       {"message"}                       -> chat result
+    POST /feedback   {"chat_id" | "message_ref", "feedback_type"} -> {"ok"}
+    GET  /ws?token=  WebSocket; send {"message"}, receive chat results
+
+/logout, /chat and /feedback take "Authorization: Bearer <token>". Tokens
+expire after SESSION_IDLE_SECONDS without use. CPU work runs in a bounded
+thread pool; chat rows go through the engine's write-behind writer, so
+concurrent messages share group commits. A chat result is sent as soon as
+the reply is ready: if its row is not committed yet, chat_id is null and
+message_ref names it instead. /feedback accepts that ref and waits for the
+write; WebSocket clients also get {"message_ref", "chat_id"} once it lands.
+
+    python chat_server.py --port 8765
+    python chat_server.py --bench --db /tmp/bench.db    # offline throughput check
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import secrets
+import sqlite3
+import struct
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+
+
+def _load_bot(db_path=None):
+    """Import the app module, pointing it at db_path first if given"""
+    if db_path:
+        os.environ['WELLNESS_DB_PATH'] = db_path
+    import FINAL_OM_CHATBOT as bot
+    bot.ensure_database()
+    bot.sync_knowledge_base()
+    return bot
+
+
+# Server settings
+DEFAULT_WORKERS = 4
+MAX_PENDING_PER_WORKER = 8
+MAX_BODY_BYTES = 64 * 1024
+SESSION_IDLE_SECONDS = 3600
+MAX_SESSIONS = 10000
+# Unresolved chat writes remembered per session, for feedback by message_ref
+MAX_PENDING_REFS = 256
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+REASONS = {200: "OK", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+           405: "Method Not Allowed", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ChatServer:
+    """Routes requests to a WellnessEngine through a bounded executor"""
+
+    def __init__(self, bot, workers=DEFAULT_WORKERS, max_pending=None):
+        self.bot = bot
+        self.engine = bot.WellnessEngine()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chat")
+        # Requests beyond this many in flight get 503 instead of queueing without bound
+        self.slots = asyncio.Semaphore(max_pending or workers * MAX_PENDING_PER_WORKER)
+        # token -> {'user', 'seen', 'refs'}, least recently used first
+        self.sessions = OrderedDict()
+        self.connections = set()
+        self.followups = set()
+
+    async def run_blocking(self, func, *args):
+        if self.slots.locked():
+            raise HTTPError(503, "server busy")
+        async with self.slots:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    # Auth
+    async def login(self, body):
+        ok, user = await self.run_blocking(self.bot.authenticate_user, body.get('email', ''), body.get('password', ''))
+        if not ok or not user:
+            raise HTTPError(401, "invalid credentials")
+        self.evict_sessions()
+        token = secrets.token_urlsafe(24)
+        self.sessions[token] = {'user': user, 'seen': time.monotonic(), 'refs': OrderedDict()}
+        while len(self.sessions) > MAX_SESSIONS:
+            self.sessions.popitem(last=False)
+        return {'token': token, 'user': {'id': user['id'], 'email': user['email'], 'full_name': user['full_name']}}
+
+    def logout(self, token):
+        self.sessions.pop(token, None)
+        return {'ok': True}
+
+    def evict_sessions(self):
+        """Drop sessions idle for SESSION_IDLE_SECONDS; the oldest are first, so this stops at the first live one"""
+        cutoff = time.monotonic() - SESSION_IDLE_SECONDS
+        while self.sessions:
+            token, session = next(iter(self.sessions.items()))
+            if session['seen'] >= cutoff:
+                break
+            del self.sessions[token]
+
+    def session_for(self, token):
+        self.evict_sessions()
+        session = self.sessions.get(token or '')
+        if session is None:
+            raise HTTPError(401, "missing or unknown token")
+        session['seen'] = time.monotonic()
+        self.sessions.move_to_end(token)
+        return session
+
+    # Chat
+    async def chat(self, session, body):
+        message = body.get('message')
+        if not isinstance(message, str) or not message.strip():
+            raise HTTPError(400, "message is required")
+        result = await self.run_blocking(self.engine.respond, session['user']['id'], message.strip())
+        # Don't hold the reply for the group commit; only feedback needs the id
+        chat_id, message_ref = None, None
+        future = result.chat_future
+        if future is not None and future.done():
+            chat_id = future.result() or None
+        elif future is not None:
+            message_ref = secrets.token_urlsafe(9)
+            session['refs'][message_ref] = future
+            while len(session['refs']) > MAX_PENDING_REFS:
+                session['refs'].popitem(last=False)
+        return {
+            'chat_id': chat_id,
+            'message_ref': message_ref,
+            'language': result.language,
+            'intent': result.intent,
+            'entities': result.entities,
+            'response': result.response,
+            'timings': result.timings,
+        }
+
+    async def feedback(self, session, body):
+        user = session['user']
+        chat_id = body.get('chat_id')
+        ref = body.get('message_ref')
+        if chat_id is None and ref is not None:
+            future = session['refs'].get(ref) if isinstance(ref, str) else None
+            if future is None:
+                raise HTTPError(404, "chat not found")
+            # False when the write failed
+            chat_id = await asyncio.wrap_future(future) or None
+            if chat_id is None:
+                raise HTTPError(404, "chat not found")
+        if isinstance(chat_id, str) and chat_id.isdigit():
+            chat_id = int(chat_id)
+        if (body.get('feedback_type') not in ('thumbs_up', 'thumbs_down')
+                or not isinstance(chat_id, int) or isinstance(chat_id, bool) or chat_id <= 0):
+            raise HTTPError(400, "chat_id or message_ref, and feedback_type (thumbs_up|thumbs_down), are required")
+        # Same check as get_chat_response: the chat must be the token's user's
+        if not await self.run_blocking(self.bot.user_owns_chat, user['id'], chat_id):
+            raise HTTPError(404, "chat not found")
+        try:
+            ok = await self.run_blocking(self.bot.save_response_feedback, user['id'], chat_id, body['feedback_type'])
+        except sqlite3.Error:
+            raise HTTPError(500, "could not save feedback")
+        return {'ok': bool(ok)}
+
+    # HTTP
+    async def handle(self, reader, writer):
+        task = asyncio.current_task()
+        self.connections.add(task)
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except HTTPError as e:
+                    # The request can't be framed, so answer and drop the connection
+                    await write_response(writer, e.status, {'error': str(e)})
+                    break
+                if request is None:
+                    break
+                method, target, headers, body = request
+                url = urlsplit(target)
+
+                if url.path == '/ws' and headers.get('upgrade', '').lower() == 'websocket':
+                    token = parse_qs(url.query).get('token', [''])[0]
+                    try:
+                        self.session_for(token)
+                    except HTTPError as e:
+                        await write_response(writer, e.status, {'error': str(e)})
+                        break
+                    await self.websocket(reader, writer, headers, token)
+                    break
+
+                try:
+                    payload = await self.route(method, url.path, headers, body)
+                    status = 200
+                except HTTPError as e:
+                    status, payload = e.status, {'error': str(e)}
+                await write_response(writer, status, payload)
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.connections.discard(task)
+            writer.close()
+
+    async def route(self, method, path, headers, body):
+        if path not in ('/login', '/logout', '/chat', '/feedback'):
+            raise HTTPError(404, "not found")
+        if method != 'POST':
+            raise HTTPError(405, "use POST")
+        try:
+            data = json.loads(body or b'{}')
+        except ValueError:
+            raise HTTPError(400, "body must be JSON")
+        if not isinstance(data, dict):
+            raise HTTPError(400, "body must be a JSON object")
+        if path == '/login':
+            return await self.login(data)
+        auth = headers.get('authorization', '')
+        token = auth[7:] if auth.startswith('Bearer ') else None
+        session = self.session_for(token)
+        if path == '/logout':
+            return self.logout(token)
+        if path == '/chat':
+            return await self.chat(session, data)
+        return await self.feedback(session, data)
+
+    # WebSocket
+    async def websocket(self, reader, writer, headers, token):
+        accept = base64.b64encode(hashlib.sha1((headers.get('sec-websocket-key', '') + WS_GUID).encode()).digest())
+        writer.write(b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                     b"Sec-WebSocket-Accept: " + accept + b"\r\n\r\n")
+        await writer.drain()
+        while True:
+            opcode, data = await read_frame(reader)
+            if opcode == 0x8:
+                writer.write(encode_frame(0x8, data[:2]))
+                await writer.drain()
+                return
+            if opcode == 0x9:
+                writer.write(encode_frame(0xA, data))
+            elif opcode == 0x1:
+                try:
+                    request = json.loads(data)
+                    if not isinstance(request, dict):
+                        raise HTTPError(400, "frames must be JSON objects")
+                    # Checked per frame, so logout or expiry also ends an open socket's access
+                    session = self.session_for(token)
+                    reply = await self.chat(session, request)
+                except HTTPError as e:
+                    reply = {'error': str(e)}
+                except ValueError:
+                    reply = {'error': "frames must be JSON"}
+                writer.write(encode_frame(0x1, json.dumps(reply).encode()))
+                if reply.get('message_ref'):
+                    task = asyncio.create_task(self.send_chat_id(writer, session['refs'][reply['message_ref']],
+                                                                 reply['message_ref']))
+                    self.followups.add(task)
+                    task.add_done_callback(self.followups.discard)
+            await writer.drain()
+
+    async def send_chat_id(self, writer, future, message_ref):
+        """Follow-up frame with the chat_id once the chat's write commits"""
+        chat_id = await asyncio.wrap_future(future)
+        if not writer.is_closing():
+            writer.write(encode_frame(0x1, json.dumps({'message_ref': message_ref, 'chat_id': chat_id or None}).encode()))
+            await writer.drain()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.bot.get_chat_writer().flush()
+
+
+# Wire format helpers
+async def read_request(reader):
+    """Parse one HTTP/1.1 request; None when the client closed the connection"""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError:
+        return None
+    lines = head.decode('latin-1').split("\r\n")
+    request_line = lines[0].split(" ")
+    if len(request_line) != 3 or not request_line[1].startswith("/"):
+        raise HTTPError(400, "malformed request line")
+    method, target, _ = request_line
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    length = headers.get('content-length', '0')
+    if not length.isdigit():
+        raise HTTPError(400, "invalid Content-Length")
+    length = int(length)
+    if length > MAX_BODY_BYTES:
+        raise ConnectionError("request body too large")
+    body = await reader.readexactly(length) if length else b''
+    return method, target, headers, body
+
+
+async def write_response(writer, status, payload):
+    body = json.dumps(payload).encode()
+    writer.write(f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+
+
+async def read_frame(reader):
+    """Read one (unfragmented) client frame; returns (opcode, payload)"""
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+    if length == 126:
+        length = struct.unpack("!H", await reader.readexactly(2))[0]
+    elif length == 127:
+        length = struct.unpack("!Q", await reader.readexactly(8))[0]
+    if length > MAX_BODY_BYTES:
+        raise ConnectionError("frame too large")
+    mask = await reader.readexactly(4) if second & 0x80 else b"\0\0\0\0"
+    data = await reader.readexactly(length)
+    return first & 0x0F, bytes(b ^ mask[i % 4] for i, b in enumerate(data))
+
+
+def encode_frame(opcode, data, mask=None):
+    """Build a single FIN frame; clients pass a 4-byte mask"""
+    head = bytes([0x80 | opcode])
+    mask_bit = 0x80 if mask else 0
+    if len(data) < 126:
+        head += bytes([mask_bit | len(data)])
+    elif len(data) < 65536:
+        head += bytes([mask_bit | 126]) + struct.pack("!H", len(data))
+    else:
+        head += bytes([mask_bit | 127]) + struct.pack("!Q", len(data))
+    if mask:
+        head += mask
+        data = bytes(b ^ mask[i % 4] for i, b in enumerate(data))
+    return head + data
+
+
+# Offline benchmark: the HTTP service vs the Streamlit page's per-message path
+BENCH_MESSAGES = [
+    "hello", "I have a headache and fever", "mujhe bukhar hai", "burn on my hand",
+    "cold and cough since yesterday", "give me some wellness tips", "मुझे सिरदर्द है",
+    "I feel stressed and anxious", "back pain after gym", "thank you, bye",
+]
+
+
+async def _post(reader, writer, path, payload, token=None):
+    body = json.dumps(payload).encode()
+    auth = f"Authorization: Bearer {token}\r\n" if token else ""
+    writer.write(f"POST {path} HTTP/1.1\r\nHost: bench\r\nContent-Type: application/json\r\n{auth}"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    length = int(next(line.split(b":")[1] for line in head.split(b"\r\n") if line.lower().startswith(b"content-length")))
+    return json.loads(await reader.readexactly(length))
+
+
+async def _bench_http(port, clients, per_client):
+    login = []
+    for n in range(clients):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        reply = await _post(reader, writer, "/login", {'email': f"bench{n}@example.com", 'password': "bench"})
+        login.append((reader, writer, reply['token']))
+
+    async def client(n, reader, writer, token):
+        for i in range(per_client):
+            reply = await _post(reader, writer, "/chat", {'message': BENCH_MESSAGES[(n + i) % len(BENCH_MESSAGES)]}, token)
+            assert reply.get('chat_id') or reply.get('message_ref'), reply
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(n, *conn) for n, conn in enumerate(login)))
+    elapsed = time.perf_counter() - started
+    for _, writer, _ in login:
+        writer.close()
+        await writer.wait_closed()
+    return clients * per_client / elapsed
+
+
+def _bench_streamlit_path(bot, total):
+    """What one Streamlit rerun does per message: detect, classify, respond, synchronous save"""
+    started = time.perf_counter()
+    for i in range(total):
+        text = BENCH_MESSAGES[i % len(BENCH_MESSAGES)]
+        language = bot.detect_language(text)
+        intent, entities = bot.classify_intent(text)
+        response = bot.generate_safe_response(intent, entities, text, language in ['hindi', 'hinglish'])
+        assert bot.save_chat_message(1, text, response, entities, intent, language)
+    return total / (time.perf_counter() - started)
+
+
+async def run_bench(bot, args):
+    for n in range(args.clients):
+        bot.create_user(f"bench{n}@example.com", "bench", f"Bench {n}")
+    server = ChatServer(bot, workers=args.workers, max_pending=args.clients)
+    listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+    port = listener.sockets[0].getsockname()[1]
+    async with listener:
+        http_rate = await _bench_http(port, args.clients, args.messages)
+        await asyncio.gather(*server.connections)
+    server.close()
+    sync_rate = _bench_streamlit_path(bot, args.clients * args.messages)
+    print(json.dumps({
+        'clients': args.clients,
+        'messages': args.clients * args.messages,
+        'http_msgs_per_sec': round(http_rate, 1),
+        'streamlit_path_msgs_per_sec': round(sync_rate, 1),
+        'note': "streamlit_path excludes the browser rerun itself, so it is an upper bound for the page",
+    }, indent=2))
+
+
+async def serve(bot, args):
+    server = ChatServer(bot, workers=args.workers)
+    listener = await asyncio.start_server(server.handle, args.host, args.port)
+    print(f"Wellness chat service on http://{args.host}:{args.port}")
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--db", help="SQLite file (defaults to WELLNESS_DB_PATH or the app's database)")
+    parser.add_argument("--bench", action="store_true", help="run the offline throughput comparison and exit")
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--messages", type=int, default=20, help="messages per bench client")
+    args = parser.parse_args(argv)
+
+    bot = _load_bot(args.db)
+    try:
+        asyncio.run(run_bench(bot, args) if args.bench else serve(bot, args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
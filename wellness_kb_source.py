@@ -0,0 +1,579 @@
+"""Source of the built-in knowledge base and entity vocabularies.
+
+Edit this file, then run `python build_kb.py` to rebuild the bundle that the
+app loads at startup. The app also rebuilds the bundle on its own when this
+file has changed, so a stale bundle is never served.
+"""
+
+# Complete Knowledge Base with ALL symptoms and first aid
+WELLNESS_KB = {
+    "symptoms": {
+        "headache": {
+            "english": """**For Headache Relief:**
+
+• Drink plenty of water - dehydration is a common cause
+
+• Rest in a quiet, dark room away from bright lights
+
+• Apply a cold compress to your forehead for 15 minutes
+
+• Avoid screens (phone, computer, TV) for at least 30 minutes
+
+• Try gentle neck and shoulder stretches
+
+• Consider over-the-counter pain relievers if needed
+
+• If severe or persistent for more than 24 hours, consult a doctor""",
+            "hindi": """**सिरदर्द के लिए:**
+
+• खूब पानी पिएं - निर्जलीकरण एक आम कारण है
+
+• अंधेरे, शांत कमरे में आराम करें
+
+• माथे पर 15 मिनट के लिए ठंडा सेक लगाएं
+
+• कम से कम 30 मिनट के लिए स्क्रीन से बचें
+
+• हल्के गर्दन और कंधे की स्ट्रेचिंग करें
+
+• जरूरत पड़ने पर दर्द निवारक दवा लें
+
+• अगर 24 घंटे से अधिक समय तक रहे तो डॉक्टर से परामर्श करें"""
+        },
+        "fever": {
+            "english": """**For Fever Management:**
+
+• Stay well-hydrated with water, clear broths, or electrolyte drinks
+
+• Rest completely and avoid physical activities
+
+• Wear light, breathable clothing
+
+• Use a cool, damp washcloth on forehead and wrists
+
+• Take temperature regularly and monitor changes
+
+• Consider fever-reducing medication if over 101°F (38.3°C)
+
+• Seek medical attention if fever exceeds 103°F (39.4°C)
+
+• Call doctor immediately if accompanied by severe symptoms""",
+            "hindi": """**बुखार प्रबंधन के लिए:**
+
+• पानी, साफ शोरबा या इलेक्ट्रोलाइट पेय के साथ हाइड्रेटेड रहें
+
+• पूरी तरह से आराम करें और शारीरिक गतिविधियों से बचें
+
+• हल्के, सांस लेने योग्य कपड़े पहनें
+
+• माथे और कलाइयों पर ठंडा, नम कपड़ा रखें
+
+• नियमित रूप से तापमान लें और परिवर्तनों की निगरानी करें
+
+• यदि 101°F (38.3°C) से अधिक हो तो बुखार कम करने वाली दवा लें"""
+        },
+        "fatigue": {
+            "english": """**To Combat Fatigue:**
+
+• Ensure 7-9 hours of quality sleep each night
+
+• Maintain a consistent sleep schedule, even on weekends
+
+• Eat balanced meals with complex carbohydrates and lean proteins
+
+• Stay hydrated throughout the day
+
+• Take short 10-15 minute walks to boost energy
+
+• Limit caffeine intake after 2 PM
+
+• Practice stress-reduction techniques like deep breathing
+
+• If persistent for weeks, consult healthcare provider""",
+            "hindi": """**थकान से निपटने के लिए:**
+
+• प्रति रात 7-9 घंटे की गुणवत्तापूर्ण नींद सुनिश्चित करें
+
+• सप्ताहांत पर भी नींद का सुसंगत कार्यक्रम बनाए रखें
+
+• जटिल कार्बोहाइड्रेट और लीन प्रोटीन के साथ संतुलित भोजन खाएं
+
+• दिन भर हाइड्रेटेड रहें
+
+• ऊर्जा बढ़ाने के लिए 10-15 मिनट की छोटी सैर करें"""
+        },
+        "stress": {
+            "english": """**For Stress Management:**
+
+• Practice deep breathing exercises (4-7-8 technique)
+
+• Try progressive muscle relaxation starting from toes to head
+
+• Engage in 20-30 minutes of physical activity daily
+
+• Limit caffeine and alcohol consumption
+
+• Maintain regular meal times and avoid skipping meals
+
+• Connect with supportive friends or family members
+
+• Consider mindfulness meditation or yoga
+
+• If overwhelming, seek professional counseling support""",
+            "hindi": """**तनाव प्रबंधन के लिए:**
+
+• गहरी सांस लेने के व्यायाम का अभ्यास करें (4-7-8 तकनीक)
+
+• पैर की उंगलियों से सिर तक प्रगतिशील मांसपेशी विश्राम का प्रयास करें
+
+• रोजाना 20-30 मिनट की शारीरिक गतिविधि में संलग्न हों
+
+• कैफीन और शराब की खपत सीमित करें"""
+        },
+        "anxiety": {
+            "english": """**To Manage Anxiety:**
+
+• Use grounding techniques: name 5 things you see, 4 you hear, 3 you touch
+
+• Practice slow, controlled breathing (inhale 4 counts, exhale 6 counts)
+
+• Challenge negative thoughts with realistic perspectives
+
+• Limit news and social media exposure
+
+• Maintain regular exercise routine
+
+• Avoid excessive caffeine and sugar
+
+• Consider talking to a trusted friend or counselor
+
+• If panic attacks occur, seek immediate professional help""",
+            "hindi": """**चिंता प्रबंधन के लिए:**
+
+• ग्राउंडिंग तकनीक का उपयोग करें: 5 चीजें जो आप देखते हैं, 4 जो आप सुनते हैं, 3 जो आप छूते हैं
+
+• धीमी, नियंत्रित सांस का अभ्यास करें (4 गिनती में सांस लें, 6 में छोड़ें)
+
+• नकारात्मक विचारों को यथार्थवादी दृष्टिकोण से चुनौती दें"""
+        },
+        "cold": {
+            "english": """**For Cold Symptom Relief:**
+
+• Rest and get extra sleep to help your immune system
+
+• Drink warm fluids like herbal tea, warm water with honey and lemon
+
+• Use a humidifier or breathe steam from hot shower
+
+• Gargle with warm salt water for sore throat
+
+• Use saline nasal drops to clear congestion
+
+• Eat chicken soup or other warm, nutritious broths
+
+• Avoid smoking and secondhand smoke
+
+• See doctor if symptoms worsen after 7-10 days""",
+            "hindi": """**सर्दी के लक्षण राहत के लिए:**
+
+• अपनी प्रतिरक्षा प्रणाली की मदद के लिए आराम करें और अतिरिक्त नींद लें
+
+• हर्बल चाय, शहद और नींबू के साथ गर्म पानी जैसे गर्म तरल पदार्थ पिएं
+
+• ह्यूमिडिफायर का उपयोग करें या गर्म शावर से भाप लें"""
+        },
+        "cough": {
+            "english": """**To Treat Persistent Cough:**
+
+• Stay hydrated with warm liquids throughout the day
+
+• Use honey (1-2 teaspoons) to soothe throat irritation
+
+• Try throat lozenges or hard candies for temporary relief
+
+• Sleep with your head elevated on extra pillows
+
+• Avoid irritants like smoke, strong perfumes, or dust
+
+• Use a cool-mist humidifier in your bedroom
+
+• Consider over-the-counter cough suppressants for dry cough
+
+• Consult doctor if cough lasts more than 3 weeks or produces blood""",
+            "hindi": """**लगातार खांसी के उपचार के लिए:**
+
+• दिन भर गर्म तरल पदार्थों के साथ हाइड्रेटेड रहें
+
+• गले की जलन को शांत करने के लिए शहद (1-2 चम्मच) का उपयोग करें
+
+• अस्थायी राहत के लिए गले की लोजेंज या कड़ी कैंडी आज़माएं"""
+        },
+        "stomach": {
+            "english": """**For Stomach Discomfort:**
+
+• Eat bland, easy-to-digest foods (rice, bananas, toast)
+
+• Stay hydrated with small, frequent sips of clear fluids
+
+• Avoid dairy, caffeine, alcohol, and fatty foods
+
+• Try peppermint or ginger tea for nausea
+
+• Rest and avoid strenuous activities
+
+• Apply a warm heating pad to abdomen (not too hot)
+
+• Avoid anti-inflammatory medications that can irritate stomach
+
+• Seek immediate care for severe pain, vomiting, or fever""",
+            "hindi": """**पेट की परेशानी के लिए:**
+
+• सादे, पचने में आसान भोजन खाएं (चावल, केला, टोस्ट)
+
+• साफ तरल पदार्थों के छोटे, लगातार घूंटों के साथ हाइड्रेटेड रहें
+
+• डेयरी, कैफीन, शराब और वसायुक्त खाद्य पदार्थों से बचें"""
+        },
+        "back_pain": {
+            "english": """**For Back Pain Relief:**
+
+• Rest for 24-48 hours, then gradually return to normal activities
+
+• Apply ice for first 48 hours, then switch to heat therapy
+
+• Practice gentle stretching and walking as tolerated
+
+• Sleep on your side with knees bent and pillow between legs
+
+• Maintain good posture when sitting and standing
+
+• Avoid heavy lifting and sudden movements
+
+• Consider over-the-counter anti-inflammatory medications
+
+• See doctor if pain persists over a week or worsens""",
+            "hindi": """**पीठ दर्द से राहत के लिए:**
+
+• 24-48 घंटे आराम करें, फिर धीरे-धीरे सामान्य गतिविधियों पर लौटें
+
+• पहले 48 घंटों के लिए बर्फ लगाएं, फिर हीट थेरेपी पर स्विच करें"""
+        },
+        "nausea": {
+            "english": """**To Reduce Nausea:**
+
+• Eat small, frequent meals instead of large portions
+
+• Choose bland foods like crackers, rice, or toast
+
+• Drink clear fluids: ginger ale, herbal tea, or water
+
+• Avoid strong smells, greasy, or spicy foods
+
+• Try ginger supplements or ginger tea
+
+• Rest in a well-ventilated area
+
+• Practice deep breathing or meditation
+
+• Seek medical help if persistent vomiting or signs of dehydration""",
+            "hindi": """**मतली को कम करने के लिए:**
+
+• बड़े हिस्से के बजाय छोटे, लगातार भोजन खाएं
+
+• सादे खाद्य पदार्थ चुनें जैसे क्रैकर, चावल, या टोस्ट"""
+        }
+    },
+
+    "first_aid": {
+        "burn": {
+            "english": """**First Aid for Burns:**
+
+**MINOR BURNS (1st degree - red, painful skin):**
+
+• Immediately cool the burn with cool running water for 10-15 minutes
+
+• Remove jewelry or tight clothing before swelling begins
+
+• Do NOT apply ice, butter, or home remedies
+
+• Cover with sterile, non-adhesive bandage or clean cloth
+
+• Take over-the-counter pain medication if needed
+
+• Apply aloe vera gel after cooling
+
+**SERIOUS BURNS (2nd/3rd degree - blistering, charred skin):**
+
+• Call 911 immediately - do not delay
+
+• Do not remove clothing stuck to burn area
+
+• Cover burn with cool, moist cloth while waiting for help
+
+• Do not break blisters or apply creams to severe burns
+
+• Monitor for signs of shock: pale skin, rapid breathing""",
+            "hindi": """**जलने के लिए प्राथमिक चिकित्सा:**
+
+**छोटी जलन (1st डिग्री - लाल, दर्दनाक त्वचा):**
+
+• तुरंत 10-15 मिनट के लिए ठंडे बहते पानी से जलन को ठंडा करें
+
+• सूजन शुरू होने से पहले गहने या तंग कपड़े हटा दें
+
+• बर्फ, मक्खन, या घरेलू उपचार न लगाएं"""
+        },
+        "cut": {
+            "english": """**First Aid for Cuts and Wounds:**
+
+**MINOR CUTS:**
+
+• Wash your hands thoroughly before treating wound
+
+• Clean the wound gently with clean water
+
+• Apply direct pressure with clean cloth to stop bleeding
+
+• Once bleeding stops, apply antibiotic ointment if available
+
+• Cover with sterile adhesive bandage
+
+• Change bandage daily and keep wound clean and dry
+
+• Monitor for signs of infection: increased pain, redness, pus
+
+**DEEP OR SEVERE CUTS:**
+
+• Call 911 if wound is deep, gaping, or bleeding heavily
+
+• Apply firm, direct pressure with clean cloth or bandage
+
+• Do not remove objects embedded in the wound
+
+• Elevate the injured area above heart level if possible
+
+• Cover with sterile dressing and maintain pressure until help arrives""",
+            "hindi": """**कटने और घावों के लिए प्राथमिक चिकित्सा:**
+
+**छोटे कट:**
+
+• घाव का इलाज करने से पहले अपने हाथों को अच्छी तरह से धो लें
+
+• घाव को साफ पानी से धीरे से साफ करें
+
+• खून बंद करने के लिए साफ कपड़े से सीधा दबाव लगाएं
+
+• जब खून बंद हो जाए, तो उपलब्ध होने पर एंटीबायोटिक मरहम लगाएं
+
+**गहरे या गंभीर कट:**
+
+• यदि घाव गहरा है, खुला है, या बहुत खून बह रहा है तो 911 कॉल करें
+
+• साफ कपड़े या पट्टी से मजबूत, सीधा दबाव लगाएं"""
+        },
+        "sprain": {
+            "english": """**Treatment for Sprains and Strains - R.I.C.E. Method:**
+
+• **REST:** Stop activity immediately, do not use injured area
+
+• **ICE:** Apply ice pack for 15-20 minutes every 2-3 hours for first 48 hours
+
+• **COMPRESSION:** Wrap with elastic bandage (not too tight)
+
+• **ELEVATION:** Raise injured area above heart level when possible
+
+**ONGOING CARE:**
+
+• Avoid heat, alcohol, running, or massage for first 72 hours
+
+• Take anti-inflammatory medication as directed
+
+• Use crutches or supportive device if weight-bearing is painful
+
+• Begin gentle movement after initial pain subsides
+
+• Seek medical attention if no improvement in 2-3 days""",
+            "hindi": """**मोच और खिंचाव के लिए उपचार - R.I.C.E. विधि:**
+
+• **आराम:** तुरंत गतिविधि बंद करें, चोटिल क्षेत्र का उपयोग न करें
+
+• **बर्फ:** पहले 48 घंटों के लिए हर 2-3 घंटे में 15-20 मिनट के लिए आइस पैक लगाएं
+
+• **संपीड़न:** लोचदार पट्टी से लपेटें (बहुत कसकर नहीं)
+
+• **उत्थान:** संभव होने पर चोटिल क्षेत्र को हृदय के स्तर से ऊपर उठाएं"""
+        },
+        "nosebleed": {
+            "english": """**Stopping a Nosebleed Safely:**
+
+• Stay calm and keep person upright (never lie down)
+
+• Lean slightly forward to prevent blood from going down throat
+
+• Pinch soft part of nose firmly for 10 minutes continuously
+
+• Breathe through mouth during this time
+
+• Do not peek or release pressure before 10 minutes
+
+• Apply cold compress to bridge of nose
+
+• After bleeding stops, avoid blowing nose for several hours
+
+• Seek medical help if bleeding doesn't stop after 20 minutes""",
+            "hindi": """**नकसीर को सुरक्षित रूप से रोकना:**
+
+• शांत रहें और व्यक्ति को सीधा रखें (कभी भी लेट न जाएं)
+
+• गले में खून जाने से रोकने के लिए थोड़ा आगे झुकें
+
+• नाक के मुलायम हिस्से को 10 मिनट तक लगातार मजबूती से दबाएं
+
+• इस समय के दौरान मुंह से सांस लें"""
+        },
+        "choking": {
+            "english": """**Emergency Choking Response:**
+
+**FOR CONSCIOUS ADULTS/CHILDREN OVER 1 YEAR:**
+
+• Ask "Are you choking?" - if they cannot speak, act immediately
+
+• Call 911 or have someone else call
+
+• Give 5 sharp back blows between shoulder blades
+
+• If unsuccessful, perform Heimlich maneuver:
+  - Stand behind person, wrap arms around waist
+  - Make fist, place above navel but below ribs
+  - Give 5 quick upward thrusts
+
+• Alternate between back blows and abdominal thrusts
+
+• Continue until object dislodges or person becomes unconscious
+
+**FOR UNCONSCIOUS PERSON:**
+
+• Call 911 immediately
+
+• Begin CPR starting with chest compressions
+
+• Look for object in mouth before giving rescue breaths""",
+            "hindi": """**आपातकालीन घुटन प्रतिक्रिया:**
+
+**सचेत वयस्कों/1 वर्ष से अधिक बच्चों के लिए:**
+
+• पूछें "क्या आप घुट रहे हैं?" - यदि वे बोल नहीं सकते, तुरंत कार्य करें
+
+• 911 कॉल करें या किसी और से कॉल कराएं
+
+• कंधे की ब्लेड के बीच 5 तेज थपकी दें
+
+• यदि असफल, तो हेमलिच मैन्यूवर करें:
+  - व्यक्ति के पीछे खड़े हों, कमर के चारों ओर हाथ लपेटें
+  - मुट्ठी बनाएं, नाभि के ऊपर लेकिन पसलियों के नीचे रखें
+  - 5 त्वरित ऊपर की ओर जोर दें"""
+        },
+        "allergic_reaction": {
+            "english": """**For Allergic Reactions:**
+
+**MILD REACTIONS (rash, itching):**
+
+• Remove or avoid the allergen immediately
+
+• Take antihistamine as directed on package
+
+• Apply cool compresses to affected skin
+
+• Avoid scratching to prevent infection
+
+• Monitor symptoms closely
+
+**SEVERE REACTIONS (difficulty breathing, swelling):**
+
+• Call 911 immediately for anaphylaxis
+
+• Use epinephrine auto-injector if available
+
+• Help person sit up to ease breathing
+
+• Loosen tight clothing
+
+• Do not give anything to drink
+
+• Be prepared to perform CPR if person becomes unconscious""",
+            "hindi": """**एलर्जिक प्रतिक्रियाओं के लिए:**
+
+**हल्की प्रतिक्रियाएं (दाने, खुजली):**
+
+• एलर्जेन को तुरंत हटाएं या उससे बचें
+
+• पैकेज पर निर्देशित एंटीहिस्टामाइन लें
+
+• प्रभावित त्वचा पर ठंडा सेक लगाएं
+
+**गंभीर प्रतिक्रियाएं (सांस लेने में कठिनाई, सूजन):**
+
+• एनाफिलेक्सिस के लिए तुरंत 911 कॉल करें
+
+• उपलब्ध होने पर एपिनेफ्रीन ऑटो-इंजेक्टर का उपयोग करें"""
+        }
+    },
+
+    "wellness_tips": [
+        {
+            "english": "💧 HYDRATION: Drink 8-10 glasses of water daily. Carry a reusable bottle and eat water-rich foods.",
+            "hindi": "💧 हाइड्रेशन: प्रतिदिन 8-10 गिलास पानी पिएं। पुन: प्रयोज्य बोतल ले जाएं।"
+        },
+        {
+            "english": "😴 SLEEP: Maintain 7-9 hours of quality sleep with consistent bedtime and wake-up times.",
+            "hindi": "😴 नींद: सुसंगत सोने के समय और जागने के समय के साथ 7-9 घंटे की गुणवत्तापूर्ण नींद बनाए रखें।"
+        }
+    ],
+
+    "greetings": [
+        {
+            "hindi": "**नमस्ते! 🌿 मैं आपका स्वास्थ्य मार्गदर्शक बॉट हूं**\n\nमैं इनमें मदद कर सकता हूं:\n\n• सामान्य लक्षण और देखभाल सलाह\n\n• प्राथमिक चिकित्सा प्रक्रियाएं\n\n• दैनिक स्वास्थ्य सुझाव\n\n• मानसिक स्वास्थ्य सहायता\n\n**आज आप किस स्वास्थ्य विषय पर चर्चा करना चाहेंगे?**",
+            "english": "**Hello! 🌿 I'm your Wellness Guide Bot**\n\nI can help with:\n\n• Common symptoms and care advice\n\n• First aid procedures\n\n• Daily wellness tips\n\n• Mental health support\n\n**What health topic would you like to explore today?**"
+        }
+    ],
+
+    "farewells": [
+        {
+            "hindi": "**अपना ख्याल रखें! 🌿**\n\nयाद रखें:\n\n• हाइड्रेटेड रहें और पर्याप्त आराम करें\n\n• अपने शरीर की सुनें\n\n• जरूरत पड़ने पर पेशेवर चिकित्सा देखभाल लें\n\n**स्वस्थ रहें!**",
+            "english": "**Take care! 🌿**\n\nRemember:\n\n• Stay hydrated and get adequate rest\n\n• Listen to your body\n\n• Seek professional medical care when needed\n\n**Stay healthy!**"
+        }
+    ]
+}
+
+# Enhanced health entities for extraction including Hinglish
+HEALTH_ENTITIES = {
+    "symptoms": ["headache", "fever", "fatigue", "stress", "anxiety", "cold", "cough", "stomach", "back_pain", "back pain", "nausea", 
+                "pain", "ache", "tired", "sick", "dizzy", "weak", "sore", "hurt", "vomit", "diarrhea"],
+    "body_parts": ["head", "throat", "chest", "stomach", "back", "neck", "shoulder", "leg", "arm", "eye", "ear", "nose", 
+                   "mouth", "tooth", "teeth", "hand", "foot", "knee", "elbow"],
+    "conditions": ["diabetes", "hypertension", "asthma", "allergy", "infection", "flu", "migraine", "cold", "fever", "covid"]
+}
+
+# Enhanced Hindi-English entity mapping including Hinglish
+HINDI_ENTITIES = {
+    # Hindi Devanagari
+    "बुखार": "fever", "सिरदर्द": "headache", "खांसी": "cough", "पेट": "stomach", "दर्द": "pain",
+    "गला": "throat", "आंख": "eye", "कान": "ear", "नाक": "nose", "सिर": "head",
+    "थकान": "fatigue", "तनाव": "stress", "चिंता": "anxiety", "सर्दी": "cold",
+    "पीठ": "back", "मतली": "nausea", "कमजोर": "weak", "चक्कर": "dizzy",
+
+    # Hinglish (Hindi words in English script)
+    "bukaar": "fever", "bukhaar": "fever", "bukhar": "fever", "bukhhar": "fever",
+    "sir": "head", "sir dard": "headache", "sirdard": "headache", 
+    "pet": "stomach", "pet dard": "stomach", "petdard": "stomach",
+    "khansi": "cough", "khasi": "cough",
+    "gala": "throat", "galaa": "throat",
+    "paani": "water", "pani": "water", 
+    "thakan": "fatigue", "thakaan": "fatigue",
+    "tanav": "stress", "tension": "stress",
+    "chinta": "anxiety", "pareshan": "anxiety",
+    "kamjor": "weak", "kamjori": "weak",
+    "chakkar": "dizzy", "chakker": "dizzy",
+    "peeth": "back", "pith": "back",
+    "nazla": "cold", "zukam": "cold", "jukam": "cold"
+}